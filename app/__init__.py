@@ -0,0 +1,8 @@
+# app/__init__.py
+# 설정은 각 모듈이 import 시점에 os.getenv 로 읽으므로, app.* 가 하나라도 import 되기 전에 .env 를 먼저 불러온다
+# (프로젝트 루트의 .env, 이미 설정된 환경변수는 덮어쓰지 않음)
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
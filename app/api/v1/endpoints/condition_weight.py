@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Body
 from app.services.condition_weight import get_weighted_top5
 from app.services.hf_llm import ask_hf_llama  # 또는 ask_local_llama
+from app.services import metrics
 
 router = APIRouter()
 
 @router.post("/condition-weight")
 def recommend_by_condition(user_input: dict = Body(...)):
-    top5_menus = get_weighted_top5(user_input)
+    with metrics.stage("rank"):
+        top5_menus = get_weighted_top5(user_input)
     
     # 🔥 여기가 핵심: 설명 생성
-    description = ask_hf_llama(top5_menus)
+    description = ask_hf_llama(top5_menus, endpoint="condition_weight")
 
     # 🔁 description도 함께 반환
     return {
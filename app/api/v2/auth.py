@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db, get_graph_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, acquire_connection
 from app.db.models.user import User
+from app.db.models.outbox import OutboxEvent
+from app.services.outbox_relay import outbox_relay, user_created_event
 from app.schemas.user import UserCreate, UserOut
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.utils.security import get_password_hash_async, verify_password_async, create_access_token
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -11,14 +14,15 @@ router = APIRouter()
 # ==========================================
 # 1. 회원가입 API (나이, 성별 포함)
 # ==========================================
-@router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def create_user(
-    user: UserCreate, 
-    db: Session = Depends(get_db),
-    graph_session = Depends(get_graph_db)
-):
+async def _find_user(db: AsyncSession, username: str):
+    await acquire_connection(db)
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+
+async def _create_mysql_user(user: UserCreate, hashed_password: str, db: AsyncSession) -> User:
     # 1. MySQL 중복 체크
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await _find_user(db, user.username)
     if db_user:
         raise HTTPException(
             status_code=400, 
@@ -26,41 +30,36 @@ def create_user(
         )
 
     # 2. MySQL 저장 (age, gender 추가)
-    hashed_password = get_password_hash(user.password)
     new_user = User(
         username=user.username, 
         password_hash=hashed_password,
         age=user.age,          # [NEW]
         gender=user.gender     # [NEW]
     )
-    
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    # id 를 받아야 이벤트에 넣을 수 있으므로 커밋 전에 flush
+    await db.flush()
 
-    # 3. Neo4j 노드 생성 (age, gender 속성 추가!)
-    try:
-        query = """
-        CREATE (u:User {
-            user_id: $uid, 
-            username: $uname, 
-            age: $age, 
-            gender: $gender,
-            created_at: datetime()
-        })
-        RETURN u
-        """
-        graph_session.run(
-            query, 
-            uid=new_user.id, 
-            uname=new_user.username,
-            age=new_user.age,       
-            gender=new_user.gender  
-        )
-        print(f" Neo4j: User 노드 생성 완료 (ID: {new_user.id}, Age: {new_user.age})")
-    except Exception as e:
-        print(f" Neo4j 에러: {e}")
-        # Neo4j 실패 시 롤백 로직이 필요할 수 있음
+    # 3. Neo4j 반영용 아웃박스 이벤트를 같은 트랜잭션에 기록
+    #    → 유저와 이벤트가 함께 커밋되거나 함께 롤백됨 (둘 중 하나만 남는 일이 없음)
+    db.add(OutboxEvent(**user_created_event(new_user)))
+    await db.commit()
+    return new_user
+
+
+@router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def create_user(
+    user: UserCreate, 
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 비밀번호 해시는 전용 풀에서 (bcrypt 가 요청 스레드풀 자리를 차지하지 않도록)
+    hashed_password = await get_password_hash_async(user.password)
+
+    # 1~3. MySQL 저장 + 아웃박스 기록 (비동기 드라이버)
+    new_user = await _create_mysql_user(user, hashed_password, db)
+
+    # Neo4j User 노드는 아웃박스 릴레이가 UNWIND 로 모아서 생성 (응답은 기다리지 않음)
+    outbox_relay.notify()
 
     return new_user
 
@@ -73,12 +72,17 @@ class LoginRequest(BaseModel):
     password: str
 
 @router.post("/login")
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
-    # 1. 유저 조회
-    user = db.query(User).filter(User.username == login_data.username).first()
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    # 1. 유저 조회 (비동기 드라이버)
+    user = await _find_user(db, login_data.username)
+    # 읽기만 했으므로 트랜잭션을 끝내 연결을 풀로 돌려준 뒤 bcrypt 검증
+    # (세션에서 떼어 두면 rollback 후에도 읽어 온 값이 그대로 남음)
+    if user:
+        db.expunge(user)
+    await db.rollback()
     
-    # 2. 아이디/비번 검증
-    if not user or not verify_password(login_data.password, user.password_hash):
+    # 2. 아이디/비번 검증 (bcrypt 는 해시 전용 풀에서)
+    if not user or not await verify_password_async(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="아이디 또는 비밀번호가 잘못되었습니다.",
@@ -1,16 +1,25 @@
 # app/api/v2/deps.py
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import JWTError, jwt
-from app.utils.security import SECRET_KEY, ALGORITHM
+from app.utils.security import SECRET_KEY, ALGORITHM, token_cache, is_admin_token
 
 # 토큰을 헤더에서 꺼내주는 도구
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v2/auth/login")
+# 로그인 없이도 되는 API 에서 토큰이 있으면 꺼내는 용도 (없으면 None)
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v2/auth/login", auto_error=False)
+# 관리자 전용 API 용 내부 토큰 헤더 (ADMIN_TOKEN)
+admin_token_header = APIKeyHeader(name="X-Admin-Token", auto_error=False)
 
-def get_current_user_info(token: str = Depends(oauth2_scheme)):
+async def get_current_user_info(token: str = Depends(oauth2_scheme)):
     """
     토큰을 해석해서 그 안에 들어있는 user_id와 username을 꺼내는 함수
+    한 번 검증한 토큰은 exp 까지 캐시에서 바로 꺼낸다 (서명 검증/디코딩 생략)
     """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="자격 증명이 유효하지 않습니다 (토큰 오류)",
@@ -24,8 +33,20 @@ def get_current_user_info(token: str = Depends(oauth2_scheme)):
         
         if username is None or user_id is None:
             raise credentials_exception
-            
-        return {"id": user_id, "username": username}
+
+        user = {"id": user_id, "username": username}
+        # exp 가 없는 토큰은 캐시하지 않음 (만료 시점을 알 수 없으므로)
+        if payload.get("exp") is not None:
+            token_cache.put(token, float(payload["exp"]), user)
+        return dict(user)
         
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+
+async def require_admin(admin_token: str = Depends(admin_token_header)):
+    """
+    관리자 전용 API 가드: X-Admin-Token 이 ADMIN_TOKEN 과 같아야 통과 (일반 유저 JWT 로는 불가)
+    """
+    if not is_admin_token(admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="관리자 전용 API 입니다.")
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.database import get_async_graph_db, db_pool_stats
+from app.services import context_graph, tag_index, graph_view
+from app.services.popularity import popularity, WINDOWS
+from app.services.order_log import order_log
+from app.services.outbox_relay import outbox_relay
+from app.services.hf_llm import get_scheduler, get_prefill_stats, get_assist_stats
+from app.services.llm_cache import advice_cache
+from app.utils.security import token_cache, BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+from app.api.v2.deps import require_admin
+
+# 내부 상태 조회 + 스냅샷 재구성(그래프 전체 스캔)이라 전부 관리자 전용 (X-Admin-Token)
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/llm-stats")
+def llm_stats():
+    """
+    LLM 스케줄러 상태 (대기열 깊이, 대기 시간, 처리량, 지연시간) + 설명 캐시 적중률 + prefill 토큰/시간
+    + assisted generation 수락률
+    """
+    stats = get_scheduler().stats()
+    stats["cache"] = advice_cache.stats()
+    stats["prefill"] = get_prefill_stats()
+    stats["assisted"] = get_assist_stats()
+    return stats
+
+
+@router.get("/context-graph")
+def context_graph_stats():
+    """
+    상황 추천용 메모리 그래프 스냅샷 상태 (메뉴/간선 수, 경과 시간)
+    """
+    return context_graph.get_stats()
+
+
+@router.post("/context-graph/reload")
+async def reload_context_graph(graph_session=Depends(get_async_graph_db)):
+    """
+    그래프 데이터를 바꾼 뒤(import 스크립트 등) 호출하면 스냅샷을 바로 다시 만든다
+    """
+    context_graph.invalidate()
+    await context_graph.get_context_graph(graph_session)
+    return context_graph.get_stats()
+
+
+@router.get("/tag-index")
+def tag_index_stats():
+    """
+    태그 겹침 인덱스 상태 (메뉴/태그 수, 이웃 간선 수)
+    """
+    return tag_index.get_stats()
+
+
+@router.get("/popular-menus")
+def popular_menus(window: str = "all", k: int = 5):
+    """
+    인기 메뉴 상위 k개 (window: all = 전체 기간, 7d = 최근 7일, 1h = 현재 시간대)
+    """
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window 는 {', '.join(WINDOWS)} 중 하나여야 합니다.")
+    ranked = popularity.top(k, window=window)
+    return {
+        "window": window,
+        "menus": [{"menu": menu, "orders": orders} for menu, orders in ranked],
+        "stats": popularity.stats(),
+    }
+
+
+@router.get("/order-log")
+def order_log_stats():
+    """
+    주문 write-behind 상태 (미반영 주문 수, 반영 배치 수/평균 크기, 실패 횟수)
+    """
+    return order_log.stats()
+
+
+@router.get("/graph-view-cache")
+def graph_view_cache_stats():
+    """
+    /graph-view 렌더링 캐시 상태 (현재 그래프 버전, 렌더링/재사용 횟수, 마지막 렌더링 시간)
+    """
+    return graph_view.get_stats()
+
+
+@router.get("/auth-stats")
+def auth_stats():
+    """
+    인증 경로 상태 (검증 토큰 캐시 적중률, bcrypt cost / 해시 전용 스레드 수)
+    """
+    return {
+        "token_cache": token_cache.stats(),
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "hash_workers": PASSWORD_HASH_WORKERS,
+    }
+
+
+@router.get("/outbox")
+def outbox_stats():
+    """
+    회원가입 아웃박스 릴레이 상태 (미처리 건수, 가장 오래된 미처리 이벤트의 지연 시간, 실패 횟수)
+    """
+    return outbox_relay.stats()
+
+
+@router.get("/db-pool")
+def db_pool():
+    """
+    auth 용 MySQL 비동기 커넥션 풀 상태 (checkout/checkin 횟수, 사용 중 연결 수, 연결 획득 대기 시간)
+    """
+    return db_pool_stats.stats()
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from app.database import get_db, get_graph_db
+from app.database import get_db, get_async_graph_db
 from app.api.v2.deps import get_current_user_info
+from app.services import metrics
+from app.services.popularity import popularity
+from app.services.order_log import order_log, coalesce_orders, ORDER_BATCH_QUERY, WRITE_BEHIND
 
 router = APIRouter()
 
@@ -10,34 +14,32 @@ class OrderRequest(BaseModel):
     menu_name: str
 
 @router.post("/order")
-def create_order(
+async def create_order(
     order: OrderRequest,
     current_user: dict = Depends(get_current_user_info), # 토큰 검사
-    graph_session = Depends(get_graph_db)                # Neo4j 연결
+    graph_session = Depends(get_async_graph_db)          # Neo4j 연결
 ):
     user_id = current_user["id"]
     menu_name = order.menu_name
 
     # ====================================================
-    #  Neo4j 그래프 업데이트
-    # 1. 유저 노드 찾기 (MATCH)
-    # 2. 메뉴 노드 찾거나 만들기 (MERGE)
-    # 3. 둘 사이에 'ORDERED' 관계 선 긋기 (MERGE)
-    # 4. 주문 횟수(count) 1 증가시키기
+    #  Neo4j 그래프 업데이트 (write-behind)
+    # 1. 주문을 로컬 로그에 기록(fsync)하고 바로 응답
+    # 2. 백그라운드 플러셔가 (유저, 메뉴) 별로 합쳐서 한 번의 UNWIND 트랜잭션으로
+    #    ORDERED 관계 생성 / 주문 횟수(count) 증가
     # ====================================================
-    query = """
-    MATCH (u:User {user_id: $uid})
-    MERGE (m:Menu {name: $menu_name})
-    MERGE (u)-[r:ORDERED]->(m)
-    ON CREATE SET r.count = 1, r.last_eaten = datetime()
-    ON MATCH SET r.count = r.count + 1, r.last_eaten = datetime()
-    RETURN u, r, m
-    """
-    
-    graph_session.run(query, uid=user_id, menu_name=menu_name)
+    if WRITE_BEHIND:
+        await run_in_threadpool(order_log.append, user_id, menu_name)
+    else:
+        rows = coalesce_orders([{"uid": user_id, "menu": menu_name, "seq": order_log.next_seq()}])
+        with metrics.cypher("order_batch"):
+            await graph_session.run(ORDER_BATCH_QUERY, rows=rows)
+
+    # 인기 메뉴 카운터 증분 갱신 (베스트셀러 폴백이 그래프 전체를 집계하지 않도록)
+    popularity.record(menu_name)
 
     return {
         "status": "success",
-        "message": f"'{menu_name}' 주문이 그래프에 기록되었습니다.",
+        "message": f"'{menu_name}' 주문이 기록되었습니다.",
         "user": current_user["username"]
     }
\ No newline at end of file
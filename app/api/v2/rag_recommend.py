@@ -1,32 +1,32 @@
+import logging
 from fastapi import APIRouter, Depends
-from app.database import get_graph_db
-from app.api.v2.deps import get_current_user_info
-from app.services.hf_llm import ask_hf_llama 
+from pydantic import BaseModel
+from app.database import get_async_graph_db
+from app.api.v2.deps import get_current_user_info, require_admin
+from app.services.hf_llm import ask_hf_llama_async
+from app.services import tag_index, graph_view
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+class MenuTagsRequest(BaseModel):
+    menu_name: str
+    tags: list[str]
+
+
 @router.get("/rag-recommend")
-def graph_rag_recommend(
+async def graph_rag_recommend(
     current_user: dict = Depends(get_current_user_info),
-    graph_session = Depends(get_graph_db)
+    graph_session = Depends(get_async_graph_db)
 ):
     user_id = current_user["id"]
     username = current_user["username"]
 
-    # 1. Retrieval: 그래프 탐색 (Graph Traversal)
+    # 1. Retrieval: 태그 겹침 인덱스 조회
     # 논리: 내가 주문한 메뉴들 -> 그 메뉴들이 가진 태그(특징) -> 그 태그를 가진 다른 메뉴 추천
-    query = """
-    MATCH (u:User {user_id: $uid})-[:ORDERED]->(eaten:Menu)-[:HAS_TAG]->(t:Tag)<-[:HAS_TAG]-(rec:Menu)
-    WHERE NOT (u)-[:ORDERED]->(rec)
-    RETURN 
-        rec.name as menu, 
-        collect(DISTINCT t.name) as reasons, 
-        count(t) as score
-    ORDER BY score DESC
-    LIMIT 3
-    """
-    
-    result = graph_session.run(query, uid=user_id)
+    # (메뉴별 이웃 목록은 미리 계산해 두고, 여기서는 먹은 메뉴들의 이웃 점수만 합산)
+    result = await tag_index.recommend_for_user(graph_session, user_id, k=3)
     
     # 데이터를 LLM이 이해하기 쉬운 문장으로 변환 (Context Construction)
     rag_context = []
@@ -46,13 +46,28 @@ def graph_rag_recommend(
         return {"message": "데이터가 부족해서 RAG 추론이 어렵습니다. 주문을 더 해주세요!"}
 
     # 2. Generation: LLM에게 맥락 주입
-    print(f" [Graph RAG Context]: {rag_context}")
+    logger.debug("🔎 [Graph RAG Context]: %s", rag_context)
     
-    llm_reason = ask_hf_llama(top_menus)
+    llm_reason = await ask_hf_llama_async(top_menus, endpoint="rag_recommend")
 
     return {
         "type": "Graph-RAG",
         "user_context": f"{username}님의 취향 그래프 분석 결과",
         "retrieved_knowledge": rag_context, 
         "llm_advice": llm_reason            
-    }
\ No newline at end of file
+    }
+
+
+@router.put("/menu-tags", dependencies=[Depends(require_admin)])
+async def update_menu_tags(
+    request: MenuTagsRequest,
+    graph_session = Depends(get_async_graph_db)
+):
+    """
+    메뉴의 태그를 교체하고, 태그 인덱스는 영향받는 메뉴만 다시 계산
+    모든 유저의 추천 결과가 바뀌므로 관리자 전용 (X-Admin-Token)
+    """
+    updated = await tag_index.update_menu_tags(graph_session, request.menu_name, request.tags)
+    # 관계 수가 같아도 그래프 뷰 캐시가 새로 렌더링되도록
+    graph_view.mark_changed()
+    return {"status": "success", "menu": request.menu_name, "recomputed_menus": updated}
@@ -1,7 +1,13 @@
+import logging
 from fastapi import APIRouter, Depends, Body
 from pydantic import BaseModel
-from app.database import get_graph_db
-from app.services.hf_llm import ask_hf_llama
+from app.database import get_async_graph_db
+from app.services import context_graph, metrics
+from app.services.popularity import popularity, reconcile_from_graph_async
+from app.services.hf_llm import ask_hf_llama_async
+from app.api.v2.streaming import advice_sse_response
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -15,13 +21,13 @@ class RecommendationRequest(BaseModel):
     alcohol: str | None = None
     category: str | None = None
 
-@router.post("/rag-weighted-recommend")
-async def recommend_by_context(request: RecommendationRequest, graph_session=Depends(get_graph_db)):
-    conditions = request.dict(exclude_none=True)
-
+async def retrieve_context_menus(request: RecommendationRequest, graph_session):
+    """
+    조건 매핑 + 그래프 검색 (+ 베스트셀러 폴백) 단계. (조건, 메뉴 목록, 안내 메시지) 를 반환
+    """
     # 1. 입력값 딕셔너리로 변환
     conditions = request.dict(exclude_none=True)
-    print(f"📡 [요청 수신]: {conditions}")
+    logger.debug("📡 [요청 수신]: %s", conditions)
 
     # ==========================================
     # [Value Mapping] 프론트엔드 값 -> DB 값 보정
@@ -60,59 +66,17 @@ async def recommend_by_context(request: RecommendationRequest, graph_session=Dep
     if "alcohol" in conditions and conditions["alcohol"] in alcohol_map:
         conditions["alcohol"] = alcohol_map[conditions["alcohol"]]
 
-    print(f"🔧 [DB 매핑 후 조건]: {conditions}")
+    logger.debug("🔧 [DB 매핑 후 조건]: %s", conditions)
 
     # ==========================================
-    # [Core Logic] 하드코딩 점수 기반 쿼리
+    # [Core Logic] 메모리 그래프 스냅샷에서 조건별 점수 합산
     # ==========================================
-    # 설명: DB에 weight 속성이 없어도, 여기서 점수(THEN 3)를 강제로 줍니다.
-    
-    query = """
-    MATCH (m:Menu)
-    
-    // 1. 계절 (맞으면 2점)
-    OPTIONAL MATCH (m)<-[:GOOD_MATCH]-(:Context {value: $season})
-    WITH m, CASE WHEN $season IS NOT NULL THEN 2 ELSE 0 END AS s_score
-    
-    // 2. 날씨 (맞으면 3점)
-    OPTIONAL MATCH (m)<-[:GOOD_MATCH]-(:Context {value: $rain})
-    WITH m, s_score, CASE WHEN $rain IS NOT NULL THEN 3 ELSE 0 END AS w_score
-    
-    // 3. 시간대 (맞으면 2점)
-    OPTIONAL MATCH (m)<-[:GOOD_MATCH]-(:Context {value: $time})
-    WITH m, s_score, w_score, CASE WHEN $time IS NOT NULL THEN 2 ELSE 0 END AS t_score
-    
-    // 4. 인원수 (맞으면 1점)
-    OPTIONAL MATCH (m)<-[:GOOD_MATCH]-(:Context {value: $people})
-    WITH m, s_score, w_score, t_score, CASE WHEN $people IS NOT NULL THEN 1 ELSE 0 END AS p_score
-    
-    // 5. 주류 (강력 추천 +5점)
-    OPTIONAL MATCH (m)<-[:PAIRED_WITH]-(:Menu {name: $alcohol})
-    WITH m, s_score, w_score, t_score, p_score, CASE WHEN $alcohol IS NOT NULL THEN 5 ELSE 0 END AS a_score
+    # 스냅샷이 오래됐을 때만 Neo4j 를 다시 읽는다
+    graph = await context_graph.get_context_graph(graph_session)
+    with metrics.stage("rank"):
+        top_menus = graph.score(conditions, k=3)
 
-    // 6. 총점 계산
-    WITH m, (s_score + w_score + t_score + p_score + a_score) AS total_score
-    
-    // 하나라도 점수를 얻은 메뉴만 조회
-    WHERE total_score > 0
-    RETURN m.name AS menu, total_score
-    ORDER BY total_score DESC
-    LIMIT 3
-    """
-
-    # 쿼리에 넣을 파라미터 준비 (없는 키는 None 처리)
-    params = {
-        "season": conditions.get("season"),
-        "rain": conditions.get("rain"),
-        "time": conditions.get("time"),
-        "people": conditions.get("people"),
-        "alcohol": conditions.get("alcohol")
-    }
-
-    result = graph_session.run(query, **params)
-    
     # 결과 변환
-    top_menus = [{"menu": r["menu"], "weight_sum": r["total_score"]} for r in result]
     rag_context = [f"메뉴 '{item['menu']}' (추천 점수: {item['weight_sum']}점)" for item in top_menus]
 
     # ==========================================
@@ -121,25 +85,46 @@ async def recommend_by_context(request: RecommendationRequest, graph_session=Dep
     message = "선택하신 조건에 딱 맞는 메뉴입니다!"
     
     if not top_menus:
-        print("⚠️ 검색 결과 0건 -> 베스트셀러 모드 작동")
+        logger.info("⚠️ 검색 결과 0건 -> 베스트셀러 모드 작동")
         message = "조건에 완벽히 맞는 메뉴가 없어서, 요즘 인기 있는 메뉴를 추천해 드려요!"
         
-        fallback_query = """
-        MATCH (m:Menu)<-[r:ORDERED]-()
-        RETURN m.name AS menu, count(r) AS score
-        ORDER BY score DESC LIMIT 3
-        """
-        fb_result = graph_session.run(fallback_query)
-        top_menus = [{"menu": r["menu"], "weight_sum": r["score"]} for r in fb_result]
+        # 주문 때마다 갱신되는 인기 카운터에서 바로 읽음 (최근 7일 순위, 3개가 안 되면 전체 기간으로 채움)
+        if not popularity.loaded():
+            await reconcile_from_graph_async(graph_session)
+        ranked = popularity.top_filled(3, windows=("7d", "all"))
+        top_menus = [{"menu": menu, "weight_sum": orders} for menu, orders in ranked]
         rag_context = [f"인기 메뉴 '{item['menu']}' (주문 수: {item['weight_sum']}회)" for item in top_menus]
 
+    return conditions, top_menus, message
+
+
+@router.post("/rag-weighted-recommend")
+async def recommend_by_context(request: RecommendationRequest, graph_session=Depends(get_async_graph_db)):
+    conditions, top_menus, message = await retrieve_context_menus(request, graph_session)
+
     # ==========================================
     # [LLM] 설명 생성 요청
     # ==========================================
-    llm_reason = ask_hf_llama(top_menus, conditions=conditions)
+    # 생성은 LLM 전용 워커 스레드에서 처리되고, 여기서는 결과만 기다린다
+    llm_reason = await ask_hf_llama_async(top_menus, conditions=conditions, endpoint="rag_weighted")
 
     return {
         "type": "Context-Aware RAG",
         "menus": [m['menu'] for m in top_menus],
         "llm_advice": llm_reason # "현재 비가 오고..." 멘트 생성
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/rag-weighted-recommend/stream")
+async def recommend_by_context_stream(request: RecommendationRequest, graph_session=Depends(get_async_graph_db)):
+    """
+    SSE 버전: 검색된 메뉴를 먼저 보내고(event: menus), 설명은 토큰 단위로 흘려보낸다(event: token → done)
+    """
+    conditions, top_menus, message = await retrieve_context_menus(request, graph_session)
+
+    head = {
+        "type": "Context-Aware RAG",
+        "menus": [m['menu'] for m in top_menus],
+        "message": message,
+    }
+    return advice_sse_response(head, top_menus, conditions=conditions, endpoint="rag_weighted")
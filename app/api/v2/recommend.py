@@ -1,33 +1,22 @@
 from fastapi import APIRouter, Depends
-from app.database import get_graph_db
+from app.database import get_async_graph_db
 from app.api.v2.deps import get_current_user_info
-from app.services.hf_llm import ask_hf_llama
+from app.services import metrics
+from app.db.queries import SIMILAR_USER_QUERY
+from app.services.hf_llm import ask_hf_llama_async
+from app.api.v2.streaming import advice_sse_response, static_sse_response
 
 router = APIRouter()
 
-@router.get("/recommend")
-def recommend_menus(
-    current_user: dict = Depends(get_current_user_info),
-    graph_session = Depends(get_graph_db)
-):
-    user_id = current_user["username"]
-    
-    # 쿼리 수정: 추천된 메뉴(rec_menu)가 '나의 어떤 메뉴(my_menu)' 때문에 추천됐는지(history) 같이 가져옴
-    query = """
-    MATCH (me:User {username: $uid})-[:ORDERED]->(my_menu:Menu)
-    MATCH (other:User)-[:ORDERED]->(my_menu)
-    WHERE other.username <> $uid
-    MATCH (other)-[:ORDERED]->(rec_menu:Menu)
-    WHERE NOT (me)-[:ORDERED]->(rec_menu)
-    RETURN 
-        rec_menu.name AS menu, 
-        count(*) AS score,
-        collect(DISTINCT my_menu.name)[0..3] AS history  // 내가 먹었던 메뉴 3개까지만 가져오기
-    ORDER BY score DESC
-    LIMIT 5
+NO_DATA_ADVICE = "주문 이력이 쌓이면 비슷한 입맛의 유저를 찾아드릴게요!"
+
+
+async def retrieve_similar_user_menus(graph_session, user_id: str):
     """
-    
-    result = graph_session.run(query, uid=user_id)
+    비슷한 유저 탐색 단계. (추천 메뉴 목록, LLM 에 넘길 강제 조건) 을 반환
+    """
+    with metrics.cypher("similar_users"):
+        result = await graph_session.run(SIMILAR_USER_QUERY, uid=user_id)
     
     top_menus = []
     my_history = [] # 내가 먹은 메뉴들 저장용
@@ -37,14 +26,8 @@ def recommend_menus(
         if not my_history: 
             my_history = record["history"] # 첫 번째 기록에서 내 과거 이력 가져오기
 
-    # 데이터 부족 시 처리
     if not top_menus:
-        return {
-            "type": "fallback",
-            "message": "데이터 부족",
-            "menus": [],
-            "llm_advice": "주문 이력이 쌓이면 비슷한 입맛의 유저를 찾아드릴게요!"
-        }
+        return top_menus, None
 
     # ✅ LLM에게 보낼 '강제 조건' (2번 로직: 주문 데이터 기반)
     # 내가 먹은 메뉴(history)를 문자열로 만들어서 보냄
@@ -54,12 +37,52 @@ def recommend_menus(
         "logic": "User Similarity",  # 모드 식별자
         "history": history_str       # "현재 ~~메뉴를 시켜 드셨는데" 에 들어갈 내용
     }
+    return top_menus, forced_conditions
 
-    llm_reason = ask_hf_llama(top_menus, conditions=forced_conditions)
+
+@router.get("/recommend")
+async def recommend_menus(
+    current_user: dict = Depends(get_current_user_info),
+    graph_session = Depends(get_async_graph_db)
+):
+    top_menus, forced_conditions = await retrieve_similar_user_menus(graph_session, current_user["username"])
+
+    # 데이터 부족 시 처리
+    if not top_menus:
+        return {
+            "type": "fallback",
+            "message": "데이터 부족",
+            "menus": [],
+            "llm_advice": NO_DATA_ADVICE
+        }
+
+    llm_reason = await ask_hf_llama_async(top_menus, conditions=forced_conditions, endpoint="recommend")
 
     return {
         "type": "personalized",
         "message": "비슷한 유저 추천 결과",
         "menus": [item['menu'] for item in top_menus],
         "llm_advice": llm_reason
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/recommend/stream")
+async def recommend_menus_stream(
+    current_user: dict = Depends(get_current_user_info),
+    graph_session = Depends(get_async_graph_db)
+):
+    """
+    SSE 버전: 추천 메뉴를 먼저 보내고, 설명은 토큰 단위로 흘려보낸다
+    """
+    top_menus, forced_conditions = await retrieve_similar_user_menus(graph_session, current_user["username"])
+
+    if not top_menus:
+        head = {"type": "fallback", "message": "데이터 부족", "menus": []}
+        return static_sse_response(head, NO_DATA_ADVICE)
+
+    head = {
+        "type": "personalized",
+        "message": "비슷한 유저 추천 결과",
+        "menus": [item['menu'] for item in top_menus],
+    }
+    return advice_sse_response(head, top_menus, conditions=forced_conditions, endpoint="recommend")
@@ -0,0 +1,60 @@
+import logging
+import json
+from fastapi.responses import StreamingResponse
+from app.services.hf_llm import AdviceStream
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data: dict) -> str:
+    """
+    Server-Sent Events 한 건 (event + JSON data)
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def static_sse_response(head: dict, advice: str) -> StreamingResponse:
+    """
+    LLM 을 거치지 않는 고정 문구 응답 (advice_sse_response 와 같은 이벤트 순서)
+    """
+    async def events():
+        yield sse_event("menus", head)
+        yield sse_event("token", {"text": advice})
+        yield sse_event("done", {"llm_advice": advice})
+
+    return _sse_response(events())
+
+
+def advice_sse_response(head: dict, top_menus: list[dict], conditions: dict = None, endpoint: str = None) -> StreamingResponse:
+    """
+    추천 결과(head)를 첫 이벤트로 바로 보내고, 이어서 LLM 설명을 토큰 단위로 스트리밍
+
+    - event: menus → head 그대로
+    - event: token → {"text": 조각}
+    - event: done  → {"llm_advice": 최종 문구} (비스트리밍 응답의 llm_advice 와 동일)
+    - event: error → 생성 도중 실패한 경우
+    """
+    # 대기열이 가득 찬 경우 스트림을 열기 전에 LLMQueueFull 이 나서 503 으로 응답된다
+    stream = AdviceStream(top_menus, conditions, endpoint=endpoint)
+
+    async def events():
+        yield sse_event("menus", head)
+        try:
+            async for kind, text in stream:
+                if kind == "token":
+                    yield sse_event("token", {"text": text})
+                else:
+                    yield sse_event("done", {"llm_advice": text})
+        except Exception as e:
+            logger.error("❌ 설명 스트리밍 실패: %s", e)
+            yield sse_event("error", {"detail": "설명 생성 중 오류가 발생했습니다."})
+
+    return _sse_response(events())
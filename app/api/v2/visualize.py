@@ -1,55 +1,72 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse, HTMLResponse
-from app.database import get_graph_db
-from pyvis.network import Network
-import os
+import hashlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from app.database import get_async_graph_db
+from app.api.v2.deps import get_current_user_info, oauth2_scheme_optional, admin_token_header
+from app.utils.security import is_admin_token
+from app.services import graph_view
 
 router = APIRouter()
 
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+
+
 @router.get("/graph-view")
-def visualize_graph(graph_session = Depends(get_graph_db)):
-    # 1. 폴더 확인
-    if not os.path.exists("static"):
-        os.makedirs("static")
-
-    # 2. 데이터 가져오기 (최대 100개)
-    query = "MATCH (n)-[r]->(m) RETURN n, r, m LIMIT 100"
-    result = graph_session.run(query)
-    
-    data_list = list(result)
-    
-    if not data_list:
+async def visualize_graph(request: Request, graph_session = Depends(get_async_graph_db)):
+    """
+    전체 그래프 미리보기 (관계 최대 GRAPH_VIEW_LIMIT 개)
+    그래프 버전이 같으면 이미 렌더링한 파일을 그대로 주고, 브라우저가 가진 버전이면 304
+    """
+    version = await graph_view.get_version(graph_session)
+    etag = f'"graph-{version}"'
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    path = await graph_view.render_overview(graph_session, version)
+    if path is None:
         return HTMLResponse(content="<h1> 데이터 없음</h1>")
+    return FileResponse(path, media_type="text/html", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+@router.get("/graph-data")
+async def graph_data(
+    request: Request,
+    user_id: Optional[int] = None,
+    menu: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    admin_token: Optional[str] = Depends(admin_token_header),
+    graph_session = Depends(get_async_graph_db)
+):
+    """
+    vis.js 클라이언트용 부분 그래프 JSON
+    - user_id : 해당 유저 주변 관계 (유저 이름/주문 이력이 보이므로 본인 토큰 또는 관리자 토큰 필요)
+    - menu    : 해당 메뉴 주변 관계
+    - 둘 다 없으면 전체 관계를 skip/limit 페이지 단위로
+    """
+    if user_id is not None and not is_admin_token(admin_token):
+        if token is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="유저 그래프는 로그인 후 조회할 수 있습니다.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        current_user = await get_current_user_info(token)
+        if current_user["id"] != user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인 그래프만 조회할 수 있습니다.")
+
+    version = await graph_view.get_version(graph_session)
+    # 메뉴 이름(한글)은 헤더에 그대로 못 넣으므로 요청 파라미터는 해시로
+    params = hashlib.sha1(f"{user_id}|{menu}|{skip}|{limit}".encode("utf-8")).hexdigest()[:12]
+    etag = f'"data-{version}-{params}"'
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    # 3. 그래프 생성
-    net = Network(height="750px", width="100%", bgcolor="#222222", font_color="white")
-    net.barnes_hut()
-
-    for record in data_list:
-        n = record["n"]
-        m = record["m"]
-        r = record["r"]
-
-        # 노드 1
-        n_label = list(n.labels)[0] if n.labels else "Node"
-        n_title = n.get("name") or n.get("username") or "Unknown"
-        n_id = str(n.element_id) if hasattr(n, 'element_id') else str(n.id) # ID 처리 강화
-        n_color = "#97C2FC" if n_label == "User" else ("#FFD700" if n_label == "Menu" else "#90EE90")
-        
-        net.add_node(n_id, label=n_title, title=f"{n_label}: {n_title}", color=n_color, group=n_label)
-
-        # 노드 2
-        m_label = list(m.labels)[0] if m.labels else "Node"
-        m_title = m.get("name") or m.get("username") or "Unknown"
-        m_id = str(m.element_id) if hasattr(m, 'element_id') else str(m.id) # ID 처리 강화
-        m_color = "#97C2FC" if m_label == "User" else ("#FFD700" if m_label == "Menu" else "#90EE90")
-
-        net.add_node(m_id, label=m_title, title=f"{m_label}: {m_title}", color=m_color, group=m_label)
-
-        # 엣지 추가 (type(r) -> r.type)
-        net.add_edge(n_id, m_id, title=r.type, label=r.type)
-
-    # 4. 저장 및 반환
-    output_path = "static/graph.html"
-    net.save_graph(output_path)
-    return FileResponse(output_path)
\ No newline at end of file
+    subgraph = await graph_view.fetch_subgraph(graph_session, user_id=user_id, menu_name=menu, skip=skip, limit=limit)
+    subgraph["version"] = version
+    return JSONResponse(content=subgraph, headers={"ETag": etag, "Cache-Control": "no-cache"})
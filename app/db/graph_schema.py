@@ -0,0 +1,152 @@
+import logging
+import os
+
+from app.db.queries import SIMILAR_USER_QUERY
+from app.services.context_graph import CONTEXT_EDGES_QUERY, ALCOHOL_EDGES_QUERY
+from app.services.tag_index import MENU_TAGS_QUERY, EATEN_MENUS_QUERY
+from app.services.popularity import ORDER_TOTALS_QUERY
+from app.services.order_log import ORDER_BATCH_QUERY
+from app.services.outbox_relay import USER_BATCH_QUERY
+from app.services.graph_view import GRAPH_VERSION_QUERY, OVERVIEW_QUERY, USER_EGO_QUERY, MENU_EGO_QUERY
+
+logger = logging.getLogger(__name__)
+
+# 서버 시작 시 스키마를 적용할지 (readiness 의 Neo4j 워밍업에서 사용)
+GRAPH_SCHEMA_ON_STARTUP = os.getenv("GRAPH_SCHEMA_ON_STARTUP", "1") == "1"
+
+# ==========================================
+# 1. 제약조건 / 인덱스 정의
+# ==========================================
+# 이름 → 생성 쿼리. 모두 IF NOT EXISTS 라서 여러 번 실행해도 안전함
+CONSTRAINTS = {
+    "user_id_unique": "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.user_id IS UNIQUE",
+    "user_username_unique": "CREATE CONSTRAINT user_username_unique IF NOT EXISTS FOR (u:User) REQUIRE u.username IS UNIQUE",
+    "menu_name_unique": "CREATE CONSTRAINT menu_name_unique IF NOT EXISTS FOR (m:Menu) REQUIRE m.name IS UNIQUE",
+    # 그래프 버전 노드는 하나뿐 (여러 워커가 동시에 MERGE 해도 중복 생성되지 않도록)
+    "graph_version_unique": "CREATE CONSTRAINT graph_version_unique IF NOT EXISTS FOR (v:GraphVersion) REQUIRE v.id IS UNIQUE",
+}
+
+# import_var_data.py 가 만드는 상황 라벨 (value 속성으로 MERGE)
+CONTEXT_LABELS = ["Alcohol", "Category", "People", "Price", "Rain", "Season", "Time"]
+
+INDEXES = {
+    "context_value": "CREATE INDEX context_value IF NOT EXISTS FOR (c:Context) ON (c.value)",
+    "tag_name": "CREATE INDEX tag_name IF NOT EXISTS FOR (t:Tag) ON (t.name)",
+}
+for _label in CONTEXT_LABELS:
+    INDEXES[f"{_label.lower()}_value"] = (
+        f"CREATE INDEX {_label.lower()}_value IF NOT EXISTS FOR (c:{_label}) ON (c.value)"
+    )
+
+
+# ==========================================
+# 2. 실행 계획 점검 대상 쿼리
+# ==========================================
+# 이름 → (쿼리, 더미 파라미터). EXPLAIN 만 하므로 실제로 실행되지는 않음
+HOT_QUERIES = {
+    "signup": (USER_BATCH_QUERY, {"rows": [{"uid": 0, "uname": "", "age": 0, "gender": ""}]}),
+    "order": (ORDER_BATCH_QUERY, {"rows": [{"uid": 0, "menu": "", "seqs": [0], "seq": 0}]}),
+    "rag_recommend": (EATEN_MENUS_QUERY, {"uid": 0}),
+    "recommend": (SIMILAR_USER_QUERY, {"uid": ""}),
+    "context_graph_edges": (CONTEXT_EDGES_QUERY, {}),
+    "context_graph_alcohol": (ALCOHOL_EDGES_QUERY, {}),
+    "tag_index": (MENU_TAGS_QUERY, {}),
+    "popularity_reconcile": (ORDER_TOTALS_QUERY, {}),
+    "graph_version": (GRAPH_VERSION_QUERY, {}),
+    "graph_overview": (OVERVIEW_QUERY, {"skip": 0, "limit": 1}),
+    "graph_user_ego": (USER_EGO_QUERY, {"uid": 0, "skip": 0, "limit": 1}),
+    "graph_menu_ego": (MENU_EGO_QUERY, {"menu_name": "", "skip": 0, "limit": 1}),
+}
+
+# 전체 간선을 훑는 게 원래 의도인 쿼리 (라벨 스캔이 나와도 경고하지 않음)
+FULL_SCAN_ALLOWED = {
+    "context_graph_edges", "context_graph_alcohol", "tag_index", "popularity_reconcile", "graph_overview",
+}
+
+SCAN_OPERATORS = ("NodeByLabelScan", "AllNodesScan")
+
+
+def apply_schema(session) -> list[str]:
+    """
+    제약조건/인덱스를 생성하고, 실패한 항목의 에러 메시지 목록을 반환
+    """
+    errors = []
+    for name, query in {**CONSTRAINTS, **INDEXES}.items():
+        try:
+            session.run(query).consume()
+        except Exception as e:
+            # 기존 데이터에 중복이 있으면 유니크 제약 생성이 실패함 → 나머지는 계속 진행
+            errors.append(f"{name}: {e}")
+            logger.error("❌ 스키마 적용 실패 (%s): %s", name, e)
+    return errors
+
+
+def verify_schema(session) -> dict:
+    """
+    정의한 제약조건/인덱스가 실제로 존재하고 ONLINE 상태인지 확인
+    반환: {"missing": [...], "not_online": [...]}
+    """
+    constraints = {record["name"] for record in session.run("SHOW CONSTRAINTS YIELD name")}
+    indexes = {
+        record["name"]: record["state"]
+        for record in session.run("SHOW INDEXES YIELD name, state")
+    }
+
+    missing = [name for name in CONSTRAINTS if name not in constraints]
+    missing += [name for name in INDEXES if name not in indexes]
+    # 유니크 제약도 내부적으로 같은 이름의 인덱스를 가짐
+    not_online = [
+        name for name in (*CONSTRAINTS, *INDEXES)
+        if name in indexes and indexes[name] != "ONLINE"
+    ]
+    return {"missing": missing, "not_online": not_online}
+
+
+def _plan_operators(plan) -> list[str]:
+    if plan is None:
+        return []
+    operators = [plan.get("operatorType", "")]
+    for child in plan.get("children", []):
+        operators += _plan_operators(child)
+    return operators
+
+
+def explain_hot_queries(session) -> dict:
+    """
+    핫 쿼리들을 EXPLAIN 해서 라벨 스캔/전체 스캔이 섞여 있는지 확인
+    반환: 쿼리 이름 → {"operators": [...], "scans": [...], "allowed": bool}
+    """
+    report = {}
+    for name, (query, params) in HOT_QUERIES.items():
+        summary = session.run(f"EXPLAIN {query}", **params).consume()
+        operators = _plan_operators(summary.plan)
+        # Neo4j 버전에 따라 "NodeByLabelScan@neo4j" 처럼 접미사가 붙음
+        scans = [op for op in operators if op.split("@")[0] in SCAN_OPERATORS]
+        report[name] = {
+            "operators": operators,
+            "scans": scans,
+            "allowed": name in FULL_SCAN_ALLOWED,
+        }
+    return report
+
+
+def bootstrap_schema(session, explain: bool = True) -> bool:
+    """
+    스키마 적용 → 검증 → (선택) 실행 계획 점검까지 한 번에 수행. 문제 없으면 True
+    """
+    ok = not apply_schema(session)
+
+    result = verify_schema(session)
+    if result["missing"] or result["not_online"]:
+        ok = False
+        logger.warning("⚠️ 스키마 검증 실패: 누락 %s, 미완료 %s", result["missing"], result["not_online"])
+    else:
+        logger.info("✅ 그래프 스키마 확인 완료 (제약 %d개, 인덱스 %d개)", len(CONSTRAINTS), len(INDEXES))
+
+    if explain:
+        for name, item in explain_hot_queries(session).items():
+            if item["scans"] and not item["allowed"]:
+                logger.warning("⚠️ [%s] 라벨 스캔 감지: %s", name, ", ".join(item["scans"]))
+
+    return ok
+
@@ -0,0 +1,26 @@
+# app/db/models/outbox.py
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from app.database import Base
+
+
+class OutboxEvent(Base):
+    """
+    MySQL → Neo4j 로 전달할 이벤트 (트랜잭션 아웃박스)
+
+    유저 저장과 같은 트랜잭션으로 기록되고, 릴레이가 Neo4j 에 반영한 뒤 processed_at 을 채운다
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(50), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON 문자열
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+    # 릴레이는 "미처리 + id 순" 으로만 읽음
+    __table_args__ = (Index("ix_outbox_pending", "processed_at", "id"),)
@@ -0,0 +1,16 @@
+# app/db/models/user.py
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+
+class User(Base):
+    """
+    회원 정보 (로그인/토큰 발급용). 그래프의 User 노드는 user_id = id 로 연결됨
+    """
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    username = Column(String(50), unique=True, index=True, nullable=False)
+    password_hash = Column(String(255), nullable=False)
+    age = Column(Integer, nullable=True)
+    gender = Column(String(10), nullable=True)
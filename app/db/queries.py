@@ -0,0 +1,27 @@
+# app/db/queries.py
+# 라우터와 스키마 점검(graph_schema)이 함께 쓰는 Cypher 쿼리 (db 계층이 API 모듈을 import 하지 않도록 여기에 둔다)
+
+# 그래프 변경 표시 (버전 노드 하나). 노드/관계 수가 그대로인 변경(가중치 재적재, 주문 수, 태그 교체, 유저 정보)도
+# /graph-view, /graph-data 캐시가 알아채도록 쓰는 쪽에서 올린다. 그래프에 저장되므로 워커가 여러 개여도 같은 값을 읽음
+BUMP_GRAPH_VERSION_QUERY = """
+    MERGE (v:GraphVersion {id: "graph"})
+    SET v.version = coalesce(v.version, 0) + 1
+"""
+# UNWIND 쓰기 쿼리 끝에 붙여서 같은 트랜잭션에서 한 번만 올린다 (행이 몇 개든 한 행으로 모은 뒤)
+WITH_GRAPH_VERSION_BUMP = "    WITH count(*) AS changed_rows" + BUMP_GRAPH_VERSION_QUERY
+
+# 나와 같은 메뉴를 주문한 유저들이 주문한 다른 메뉴
+# 추천된 메뉴(rec_menu)가 '나의 어떤 메뉴(my_menu)' 때문에 추천됐는지(history) 같이 가져옴
+SIMILAR_USER_QUERY = """
+    MATCH (me:User {username: $uid})-[:ORDERED]->(my_menu:Menu)
+    MATCH (other:User)-[:ORDERED]->(my_menu)
+    WHERE other.username <> $uid
+    MATCH (other)-[:ORDERED]->(rec_menu:Menu)
+    WHERE NOT (me)-[:ORDERED]->(rec_menu)
+    RETURN 
+        rec_menu.name AS menu, 
+        count(*) AS score,
+        collect(DISTINCT my_menu.name)[0..3] AS history  // 내가 먹었던 메뉴 3개까지만 가져오기
+    ORDER BY score DESC
+    LIMIT 5
+"""
@@ -1,23 +1,79 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import os
 
 # V1 라우터
 from app.api.v1.endpoints import condition_weight, menu_recommend
 
 # V2 라우터 (Auth, Order, Recommend, RAG, Weighted RAG)
-from app.api.v2 import auth, order, recommend, rag_recommend, rag_weighted, visualize
+from app.api.v2 import auth, order, recommend, rag_recommend, rag_weighted, visualize, monitor
 
-load_dotenv()
+# 추천용 메모리 인덱스
+from app.services.condition_weight import get_condition_index
+from app.services import site2_recommender
+from app.services.llm_batcher import LLMQueueFull
+from app.services.llm_cache import advice_cache
+from app.services import readiness
+from app.services import popularity
+from app.services.order_log import order_log
+from app.services.outbox_relay import outbox_relay
+from app.services import metrics
+from app.database import neo4j_conn, async_neo4j_conn, SessionLocal, async_engine
+from app.utils.log import setup_logging
+
+setup_logging()
 HF_TOKEN = os.getenv("HF_TOKEN")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 첫 요청이 JSON 파싱 비용을 떠안지 않도록 서버 시작 시 인덱스를 미리 만든다
+    get_condition_index()
+    site2_recommender.start_watcher()
+    # 모델 로드/워밍업과 Neo4j 연결 확인(동기/비동기 드라이버 둘 다)은 백그라운드로 (끝나기 전까지 /readyz 는 503)
+    readiness.start_warmup()
+    # 인기 메뉴 카운터: 시작 시 + 주기적으로 그래프 기준 재집계
+    popularity.start_reconciler(neo4j_conn.get_session)
+    # 주문 write-behind 플러셔 (지난번에 반영 못 한 주문 로그가 있으면 먼저 다시 올림)
+    order_log.start(neo4j_conn.get_session)
+    # 회원가입 아웃박스 → Neo4j User 노드 릴레이 (밀려 있던 이벤트도 이어서 처리)
+    outbox_relay.start(SessionLocal, neo4j_conn.get_session)
+
+    yield
+
+    readiness.stop_warmup()
+    # 남은 주문을 반영하고 로그를 닫는다 (실패해도 다음 시작 때 복구)
+    order_log.stop()
+    outbox_relay.stop()
+    popularity.stop_reconciler()
+    await async_neo4j_conn.close()
+    await async_engine.dispose()
+    site2_recommender.stop_watcher()
+    # 재시작 후에도 LLM 설명 캐시를 이어서 쓰도록 저장 (LLM_CACHE_PATH 설정 시)
+    advice_cache.save()
+
+
+app = FastAPI(lifespan=lifespan)
+# 요청별 단계 시간 → Server-Timing 헤더 + /metrics 의 HTTP 처리 시간
+app.add_middleware(metrics.ServerTimingMiddleware)
+
+
+@app.exception_handler(LLMQueueFull)
+async def llm_queue_full_handler(request: Request, exc: LLMQueueFull):
+    # LLM 대기열이 가득 차면 쌓아두지 않고 바로 503 + Retry-After 로 돌려보낸다
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "추천 설명 생성 요청이 많습니다. 잠시 후 다시 시도해 주세요."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 # 1. 정적 파일 연결 (CSS, JS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
+# vis.js 등 그래프 뷰 클라이언트 라이브러리
+app.mount("/lib", StaticFiles(directory="lib"), name="lib")
 
 # 2. 템플릿 엔진 설정
 templates = Jinja2Templates(directory="app/templates")
@@ -37,6 +93,28 @@ app.include_router(recommend.router, prefix="/api/v2", tags=["V2 Recommend"])
 app.include_router(rag_recommend.router, prefix="/api/v2", tags=["V2 Graph RAG"])
 app.include_router(rag_weighted.router, prefix="/api/v2", tags=["V2 Weighted RAG"])
 app.include_router(visualize.router, prefix="/api/v2", tags=["Visualization"])
+app.include_router(monitor.router, prefix="/api/v2", tags=["V2 Monitor"])
+
+# ==========================================
+# [Health] 로드밸런서용 상태 확인
+# ==========================================
+
+# 프로세스가 살아 있는지만 확인
+@app.get("/healthz", tags=["Health"])
+async def healthz():
+    return {"status": "ok"}
+
+# 모델 워밍업 + Neo4j 연결이 끝난 뒤에만 200 (그 전에는 트래픽을 받지 않도록 503)
+@app.get("/readyz", tags=["Health"])
+async def readyz():
+    state = readiness.readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+# Prometheus 수집용 (단계별/Cypher/HTTP 히스토그램, LLM 토큰 수)
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
 
 # ==========================================
 # [View] HTML 페이지 라우터
@@ -60,4 +138,9 @@ async def first_page(request: Request):
 # 두 번째 페이지
 @app.get("/second", response_class=HTMLResponse)
 async def second_page(request: Request):
-    return templates.TemplateResponse("second_page.html", {"request": request})
\ No newline at end of file
+    return templates.TemplateResponse("second_page.html", {"request": request})
+
+# 그래프 탐색 페이지 (/api/v2/graph-data 로 필요한 부분만 불러옴)
+@app.get("/graph", response_class=HTMLResponse)
+async def graph_page(request: Request):
+    return templates.TemplateResponse("graph_explorer.html", {"request": request})
@@ -1,58 +1,122 @@
 import os
-import json
-from collections import defaultdict
+import threading
+import time
+
+import numpy as np
+
+from app.services.weight_artifact import get_artifact
+
+CONDITION_KEYS = ["people", "price", "time", "rain", "season", "alcohol", "category"]
+
+# 가중치 파일 교체 여부 확인 주기 (초). 요청마다 stat 을 치지 않도록 이 간격으로만 검사
+RELOAD_CHECK_INTERVAL = float(os.getenv("CONDITION_RELOAD_INTERVAL", "5"))
+
+
+class ConditionIndex:
+    """
+    컴파일된 가중치 파일(mmap)에서 조건 부분만 꺼내 쓰는 인덱스 (배열은 복사하지 않음)
+
+    - views   : 조건 → (조건 값 × 메뉴) CSR 뷰
+    - columns : (조건, 값) → 해당 조건 뷰의 행 번호
+    """
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+        self.menus = np.array(artifact.menus, dtype=object)
+        self.views = {key: artifact.condition(key) for key in CONDITION_KEYS if key in artifact.conditions}
+        self.columns = {
+            (key, value): row
+            for key in self.views
+            for value, row in artifact.condition_keys[key].items()
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+_last_check = 0.0
+
+
+def get_condition_index() -> ConditionIndex:
+    """
+    현재 인덱스를 반환한다. 일정 주기마다 가중치 파일이 새로 빌드됐는지 확인해서 바뀌었으면 다시 연다.
+    """
+    global _index, _last_check
+
+    now = time.monotonic()
+    if _index is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return _index
+
+    with _index_lock:
+        if _index is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+            return _index
+        _last_check = now
+        artifact = get_artifact()
+        if _index is None or _index.artifact is not artifact:
+            _index = ConditionIndex(artifact)
+    return _index
 
-BASE_PATH = "/root/16_team/data/site1_db"
 
 def load_condition_weights(condition_name, condition_value):
     """
     조건 값에 해당하는 메뉴별 가중치를 로드
-    ex) people = "2" → people.json에서 "2"에 해당하는 메뉴와 가중치 반환
+    ex) people = "2" → people 조건에서 "2"에 해당하는 메뉴와 가중치 반환
     """
-    path = os.path.join(BASE_PATH, f"{condition_name}.json")
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except FileNotFoundError:
+    index = get_condition_index()
+    row = index.columns.get((condition_name, str(condition_value)))
+    if row is None:
         return {}
 
-    for entry in data:
-        if entry["menu"] == condition_value:
-            return {item["type"]: item["weight"] for item in entry["category"]}
-    return {}
+    menus, weights = index.views[condition_name].row(row)
+    return {index.menus[i]: round(float(w), 4) for i, w in zip(menus, weights)}
+
 
-def get_weighted_top5(user_input: dict) -> list[dict]:
+def get_weighted_top5(user_input: dict, k: int = 5) -> list[dict]:
     """
     사용자 입력을 기반으로 각 조건별 가중치를 합산하여
     상위 5개의 추천 메뉴와 해당 가중치 상세 정보를 반환합니다.
     """
-    condition_keys = ["people", "price", "time", "rain", "season", "alcohol", "category"]
-    total_weights = defaultdict(lambda: defaultdict(float))
+    index = get_condition_index()
 
-    for key in condition_keys:
+    # 입력된 조건값을 (조건, 메뉴 번호 배열, 가중치 배열) 목록으로 변환
+    selected = []
+    for key in CONDITION_KEYS:
         cond_val = user_input.get(key)
         if not cond_val:
             continue  # 조건값이 누락되었으면 건너뜀
+        row = index.columns.get((key, str(cond_val)))
+        if row is not None:
+            selected.append((key, *index.views[key].row(row)))
 
-        weights = load_condition_weights(key, cond_val)
-        for menu, weight in weights.items():
-            total_weights[menu][f"{key}_weight"] = weight
-            total_weights[menu]["total_weight"] += weight
+    if not selected or len(index.menus) == 0:
+        return []
 
-    # 총합 가중치 기준 정렬 후 상위 5개 메뉴 추출
-    sorted_menus = sorted(
-        total_weights.items(),
-        key=lambda x: x[1]["total_weight"],
-        reverse=True
-    )[:5]
+    # 선택한 조건의 행만 메뉴 벡터에 더한다 (float32 → float64 로 누적)
+    totals = np.zeros(len(index.menus), dtype=np.float64)
+    present = np.zeros(len(index.menus), dtype=bool)
+    for _, menus, weights in selected:
+        totals[menus] += weights
+        present[menus] = True
 
-    result = []
-    for menu_name, weights in sorted_menus:
-        weights["menu"] = menu_name
+    # 선택한 조건 중 하나라도 등장한 메뉴만 후보로 사용
+    candidates = np.flatnonzero(present)
+    k = min(k, len(candidates))
+    if k == 0:
+        return []
 
-        for key in condition_keys:
-            weights.setdefault(f"{key}_weight", 0.0)
+    # 전체 정렬 대신 argpartition 으로 상위 k개만 뽑은 뒤 그 안에서만 정렬
+    cand_totals = totals[candidates]
+    top = np.argpartition(-cand_totals, k - 1)[:k]
+    top = top[np.argsort(-cand_totals[top], kind="stable")]
 
-        result.append(dict(weights))  # defaultdict → dict
+    result = []
+    for i in candidates[top]:
+        weights = {f"{key}_weight": 0.0 for key in CONDITION_KEYS}
+        for key, menus, key_weights in selected:
+            hit = np.flatnonzero(menus == i)
+            if len(hit):
+                weights[f"{key}_weight"] = round(float(key_weights[hit[-1]]), 4)
+        weights["total_weight"] = round(float(totals[i]), 4)
+        weights["menu"] = index.menus[i]
+        result.append(weights)
 
     return result
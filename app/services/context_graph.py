@@ -0,0 +1,221 @@
+import logging
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# 스냅샷 유효 시간 (초). 지나면 다음 요청에서 Neo4j 를 다시 읽는다
+REFRESH_INTERVAL = float(os.getenv("CONTEXT_GRAPH_REFRESH_INTERVAL", "300"))
+
+# 조건별 가중치 (기존 쿼리의 2/3/2/1/5 점을 기본값으로 사용)
+DIMENSION_WEIGHTS = {
+    "season": float(os.getenv("CONTEXT_WEIGHT_SEASON", "2")),
+    "rain": float(os.getenv("CONTEXT_WEIGHT_RAIN", "3")),
+    "time": float(os.getenv("CONTEXT_WEIGHT_TIME", "2")),
+    "people": float(os.getenv("CONTEXT_WEIGHT_PEOPLE", "1")),
+    "alcohol": float(os.getenv("CONTEXT_WEIGHT_ALCOHOL", "5")),
+}
+
+# 상황 노드 → 메뉴 (계절/날씨/시간/인원은 모두 :Context {value} 로 저장돼 있음)
+CONTEXT_EDGES_QUERY = """
+    MATCH (c:Context)-[r:GOOD_MATCH]->(m:Menu)
+    RETURN c.value AS source, m.name AS menu, coalesce(r.weight, 1.0) AS weight
+"""
+
+# 주류 메뉴 → 같이 먹기 좋은 메뉴
+ALCOHOL_EDGES_QUERY = """
+    MATCH (a:Menu)-[r:PAIRED_WITH]->(m:Menu)
+    RETURN a.name AS source, m.name AS menu, coalesce(r.weight, 1.0) AS weight
+"""
+
+
+class ContextGraph:
+    """
+    Menu ↔ Context / 주류 간선을 정수 ID + CSR 인접 행렬로 압축한 메모리 스냅샷
+
+    - menus         : 메뉴 이름 목록 (열 번호)
+    - context_ids   : Context value → 행 번호 (context_adj)
+    - alcohol_ids   : 주류 메뉴 이름 → 행 번호 (alcohol_adj)
+    - *_adj         : (출발 노드 × 메뉴) 간선 가중치 CSR 행렬
+    """
+
+    def __init__(self, menus, context_ids, context_adj, alcohol_ids, alcohol_adj):
+        self.menus = menus
+        self.context_ids = context_ids
+        self.context_adj = context_adj
+        self.alcohol_ids = alcohol_ids
+        self.alcohol_adj = alcohol_adj
+        self.loaded_at = time.monotonic()
+
+    def _add_row(self, totals, adj, row, weight: float):
+        start, end = adj.indptr[row], adj.indptr[row + 1]
+        totals[adj.indices[start:end]] += weight * adj.data[start:end]
+
+    def score(self, conditions: dict, k: int = 3) -> list[dict]:
+        """
+        선택된 조건마다 해당 행의 간선 가중치 × 조건 가중치를 더해 상위 k개 메뉴를 반환
+        (실제로 이어진 메뉴만 점수를 받음)
+        """
+        totals = np.zeros(len(self.menus), dtype=np.float64)
+        for dim, weight in DIMENSION_WEIGHTS.items():
+            value = conditions.get(dim)
+            if value is None:
+                continue
+            if dim == "alcohol":
+                row = self.alcohol_ids.get(value)
+                if row is not None:
+                    self._add_row(totals, self.alcohol_adj, row, weight)
+            else:
+                row = self.context_ids.get(value)
+                if row is not None:
+                    self._add_row(totals, self.context_adj, row, weight)
+
+        candidates = np.flatnonzero(totals > 0)
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+
+        cand_totals = totals[candidates]
+        top = np.argpartition(-cand_totals, k - 1)[:k]
+        top = top[np.argsort(-cand_totals[top], kind="stable")]
+        return [
+            {"menu": self.menus[i], "weight_sum": _as_number(totals[i])}
+            for i in candidates[top]
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "menus": len(self.menus),
+            "contexts": len(self.context_ids),
+            "alcohols": len(self.alcohol_ids),
+            "context_edges": int(self.context_adj.nnz),
+            "alcohol_edges": int(self.alcohol_adj.nnz),
+            "age_seconds": time.monotonic() - self.loaded_at,
+        }
+
+
+def _as_number(value: float):
+    # 정수 점수는 기존 응답처럼 int 로 돌려준다
+    return int(value) if float(value).is_integer() else round(float(value), 4)
+
+
+def _build_adjacency(records, menu_ids):
+    source_ids = {}
+    edges = {}  # (행, 열) → 가중치 (중복 간선은 마지막 값 사용)
+    for record in records:
+        row = source_ids.setdefault(record["source"], len(source_ids))
+        col = menu_ids.setdefault(record["menu"], len(menu_ids))
+        edges[(row, col)] = float(record["weight"])
+    return source_ids, edges
+
+
+def build_context_graph(context_records, alcohol_records) -> ContextGraph:
+    """
+    Neo4j 에서 읽은 간선 두 종류로 스냅샷을 만든다
+    """
+    menu_ids = {}
+    context_ids, context_edges = _build_adjacency(context_records, menu_ids)
+    alcohol_ids, alcohol_edges = _build_adjacency(alcohol_records, menu_ids)
+
+    n = len(menu_ids)
+
+    def to_csr(source_ids, edges):
+        rows = [r for r, _ in edges]
+        cols = [c for _, c in edges]
+        return sparse.csr_matrix(
+            (list(edges.values()), (rows, cols)), shape=(len(source_ids), n), dtype=np.float64
+        )
+
+    menus = np.array(list(menu_ids), dtype=object)
+    return ContextGraph(
+        menus,
+        context_ids,
+        to_csr(context_ids, context_edges),
+        alcohol_ids,
+        to_csr(alcohol_ids, alcohol_edges),
+    )
+
+
+_graph = None
+_graph_lock = threading.Lock()
+_refresh_lock = asyncio.Lock()  # 요청 경로에서 동시에 여러 번 다시 읽지 않도록
+_stale = threading.Event()
+
+
+def invalidate():
+    """
+    그래프 데이터가 바뀌었을 때 호출 → 다음 요청에서 스냅샷을 다시 만든다
+    """
+    _stale.set()
+
+
+def _needs_refresh() -> bool:
+    return (
+        _graph is None
+        or _stale.is_set()
+        or time.monotonic() - _graph.loaded_at > REFRESH_INTERVAL
+    )
+
+
+def _swap(graph: ContextGraph) -> ContextGraph:
+    # 새 스냅샷을 다 만든 뒤 참조만 교체 (요청 중에는 항상 완성된 스냅샷만 보임)
+    global _graph
+    with _graph_lock:
+        _graph = graph
+    logger.info("🔄 상황 그래프 스냅샷 갱신 (메뉴 %d개, 간선 %d개)", len(graph.menus), graph.context_adj.nnz + graph.alcohol_adj.nnz)
+    return graph
+
+
+def refresh(graph_session) -> ContextGraph:
+    """
+    동기 세션으로 스냅샷을 다시 만든다 (워밍업 스레드용)
+    """
+    _stale.clear()
+    with metrics.cypher("context_edges"):
+        context_records = graph_session.run(CONTEXT_EDGES_QUERY)
+    with metrics.cypher("alcohol_edges"):
+        alcohol_records = graph_session.run(ALCOHOL_EDGES_QUERY)
+    return _swap(build_context_graph(context_records, alcohol_records))
+
+
+async def refresh_async(graph_session) -> ContextGraph:
+    _stale.clear()
+    with metrics.cypher("context_edges"):
+        context_records = await graph_session.run(CONTEXT_EDGES_QUERY)
+    with metrics.cypher("alcohol_edges"):
+        alcohol_records = await graph_session.run(ALCOHOL_EDGES_QUERY)
+    return _swap(build_context_graph(context_records, alcohol_records))
+
+
+async def get_context_graph(graph_session) -> ContextGraph:
+    """
+    현재 스냅샷을 반환. 오래됐거나 무효화된 경우에만 Neo4j 를 다시 읽는다
+    """
+    if not _needs_refresh():
+        return _graph
+
+    async with _refresh_lock:
+        if not _needs_refresh():
+            return _graph
+        try:
+            return await refresh_async(graph_session)
+        except Exception as e:
+            if _graph is None:
+                raise
+            # Neo4j 일시 장애 시 기존 스냅샷으로 계속 응답 (다음 요청에서 재시도)
+            logger.warning("⚠️ 상황 그래프 갱신 실패, 기존 스냅샷 사용: %s", e)
+            return _graph
+
+
+def get_stats() -> dict:
+    graph = _graph
+    if graph is None:
+        return {"loaded": False}
+    return {"loaded": True, "stale": _needs_refresh(), **graph.stats()}
@@ -0,0 +1,246 @@
+import logging
+import asyncio
+import os
+import threading
+import time
+
+from pyvis.network import Network
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# 렌더링 결과를 버전별로 저장할 폴더 / 남겨 둘 이전 버전 수
+OUTPUT_DIR = os.getenv("GRAPH_VIEW_DIR", "static/graph")
+KEEP_VERSIONS = int(os.getenv("GRAPH_VIEW_KEEP_VERSIONS", "3"))
+# 그래프 버전(노드/관계 수 + 버전 노드) 확인 주기 (초). 그 사이 요청은 마지막으로 확인한 버전을 그대로 사용
+VERSION_TTL = float(os.getenv("GRAPH_VIEW_VERSION_TTL", "5"))
+# 전체 보기에 그릴 관계 수
+OVERVIEW_LIMIT = int(os.getenv("GRAPH_VIEW_LIMIT", "100"))
+# /graph-data 한 페이지 최대 관계 수
+MAX_PAGE_SIZE = 500
+
+# 노드/관계 수는 count store 에서 바로 읽음 (그래프 크기와 상관없이 상수 시간)
+# changes: 쓰기 쿼리들이 올리는 버전 노드 값 (BUMP_GRAPH_VERSION_QUERY). 수가 그대로인 속성 변경은 이걸로 알아챔
+GRAPH_VERSION_QUERY = """
+    CALL { MATCH (n) RETURN count(n) AS nodes }
+    CALL { MATCH ()-[r]->() RETURN count(r) AS rels }
+    OPTIONAL MATCH (v:GraphVersion {id: "graph"})
+    RETURN nodes, rels, coalesce(v.version, 0) AS changes
+"""
+
+# 전체 보기 / 페이지 단위 조회
+OVERVIEW_QUERY = """
+    MATCH (n)-[r]->(m)
+    RETURN n, r, m
+    SKIP $skip LIMIT $limit
+"""
+
+# 한 유저 / 한 메뉴 주변 (제약조건 인덱스로 시작 노드를 바로 찾음)
+USER_EGO_QUERY = """
+    MATCH (n:User {user_id: $uid})-[r]-(m)
+    RETURN n, r, m
+    SKIP $skip LIMIT $limit
+"""
+
+MENU_EGO_QUERY = """
+    MATCH (n:Menu {name: $menu_name})-[r]-(m)
+    RETURN n, r, m
+    SKIP $skip LIMIT $limit
+"""
+
+COLORS = {"User": "#97C2FC", "Menu": "#FFD700"}
+DEFAULT_COLOR = "#90EE90"
+
+
+# ==========================================
+# 1. 레코드 → vis.js 노드/엣지
+# ==========================================
+def _node_id(node) -> str:
+    return str(node.element_id) if hasattr(node, "element_id") else str(node.id)
+
+
+def _node_dict(node) -> dict:
+    label = list(node.labels)[0] if node.labels else "Node"
+    title = node.get("name") or node.get("username") or node.get("value") or "Unknown"
+    return {
+        "id": _node_id(node),
+        "label": str(title),
+        "title": f"{label}: {title}",
+        "color": COLORS.get(label, DEFAULT_COLOR),
+        "group": label,
+    }
+
+
+def to_subgraph(records) -> dict:
+    """
+    (n, r, m) 레코드 목록을 중복 없는 노드/엣지 목록으로 변환 (vis.js DataSet 형식)
+    관계 방향은 무방향 매칭이어도 실제 시작/끝 노드 기준으로 기록
+    """
+    nodes = {}
+    edges = {}
+    for record in records:
+        for node in (record["n"], record["m"]):
+            node_id = _node_id(node)
+            if node_id not in nodes:
+                nodes[node_id] = _node_dict(node)
+
+        r = record["r"]
+        edge_id = _node_id(r)
+        if edge_id in edges:
+            continue
+        start = _node_id(r.start_node) if r.start_node is not None else _node_id(record["n"])
+        end = _node_id(r.end_node) if r.end_node is not None else _node_id(record["m"])
+        edge = {"id": edge_id, "from": start, "to": end, "label": r.type, "title": r.type}
+        if r.get("weight") is not None:
+            edge["weight"] = r.get("weight")
+        edges[edge_id] = edge
+    return {"nodes": list(nodes.values()), "edges": list(edges.values())}
+
+
+# ==========================================
+# 2. 그래프 버전
+# ==========================================
+_version = None
+_version_checked = 0.0
+_version_lock = threading.Lock()
+
+
+def mark_changed():
+    """
+    이 프로세스에서 그래프를 바꾼 뒤 호출 → VERSION_TTL 을 기다리지 않고 다음 요청에서 버전을 다시 읽음
+    (다른 워커는 VERSION_TTL 안에 그래프의 버전 노드로 알아챔)
+    """
+    global _version_checked
+    with _version_lock:
+        _version_checked = 0.0
+
+
+async def get_version(graph_session) -> str:
+    """
+    현재 그래프 버전 (노드 수-관계 수-버전 노드 값). ETag 와 렌더링 파일 이름에 사용
+    """
+    global _version, _version_checked
+    now = time.monotonic()
+    if _version is not None and now - _version_checked < VERSION_TTL:
+        return _version
+
+    with metrics.cypher("graph_version"):
+        records = await graph_session.run(GRAPH_VERSION_QUERY)
+    nodes, rels, changes = (records[0]["nodes"], records[0]["rels"], records[0]["changes"]) if records else (0, 0, 0)
+    with _version_lock:
+        _version = f"{nodes}-{rels}-{changes}"
+        _version_checked = now
+    return _version
+
+
+# ==========================================
+# 3. 전체 보기 HTML (버전별 파일 캐시)
+# ==========================================
+def _build_html(records) -> str:
+    net = Network(height="750px", width="100%", bgcolor="#222222", font_color="white", cdn_resources="remote")
+    net.barnes_hut()
+    subgraph = to_subgraph(records)
+    for node in subgraph["nodes"]:
+        net.add_node(node["id"], label=node["label"], title=node["title"], color=node["color"], group=node["group"])
+    for edge in subgraph["edges"]:
+        net.add_edge(edge["from"], edge["to"], title=edge["title"], label=edge["label"])
+    return net.generate_html()
+
+
+def _write_atomic(path: str, html: str):
+    # 임시 파일에 다 쓴 뒤 rename → 읽는 쪽은 항상 완성된 파일만 봄
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+
+
+def _cleanup(keep_path: str):
+    files = sorted(
+        (os.path.join(OUTPUT_DIR, f) for f in os.listdir(OUTPUT_DIR) if f.endswith(".html")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for path in files[KEEP_VERSIONS:]:
+        if path != keep_path:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_render_lock = asyncio.Lock()
+_rendered = {}  # 버전 → 파일 경로
+render_stats = {"renders": 0, "hits": 0, "last_render_seconds": 0.0}
+
+
+async def render_overview(graph_session, version: str):
+    """
+    버전에 해당하는 전체 보기 HTML 파일 경로를 반환 (데이터가 없으면 None)
+    같은 버전은 한 번만 렌더링하고, 동시에 들어온 요청은 그 결과를 기다렸다가 같이 사용
+    """
+    path = _rendered.get(version)
+    if path is not None and os.path.exists(path):
+        render_stats["hits"] += 1
+        return path
+
+    async with _render_lock:
+        path = _rendered.get(version)
+        if path is not None and os.path.exists(path):
+            render_stats["hits"] += 1
+            return path
+
+        with metrics.cypher("graph_overview"):
+            records = await graph_session.run(OVERVIEW_QUERY, skip=0, limit=OVERVIEW_LIMIT)
+        if not records:
+            return None
+
+        started = time.perf_counter()
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        path = os.path.join(OUTPUT_DIR, f"graph-{version}.html")
+        html = await asyncio.to_thread(_build_html, records)
+        await asyncio.to_thread(_write_atomic, path, html)
+        await asyncio.to_thread(_cleanup, path)
+
+        _rendered.clear()
+        _rendered[version] = path
+        render_stats["renders"] += 1
+        render_stats["last_render_seconds"] = time.perf_counter() - started
+    logger.info("🖼️ 그래프 뷰 렌더링: %s (%.2fs)", path, render_stats["last_render_seconds"])
+    return path
+
+
+# ==========================================
+# 4. 부분 그래프 JSON
+# ==========================================
+async def fetch_subgraph(graph_session, user_id=None, menu_name=None, skip: int = 0, limit: int = 100) -> dict:
+    """
+    유저/메뉴 주변 또는 전체 관계를 페이지 단위로 조회
+    next_skip 이 None 이 아니면 다음 페이지가 더 있음
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    skip = max(0, skip)
+    if user_id is not None:
+        with metrics.cypher("graph_user_ego"):
+            records = await graph_session.run(USER_EGO_QUERY, uid=user_id, skip=skip, limit=limit)
+    elif menu_name:
+        with metrics.cypher("graph_menu_ego"):
+            records = await graph_session.run(MENU_EGO_QUERY, menu_name=menu_name, skip=skip, limit=limit)
+    else:
+        with metrics.cypher("graph_overview"):
+            records = await graph_session.run(OVERVIEW_QUERY, skip=skip, limit=limit)
+
+    subgraph = to_subgraph(records)
+    subgraph["skip"] = skip
+    subgraph["limit"] = limit
+    subgraph["next_skip"] = skip + limit if len(records) == limit else None
+    return subgraph
+
+
+def get_stats() -> dict:
+    return {
+        "version": _version,
+        "cached_versions": list(_rendered),
+        **render_stats,
+    }
@@ -1,21 +1,58 @@
+import logging
+import os
+import re
+import copy
+import time
 import torch
 import gc
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+import asyncio
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from transformers import (
+    AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, TextStreamer,
+    LogitsProcessor, LogitsProcessorList, StoppingCriteria, StoppingCriteriaList,
+)
 from fastapi import FastAPI
 from pydantic import BaseModel
+from app.services.llm_batcher import BatchScheduler, LLMQueueFull
+from app.services.llm_cache import advice_cache, make_cache_key
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
 MODEL_DIR = "/root/16_team/app/llama/Llama-3.1-8B-Instruct"
 
+# 공통 prefix KV 캐시 사용 여부
+PREFIX_CACHE_ENABLED = os.getenv("LLM_PREFIX_CACHE", "1") == "1"
+
+# 보조(draft) 모델 경로. 지정하면 assisted generation: draft 가 토큰 몇 개를 제안하고 본 모델이 한 번의 forward 로 검증
+# 같은 토크나이저 계열이어야 한다 (예: Llama-3.2-1B-Instruct). 비우면 일반 generate
+DRAFT_MODEL_DIR = os.getenv("LLM_DRAFT_MODEL_DIR", "")
+# draft 가 한 번에 제안할 토큰 수 (시작값. 수락 여부에 따라 늘리고 줄인다)
+DRAFT_NUM_TOKENS = int(os.getenv("LLM_DRAFT_NUM_TOKENS", "5"))
+
 _model = None
 _tokenizer = None
+_prefix = None  # (prefix 토큰 [1, P], prefix 의 past_key_values)
+_draft = None
+_load_lock = threading.Lock()
 
 def load_model():
-    global _model, _tokenizer
     if _model is not None: return _model, _tokenizer
 
-    print("⏳ 모델 로딩 중...")
+    # 워밍업 스레드와 스케줄러 워커가 동시에 로드하지 않도록
+    with _load_lock:
+        if _model is None:
+            _load_model()
+    return _model, _tokenizer
+
+
+def _load_model():
+    global _model, _tokenizer, _prefix, _draft
+
+    logger.info("⏳ 모델 로딩 중...")
     gc.collect()
     torch.cuda.empty_cache()
     
@@ -26,18 +63,54 @@ def load_model():
         bnb_4bit_compute_dtype=torch.float16
     )
 
-    _tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
-    _model = AutoModelForCausalLM.from_pretrained(
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
+    model = AutoModelForCausalLM.from_pretrained(
         MODEL_DIR,
         quantization_config=bnb_config,
         device_map="auto",
         trust_remote_code=True
     )
     # Llama-3 패딩 토큰 설정
-    if _tokenizer.pad_token_id is None:
-        _tokenizer.pad_token_id = _tokenizer.eos_token_id
-        
-    return _model, _tokenizer
+    if tokenizer.pad_token_id is None:
+        tokenizer.pad_token_id = tokenizer.eos_token_id
+    # 배치 생성 시 프롬프트 끝이 맞춰지도록 왼쪽 패딩
+    tokenizer.padding_side = "left"
+
+    if PREFIX_CACHE_ENABLED:
+        _prefix = _build_prefix_cache(model, tokenizer)
+    if DRAFT_MODEL_DIR:
+        _draft = _load_draft(model)
+
+    # 준비가 다 끝난 뒤에 공개 (load_model 의 빠른 경로가 반쯤 준비된 모델을 보지 않도록)
+    _tokenizer = tokenizer
+    _model = model
+
+def _load_draft(model):
+    """
+    draft 모델 로드 (작은 모델이라 양자화 없이 본 모델과 같은 장치에). 어휘 크기가 다르면 쓰지 않는다
+    """
+    dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+    draft = prepare_draft(AutoModelForCausalLM.from_pretrained(DRAFT_MODEL_DIR, dtype=dtype).to(model.device))
+    if draft.config.vocab_size != model.config.vocab_size:
+        logger.warning(
+            "⚠️ draft 모델 어휘 크기가 다름 (%d vs %d) → assisted generation 끔",
+            draft.config.vocab_size, model.config.vocab_size,
+        )
+        return None
+    logger.info("🧠 draft 모델 로드 완료: %s (제안 토큰 %d)", DRAFT_MODEL_DIR, DRAFT_NUM_TOKENS)
+    return draft
+
+
+def prepare_draft(draft, num_tokens: int = DRAFT_NUM_TOKENS):
+    """
+    assisted generation 설정은 draft 쪽 generation_config 에서 읽힌다.
+    제안 토큰 수는 시작값이고, 전부 수락되면 +2 / 아니면 -1 로 조정 (heuristic)
+    """
+    draft.eval()
+    draft.generation_config.num_assistant_tokens = num_tokens
+    draft.generation_config.num_assistant_tokens_schedule = "heuristic"
+    return draft
+
 
 class PromptRequest(BaseModel):
     top5: list
@@ -46,9 +119,10 @@ class PromptRequest(BaseModel):
 async def generate_prompt(req: PromptRequest):
     return {"result": ask_hf_llama(req.top5)}
 
-def ask_hf_llama(top5_list: list[dict], conditions: dict = None) -> str:
-    model, tokenizer = load_model()
-
+def build_guide(top5_list: list[dict], conditions: dict = None) -> tuple[str, str]:
+    """
+    로직 분기별 (상황 설명 context_desc, 가이드 문장 guide_sentence) 생성
+    """
     menu_names = [item.get("menu", "") for item in top5_list]
     rec_menu_str = ", ".join(menu_names)
     target_menu = menu_names[0] if menu_names else "추천 메뉴"
@@ -98,18 +172,51 @@ def ask_hf_llama(top5_list: list[dict], conditions: dict = None) -> str:
         context_desc = f"일반 추천 상황. 메뉴: {target_menu}"
         guide_sentence = f"손님, 요즘 제일 잘 나가는 {target_menu}를 추천드려요!"
 
+    return context_desc, guide_sentence
+
+
+# 가이드 문장에서 LLM 이 채워야 하는 빈칸
+GUIDE_PLACEHOLDER = "[맛/식감 특징]이 있어서 "
+
+
+def template_advice(top5_list: list[dict], conditions: dict = None) -> str:
+    """
+    LLM 없이 만드는 결정적 문구 (지연 예산 초과 시 폴백).
+    가이드 문장에서 빈칸만 걷어낸 것이라 상황/메뉴 정보는 그대로 담긴다
+    """
+    _, guide_sentence = build_guide(top5_list, conditions)
+    return guide_sentence.replace(GUIDE_PLACEHOLDER, "")
+
+
+# System Message: 역할 부여
+SYSTEM_PROMPT = (
+    "너는 이자카야의 친절하고 센스 있는 점장이다. "
+    "주어진 상황과 메뉴에 대해 손님에게 권하는 말을 한 마디로 작성해라. "
+    "설명은 구체적이고 감각적이어야 하며(3문장 이상), 없는 재료를 지어내면 안 된다."
+)
+
+# User Message 중 고정 지시사항 (요청마다 같으므로 앞쪽에 두어 공통 prefix 로 만든다)
+INSTRUCTION_BLOCK = """
+    [주의사항]
+    1. 아래 가이드라인의 문장으로 시작하되, 뒤에 메뉴의 맛과 식감을 아주 풍성하게 묘사해라.
+    2. '답안:', '점장:', '주의:' 같은 헤더를 절대 붙이지 마라.
+    3. 오직 점장의 대사만 출력해라.
+"""
+
+# 모든 요청이 공유하는 프롬프트 앞부분. 모델 로드 시 한 번만 prefill 해서 KV 캐시로 재사용
+PROMPT_PREFIX = (
+    f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{SYSTEM_PROMPT}<|eot_id|>"
+    f"<|start_header_id|>user<|end_header_id|>\n\n{INSTRUCTION_BLOCK}"
+)
+
+
+def build_prompt(top5_list: list[dict], conditions: dict = None) -> str:
+    context_desc, guide_sentence = build_guide(top5_list, conditions)
+
     # ====================================================
     # 📝 2. Llama-3 전용 Chat 프롬프트 구성 (핵심 수정)
     # ====================================================
-    
-    # System Message: 역할 부여
-    system_prompt = (
-        "너는 이자카야의 친절하고 센스 있는 점장이다. "
-        "주어진 상황과 메뉴에 대해 손님에게 권하는 말을 한 마디로 작성해라. "
-        "설명은 구체적이고 감각적이어야 하며(3문장 이상), 없는 재료를 지어내면 안 된다."
-    )
-
-    # User Message: 입력 데이터와 지시사항
+    # 고정 부분(PROMPT_PREFIX) 뒤에 요청마다 달라지는 상황 정보/가이드라인만 붙인다
     user_prompt = f"""
     [상황 정보]
     {context_desc}
@@ -117,57 +224,641 @@ def ask_hf_llama(top5_list: list[dict], conditions: dict = None) -> str:
     [답변 가이드라인]
     다음 문장 흐름을 자연스럽게 이어서 완성해라:
     "{guide_sentence}"
-
-    [주의사항]
-    1. 가이드라인의 문장으로 시작하되, 뒤에 메뉴의 맛과 식감을 아주 풍성하게 묘사해라.
-    2. '답안:', '점장:', '주의:' 같은 헤더를 절대 붙이지 마라.
-    3. 오직 점장의 대사만 출력해라.
     """
 
     # 🔥 Llama-3 Chat Template 적용
     # <|begin_of_text|>...<|start_header_id|>assistant<|end_header_id|>
     prompt = (
-        f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{system_prompt}<|eot_id|>"
-        f"<|start_header_id|>user<|end_header_id|>\n\n{user_prompt}<|eot_id|>"
+        f"{PROMPT_PREFIX}{user_prompt}<|eot_id|>"
         f"<|start_header_id|>assistant<|end_header_id|>\n\n"
         f"점장: 손님," # 👈 AI가 여기서부터 말하도록 강제 시작점 생성
     )
+    return prompt
 
-    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
-    
-    with torch.no_grad():
-        outputs = model.generate(
-            **inputs,
-            max_new_tokens=400,
-            do_sample=True,
-            top_p=0.9,
-            temperature=0.4, 
-            repetition_penalty=1.1,
-            eos_token_id=tokenizer.eos_token_id,
-            pad_token_id=tokenizer.eos_token_id
-        )
 
+GARBAGE_TOKENS = ["[답안]", "답:", "*주의*", "Note:", "비고:", "시스템:", "user:", "assistant:"]
+
+# ====================================================
+# ✋ 조기 종료 기준 (생성 도중 검사)
+# ====================================================
+# 생성 텍스트에 나오면 대사가 끝난 것으로 보고 그 앞에서 자른다 (헤더/메모/다음 대사가 이어 붙는 경우)
+STOP_STRINGS = GARBAGE_TOKENS + ["답안:", "주의:", "점장:"]
+
+# 나오면 바로 생성을 끝내는 특수 토큰 (턴 종료 / 다음 턴 헤더)
+STOP_SPECIAL_TOKENS = ["<|eot_id|>", "<|start_header_id|>"]
+
+# 문장 끝: 마침표/느낌표/물음표 뒤에 공백 또는 텍스트 끝 (3.5 같은 숫자는 제외)
+SENTENCE_END = re.compile(r"(?<![0-9])[.!?…]+(?=\s|$)")
+
+
+def _env_limit(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# (최대 문장 수, 최대 글자 수). 0 이면 해당 기준 없이 max_new_tokens 까지
+DEFAULT_STOP_LIMITS = (
+    _env_limit("LLM_MAX_SENTENCES_DEFAULT", 4),
+    _env_limit("LLM_MAX_CHARS_DEFAULT", 300),
+)
+STOP_LIMITS = {
+    endpoint: (
+        _env_limit(f"LLM_MAX_SENTENCES_{endpoint.upper()}", DEFAULT_STOP_LIMITS[0]),
+        _env_limit(f"LLM_MAX_CHARS_{endpoint.upper()}", DEFAULT_STOP_LIMITS[1]),
+    )
+    for endpoint in ["rag_weighted", "recommend", "rag_recommend", "condition_weight", "menu_recommend"]
+}
+
+
+def get_stop_limits(endpoint: str = None) -> tuple[int, int]:
+    return STOP_LIMITS.get(endpoint, DEFAULT_STOP_LIMITS)
+
+
+def find_remark_end(text: str, limits: tuple[int, int] = None):
+    """
+    생성 텍스트("점장: 손님," 이후)에서 대사가 끝나는 위치. 아직 끝나지 않았으면 None
+
+    - 종료 문자열이 나오면 그 앞
+    - 문장 수에 도달하면 그 문장 끝
+    - 글자 수를 넘으면 예산 안의 마지막 문장 끝 (한 문장도 없으면 예산 위치)
+    """
+    max_sentences, max_chars = limits or DEFAULT_STOP_LIMITS
+    end = None
+    for s in STOP_STRINGS:
+        pos = text.find(s)
+        if pos != -1 and (end is None or pos < end):
+            end = pos
+
+    if max_sentences:
+        for i, m in enumerate(SENTENCE_END.finditer(text, 0, len(text) if end is None else end), 1):
+            if i == max_sentences:
+                end = m.end()
+                break
+
+    if max_chars and (len(text) if end is None else end) > max_chars:
+        sentence_ends = [m.end() for m in SENTENCE_END.finditer(text, 0, max_chars)]
+        end = sentence_ends[-1] if sentence_ends else max_chars
+    return end
+
+
+def truncate_remark(text: str, limits: tuple[int, int] = None) -> str:
+    end = find_remark_end(text, limits)
+    return text if end is None else text[:end]
+
+
+def clean_response(full_text: str, prompt: str, limits: tuple[int, int] = None) -> str:
     # ====================================================
     # 🧹 3. 후처리 (Cleaning)
     # ====================================================
-    full_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    
     # "점장: 손님," 뒷부분만 잘라내기
     if "점장: 손님," in full_text:
         # prompt에 넣었던 시작점 뒤에 AI가 생성한 텍스트를 붙임
-        generated_part = full_text.split("점장: 손님,")[-1].strip()
+        # (프롬프트의 시작점이 처음 나오는 것이므로 그 뒤 전체가 생성 부분, 다음 대사 이후는 종료 기준으로 잘림)
+        generated_part = truncate_remark(full_text.split("점장: 손님,", 1)[-1].strip(), limits)
         final_response = "손님, " + generated_part
     else:
         # 혹시라도 포맷이 깨지면 프롬프트 제거 후 사용
         final_response = full_text.replace(prompt, "").strip()
 
     # 잡다한 기호 제거
-    garbage = ["[답안]", "답:", "*주의*", "Note:", "비고:", "시스템:", "user:", "assistant:"]
-    for g in garbage:
+    for g in GARBAGE_TOKENS:
         final_response = final_response.replace(g, "")
         
     return final_response.strip()
 
+
+class AdviceStreamCleaner:
+    """
+    clean_response 와 같은 후처리를 스트리밍 조각에 점진적으로 적용
+
+    - 생성 텍스트는 "점장: 손님," 이후부터 들어오므로 맨 앞에 "손님, " 을 붙여서 내보낸다
+    - 종료 문자열(잡다한 기호 포함)이 조각 경계에 걸칠 수 있으므로, 가장 긴 문자열 길이 - 1 만큼은 붙잡아 두었다가 내보낸다
+    - 종료 기준(find_remark_end)에 걸리면 그 위치까지만 내보내고 이후 조각은 버린다.
+      글자 수 초과로 이미 내보낸 문장 중간에서 잘리는 경우는 done 의 최종 문구가 기준
+    """
+
+    HOLD = max(len(s) for s in STOP_STRINGS) - 1
+
+    def __init__(self, limits: tuple[int, int] = None):
+        self._buf = ""
+        self._sent = ""  # 지금까지 내보낸 생성 텍스트 ("손님, " 제외)
+        self._started = False
+        self._ended = False
+        self._limits = limits
+
+    def feed(self, text: str) -> str:
+        if self._ended:
+            return ""
+        self._buf += text
+        prefix = ""
+        if not self._started:
+            self._buf = self._buf.lstrip()
+            if not self._buf:
+                return ""
+            self._started = True
+            prefix = "손님, "
+
+        end = find_remark_end(self._sent + self._buf, self._limits)
+        if end is not None:
+            self._ended = True
+            self._buf = self._buf[:max(0, end - len(self._sent))].rstrip()
+            return prefix + self._emit(len(self._buf))
+
+        return prefix + self._emit(len(self._buf) - self.HOLD)
+
+    def _emit(self, cut: int) -> str:
+        out, self._buf = self._buf[:max(0, cut)], self._buf[max(0, cut):]
+        self._sent += out
+        return out
+
+    def finish(self) -> str:
+        out = self._buf if self._ended else truncate_remark(self._sent + self._buf, self._limits)[len(self._sent):]
+        self._buf = ""
+        if not self._started:
+            return ""
+        return out.rstrip()
+
+
+GENERATION_KWARGS = dict(
+    max_new_tokens=int(os.getenv("LLM_MAX_NEW_TOKENS", "400")),
+    do_sample=True,
+    top_p=0.9,
+    temperature=0.4, 
+    repetition_penalty=1.1,
+)
+
+
+_prefill_stats = {"requests": 0, "prompt_tokens": 0, "prefill_tokens": 0, "prefill_seconds": 0.0}
+_prefill_lock = threading.Lock()
+
+
+def _build_prefix_cache(model, tokenizer):
+    """
+    PROMPT_PREFIX 를 한 번 토큰화/prefill 해서 KV 캐시를 만들어 둔다
+    """
+    prefix_ids = tokenizer(PROMPT_PREFIX, return_tensors="pt").input_ids.to(model.device)
+    with torch.no_grad():
+        out = model(input_ids=prefix_ids, use_cache=True)
+    logger.info("🧠 공통 프롬프트 KV 캐시 준비 완료 (%d 토큰)", prefix_ids.shape[1])
+    return prefix_ids, out.past_key_values
+
+
+def _encode(prompts: list[str], model, tokenizer) -> dict:
+    """
+    generate 입력 구성.
+    prefix 캐시가 있으면 [공통 prefix | 패딩 | 요청별 suffix] 형태로 만들고,
+    prefix 부분은 캐시 복사본(배치 크기만큼 확장)을 넘겨서 suffix 만 prefill 되게 한다.
+    반환값: (generate 입력, 전체 프롬프트 토큰 수, 실제 prefill 할 토큰 수)
+    """
+    if _prefix is None or not all(p.startswith(PROMPT_PREFIX) for p in prompts):
+        inputs = dict(tokenizer(prompts, return_tensors="pt", padding=True).to(model.device))
+        n_tokens = int(inputs["attention_mask"].sum())
+        return inputs, n_tokens, n_tokens
+
+    prefix_ids, prefix_cache = _prefix
+    batch_size = len(prompts)
+
+    suffix = tokenizer(
+        [p[len(PROMPT_PREFIX):] for p in prompts],
+        return_tensors="pt",
+        padding=True,
+        add_special_tokens=False,
+    ).to(model.device)
+
+    input_ids = torch.cat([prefix_ids.expand(batch_size, -1), suffix.input_ids], dim=1)
+    attention_mask = torch.cat(
+        [torch.ones_like(prefix_ids).expand(batch_size, -1), suffix.attention_mask], dim=1
+    )
+
+    cache = copy.deepcopy(prefix_cache)
+    if batch_size > 1:
+        cache.batch_repeat_interleave(batch_size)
+
+    inputs = {"input_ids": input_ids, "attention_mask": attention_mask, "past_key_values": cache}
+    prefill_tokens = int(suffix.attention_mask.sum())
+    return inputs, prefill_tokens + prefix_ids.shape[1] * batch_size, prefill_tokens
+
+
+class _FirstStepTimer(LogitsProcessor):
+    """
+    첫 logits 처리 시점 = prefill 이 끝난 시점. prefill 시간 측정용 (점수는 건드리지 않음)
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_step_at = None
+
+    def __call__(self, input_ids, scores):
+        if self.first_step_at is None:
+            self.first_step_at = time.perf_counter()
+        return scores
+
+
+class _RemarkStoppingCriteria(StoppingCriteria):
+    """
+    매 스텝 각 행의 생성 부분을 디코딩해서 종료 기준(find_remark_end)을 검사.
+    행마다 기준이 다를 수 있고(엔드포인트별), 끝난 행만 멈춘다 (행별 bool 반환)
+    """
+
+    def __init__(self, tokenizer, input_len: int, limits: list):
+        self.tokenizer = tokenizer
+        self.input_len = input_len
+        self.limits = limits
+        self.done = [False] * len(limits)
+
+    def __call__(self, input_ids, scores, **kwargs):
+        for i, limits in enumerate(self.limits):
+            if not self.done[i]:
+                text = self.tokenizer.decode(input_ids[i, self.input_len:], skip_special_tokens=True)
+                self.done[i] = find_remark_end(text.lstrip(), limits) is not None
+        return torch.tensor(self.done, dtype=torch.bool, device=input_ids.device)
+
+
+def _stop_token_ids(tokenizer) -> list[int]:
+    # eos + 턴 종료/헤더 특수 토큰 (어휘에 없는 토큰은 제외)
+    ids = [tokenizer.eos_token_id]
+    for token in STOP_SPECIAL_TOKENS:
+        token_id = tokenizer.convert_tokens_to_ids(token)
+        if token_id is not None and token_id != tokenizer.unk_token_id and token_id not in ids:
+            ids.append(token_id)
+    return ids
+
+
+def _generation_controls(inputs: dict, tokenizer, limits: list) -> dict:
+    return dict(
+        stopping_criteria=StoppingCriteriaList(
+            [_RemarkStoppingCriteria(tokenizer, inputs["input_ids"].shape[1], limits)]
+        ),
+        eos_token_id=_stop_token_ids(tokenizer),
+        pad_token_id=tokenizer.pad_token_id,
+    )
+
+
+def _assist_kwargs() -> dict:
+    return {} if _draft is None else {"assistant_model": _draft}
+
+
+class ForwardCounter:
+    """
+    generate 한 번 동안 본 모델 / draft 모델의 forward 호출 수를 센다 (assisted generation 수락률 계산용)
+
+    - 본 모델 forward 1번 = 검증 1라운드. 라운드마다 수락된 draft 토큰 + 본 모델 토큰 1개가 붙는다
+    - draft forward 1번 = 제안 토큰 1개
+    → 수락 토큰 = 생성 토큰 - 본 모델 forward 수, 수락률 = 수락 토큰 / 제안 토큰
+    """
+
+    def __init__(self, model, draft=None):
+        self.models = {"main": model, "draft": draft}
+        self.calls = {"main": 0, "draft": 0}
+        self._handles = []
+
+    def __enter__(self):
+        for name, model in self.models.items():
+            if model is not None:
+                self._handles.append(model.register_forward_hook(self._hook(name)))
+        return self
+
+    def __exit__(self, *exc):
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+
+    def _hook(self, name: str):
+        def count(module, args, output):
+            self.calls[name] += 1
+        return count
+
+    def draft_tokens(self, generated_tokens: int) -> tuple[int, int]:
+        """
+        (제안 토큰 수, 수락 토큰 수)
+        """
+        proposed = self.calls["draft"]
+        return proposed, max(0, min(proposed, generated_tokens - self.calls["main"]))
+
+
+def _count_generated(outputs, input_len: int, pad_token_id) -> int:
+    # 프롬프트 뒤에 새로 붙은 토큰 중 패딩(= eos) 이 아닌 것
+    return int((outputs[:, input_len:] != pad_token_id).sum())
+
+
+def _record_generation(batch_size: int, prompt_tokens: int, prefill_tokens: int, generated_tokens: int,
+                       timer: _FirstStepTimer, finished_at: float):
+    """
+    prefill(첫 logits 까지) / decode(나머지) 시간과 토큰 수를 통계와 /metrics 에 기록
+    """
+    first_step_at = timer.first_step_at or finished_at
+    prefill_seconds = first_step_at - timer.started_at
+    decode_seconds = finished_at - first_step_at
+    with _prefill_lock:
+        _prefill_stats["requests"] += batch_size
+        _prefill_stats["prompt_tokens"] += prompt_tokens
+        _prefill_stats["prefill_tokens"] += prefill_tokens
+        _prefill_stats["prefill_seconds"] += prefill_seconds
+    metrics.record("llm_prefill", prefill_seconds)
+    metrics.record("llm_decode", decode_seconds)
+    metrics.record_tokens(prompt_tokens, prefill_tokens, generated_tokens, decode_seconds)
+
+
+_assist_stats = {"generations": 0, "generated_tokens": 0, "main_forwards": 0, "proposed_tokens": 0, "accepted_tokens": 0}
+_assist_lock = threading.Lock()
+
+
+def _record_assist(counter: ForwardCounter, generated_tokens: int):
+    proposed, accepted = counter.draft_tokens(generated_tokens)
+    with _assist_lock:
+        _assist_stats["generations"] += 1
+        _assist_stats["generated_tokens"] += generated_tokens
+        _assist_stats["main_forwards"] += counter.calls["main"]
+        _assist_stats["proposed_tokens"] += proposed
+        _assist_stats["accepted_tokens"] += accepted
+    metrics.record_draft_tokens(proposed, accepted)
+
+
+def get_assist_stats() -> dict:
+    """
+    assisted generation 수락률 (수락 / 제안 draft 토큰) 과 본 모델 forward 1번당 생성 토큰 수
+    """
+    with _assist_lock:
+        stats = dict(_assist_stats)
+    return {
+        "enabled": _draft is not None,
+        "draft_model": DRAFT_MODEL_DIR or None,
+        "generations": stats["generations"],
+        "proposed_tokens": stats["proposed_tokens"],
+        "accepted_tokens": stats["accepted_tokens"],
+        "acceptance_rate": stats["accepted_tokens"] / stats["proposed_tokens"] if stats["proposed_tokens"] else 0.0,
+        "tokens_per_forward": stats["generated_tokens"] / stats["main_forwards"] if stats["main_forwards"] else 0.0,
+    }
+
+
+def get_prefill_stats() -> dict:
+    """
+    요청당 프롬프트 토큰 수 vs 실제 prefill 한 토큰 수, 평균 prefill 시간
+    """
+    with _prefill_lock:
+        n = _prefill_stats["requests"]
+        return {
+            "prefix_cache": _prefix is not None,
+            "prefix_tokens": int(_prefix[0].shape[1]) if _prefix is not None else 0,
+            "requests": n,
+            "avg_prompt_tokens": _prefill_stats["prompt_tokens"] / n if n else 0.0,
+            "avg_prefill_tokens": _prefill_stats["prefill_tokens"] / n if n else 0.0,
+            "avg_prefill_ms": _prefill_stats["prefill_seconds"] * 1000.0 / n if n else 0.0,
+        }
+
+
+def generate_batch(prompts: list[str], stops: list = None) -> list[str]:
+    """
+    프롬프트 여러 개를 왼쪽 패딩해서 한 번의 generate 로 처리 (배치 스케줄러 워커 스레드 전용)
+    stops: 프롬프트별 종료 기준 (None 이면 기본값)
+    """
+    model, tokenizer = load_model()
+    stops = stops or [None] * len(prompts)
+    if _draft is not None and len(prompts) > 1:
+        # assisted generation 은 배치 1 만 지원 → 하나씩 생성
+        return [generate_batch([prompt], [stop])[0] for prompt, stop in zip(prompts, stops)]
+
+    with metrics.stage("llm_tokenize"):
+        inputs, prompt_tokens, prefill_tokens = _encode(prompts, model, tokenizer)
+    timer = _FirstStepTimer()
+
+    with torch.no_grad(), ForwardCounter(model, _draft) as counter:
+        outputs = model.generate(
+            **inputs,
+            **GENERATION_KWARGS,
+            logits_processor=LogitsProcessorList([timer]),
+            **_generation_controls(inputs, tokenizer, stops),
+            **_assist_kwargs(),
+        )
+
+    generated = _count_generated(outputs, inputs["input_ids"].shape[1], tokenizer.pad_token_id)
+    _record_generation(len(prompts), prompt_tokens, prefill_tokens, generated, timer, time.perf_counter())
+    if _draft is not None:
+        _record_assist(counter, generated)
+    with metrics.stage("llm_detokenize"):
+        return [tokenizer.decode(out, skip_special_tokens=True) for out in outputs]
+
+
+class _CallbackStreamer(TextStreamer):
+    """
+    generate 가 토큰을 만들 때마다 확정된 텍스트 조각을 콜백으로 넘기는 스트리머
+    """
+
+    def __init__(self, tokenizer, on_text):
+        super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        self.on_text = on_text
+
+    def on_finalized_text(self, text: str, stream_end: bool = False):
+        if text:
+            self.on_text(text)
+
+
+def generate_stream(prompt: str, on_text, stop: tuple[int, int] = None) -> str:
+    """
+    프롬프트 하나를 스트리밍으로 생성 (배치 스케줄러 워커 스레드 전용).
+    반환값은 generate_batch 와 같은 전체 디코딩 텍스트
+    """
+    model, tokenizer = load_model()
+
+    with metrics.stage("llm_tokenize"):
+        inputs, prompt_tokens, prefill_tokens = _encode([prompt], model, tokenizer)
+    timer = _FirstStepTimer()
+
+    with torch.no_grad(), ForwardCounter(model, _draft) as counter:
+        outputs = model.generate(
+            **inputs,
+            **GENERATION_KWARGS,
+            logits_processor=LogitsProcessorList([timer]),
+            streamer=_CallbackStreamer(tokenizer, on_text),
+            **_generation_controls(inputs, tokenizer, [stop]),
+            **_assist_kwargs(),
+        )
+
+    generated = _count_generated(outputs, inputs["input_ids"].shape[1], tokenizer.pad_token_id)
+    _record_generation(1, prompt_tokens, prefill_tokens, generated, timer, time.perf_counter())
+    if _draft is not None:
+        _record_assist(counter, generated)
+    with metrics.stage("llm_detokenize"):
+        return tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> BatchScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            # assisted generation 은 배치 1 만 되므로 모으지 않고 바로 처리
+            options = {"max_batch_size": 1} if DRAFT_MODEL_DIR else {}
+            _scheduler = BatchScheduler(generate_batch, stream_fn=generate_stream, **options)
+    return _scheduler
+
+
+# 엔드포인트별 지연 예산 (ms). 0 이면 예산 없이 생성이 끝날 때까지 기다린다
+LATENCY_BUDGETS_MS = {
+    "rag_weighted": float(os.getenv("LLM_BUDGET_MS_RAG_WEIGHTED", "0")),
+    "recommend": float(os.getenv("LLM_BUDGET_MS_RECOMMEND", "0")),
+    "rag_recommend": float(os.getenv("LLM_BUDGET_MS_RAG_RECOMMEND", "0")),
+    "condition_weight": float(os.getenv("LLM_BUDGET_MS_CONDITION_WEIGHT", "0")),
+    "menu_recommend": float(os.getenv("LLM_BUDGET_MS_MENU_RECOMMEND", "0")),
+}
+DEFAULT_BUDGET_MS = float(os.getenv("LLM_BUDGET_MS_DEFAULT", "0"))
+
+
+def get_budget(endpoint: str = None):
+    """
+    엔드포인트의 지연 예산(초). 예산이 없으면 None
+    """
+    budget_ms = LATENCY_BUDGETS_MS.get(endpoint, DEFAULT_BUDGET_MS)
+    return budget_ms / 1000.0 if budget_ms > 0 else None
+
+
+def _submit_generation(prompt: str, cache_key: str, limits: tuple[int, int]):
+    """
+    생성 요청을 대기열에 넣고, 끝나면 (호출자가 기다리고 있지 않더라도) 결과를 캐시에 채운다
+    """
+    future = get_scheduler().submit(prompt, stop=limits)
+
+    def fill_cache(f):
+        if not f.cancelled() and f.exception() is None:
+            advice_cache.set(cache_key, clean_response(f.result(), prompt, limits))
+
+    future.add_done_callback(fill_cache)
+    return future
+
+
+def _generation_result(future) -> str:
+    """
+    끝난 생성 요청의 결과. 워커 스레드가 기록한 단계(대기열, 토큰화, prefill, decode) 를 현재 요청의 Server-Timing 에 합친다
+    """
+    metrics.add_timings(getattr(future, "timings", ()))
+    return future.result()
+
+
+def ask_hf_llama(top5_list: list[dict], conditions: dict = None, endpoint: str = None) -> str:
+    # 같은 메뉴/조건/종료 기준 조합이면 모델을 거치지 않고 캐시된 문구를 바로 반환
+    limits = get_stop_limits(endpoint)
+    with metrics.stage("llm_cache"):
+        cache_key = make_cache_key(top5_list, conditions, limits)
+        cached = advice_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    with metrics.stage("llm_prompt"):
+        prompt = build_prompt(top5_list, conditions)
+    budget = get_budget(endpoint)
+
+    # 동시 요청은 스케줄러가 모아서 배치로 생성
+    try:
+        future = _submit_generation(prompt, cache_key, limits)
+        future.result(timeout=budget)
+        full_text = _generation_result(future)
+    except (FutureTimeoutError, LLMQueueFull) as e:
+        # 예산이 없으면 대기열 초과는 그대로 올려서 503 처리
+        if budget is None:
+            raise
+        # 예산 초과 → 템플릿 문구로 응답. 생성은 뒤에서 계속되어 다음 요청부터 캐시로 응답
+        logger.warning("⏱️ LLM 예산 초과(%s, %.2fs) → 템플릿 응답: %s", endpoint, budget, type(e).__name__)
+        return template_advice(top5_list, conditions)
+
+    with metrics.stage("llm_postprocess"):
+        return clean_response(full_text, prompt, limits)
+
+
+async def ask_hf_llama_async(top5_list: list[dict], conditions: dict = None, endpoint: str = None) -> str:
+    """
+    async 라우터용. 생성은 스케줄러 워커 스레드에서 돌고 이벤트 루프는 결과만 기다린다.
+    예산이 없을 때 대기열이 가득 차면 LLMQueueFull 이 그대로 올라간다 (main.py 에서 503 으로 변환)
+    """
+    limits = get_stop_limits(endpoint)
+    with metrics.stage("llm_cache"):
+        cache_key = make_cache_key(top5_list, conditions, limits)
+        cached = advice_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    with metrics.stage("llm_prompt"):
+        prompt = build_prompt(top5_list, conditions)
+    budget = get_budget(endpoint)
+
+    try:
+        future = _submit_generation(prompt, cache_key, limits)
+        # shield: 예산 초과로 기다리기를 그만둬도 생성 자체는 취소하지 않는다
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=budget)
+        full_text = _generation_result(future)
+    except (asyncio.TimeoutError, LLMQueueFull) as e:
+        if budget is None:
+            raise
+        logger.warning("⏱️ LLM 예산 초과(%s, %.2fs) → 템플릿 응답: %s", endpoint, budget, type(e).__name__)
+        return template_advice(top5_list, conditions)
+
+    with metrics.stage("llm_postprocess"):
+        return clean_response(full_text, prompt, limits)
+
+
+class AdviceStream:
+    """
+    llm_advice 를 토큰 단위로 흘려보내는 비동기 이터레이터
+
+    - 생성 요청은 생성자에서 바로 대기열에 넣는다 (가득 차면 여기서 LLMQueueFull → 503)
+    - ("token", 조각) 들을 내보낸 뒤 마지막에 ("done", 최종 문구) 를 내보낸다.
+      최종 문구는 clean_response 결과로, 비스트리밍 응답과 동일하다
+    - 클라이언트가 중간에 끊어도 생성은 끝까지 진행되어 캐시에 채워진다
+    """
+
+    _END = object()
+
+    def __init__(self, top5_list: list[dict], conditions: dict = None, endpoint: str = None):
+        self.limits = get_stop_limits(endpoint)
+        with metrics.stage("llm_cache"):
+            self.cache_key = make_cache_key(top5_list, conditions, self.limits)
+            self.cached = advice_cache.get(self.cache_key)
+        if self.cached is not None:
+            return
+
+        with metrics.stage("llm_prompt"):
+            self.prompt = build_prompt(top5_list, conditions)
+        self._loop = asyncio.get_running_loop()
+        self._chunks = asyncio.Queue()
+        self._future = get_scheduler().submit_stream(self.prompt, self._on_text, stop=self.limits)
+        self._future.add_done_callback(self._on_done)
+
+    def _on_text(self, text: str):
+        self._loop.call_soon_threadsafe(self._chunks.put_nowait, text)
+
+    def _on_done(self, future):
+        # 캐시 채우기가 실패해도 _END 는 반드시 넣는다 (안 넣으면 __aiter__ 가 영원히 기다려 SSE 가 멈춤)
+        try:
+            if future.exception() is None:
+                advice_cache.set(self.cache_key, clean_response(future.result(), self.prompt, self.limits))
+        except Exception:
+            logger.exception("⚠️ 스트리밍 설명 캐시 저장 실패")
+        finally:
+            self._loop.call_soon_threadsafe(self._chunks.put_nowait, self._END)
+
+    async def __aiter__(self):
+        if self.cached is not None:
+            yield "token", self.cached
+            yield "done", self.cached
+            return
+
+        cleaner = AdviceStreamCleaner(self.limits)
+        while True:
+            text = await self._chunks.get()
+            if text is self._END:
+                break
+            out = cleaner.feed(text)
+            if out:
+                yield "token", out
+
+        tail = cleaner.finish()
+        if tail:
+            yield "token", tail
+        with metrics.stage("llm_postprocess"):
+            final = clean_response(self._future.result(), self.prompt, self.limits)
+        yield "done", final
+
 # 호환성 유지
-def ask_site2_llama(top5_list, base_menu=None):
-    return ask_hf_llama(top5_list)
\ No newline at end of file
+def ask_site2_llama(top5_list, base_menu=None, endpoint: str = None):
+    return ask_hf_llama(top5_list, endpoint=endpoint)
\ No newline at end of file
@@ -0,0 +1,229 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from app.services import metrics
+
+# 배치 창 설정: 최대 배치 크기 / 첫 요청 이후 최대 대기 시간(ms)
+MAX_BATCH_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "4"))
+MAX_WAIT_MS = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "20"))
+
+# 대기열 최대 길이. 가득 차면 바로 거절해서 요청이 무한정 쌓이지 않게 한다
+MAX_QUEUE_SIZE = int(os.getenv("LLM_QUEUE_MAX_SIZE", "32"))
+
+# 지연시간 통계에 보관할 최근 요청 수
+LATENCY_WINDOW = 1000
+
+
+class LLMQueueFull(Exception):
+    """
+    LLM 대기열이 가득 찼을 때 발생. retry_after 는 재시도까지 권장 대기 시간(초)
+    """
+
+    def __init__(self, queue_depth: int, retry_after: int):
+        super().__init__(f"LLM queue is full ({queue_depth} waiting)")
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ("prompt", "future", "submitted_at", "on_text", "stop")
+
+    def __init__(self, prompt: str, on_text=None, stop=None):
+        self.prompt = prompt
+        self.stop = stop
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+        self.on_text = on_text
+
+
+class BatchScheduler:
+    """
+    동시에 들어온 프롬프트를 짧은 시간 창 동안 모아서 한 번의 generate 로 처리하는 스케줄러
+
+    - generate_fn(prompts: list[str], stops: list) -> list[str] 는 워커 스레드 하나에서만 호출된다
+      stops 는 요청별로 submit 때 넘긴 종료 기준 그대로 (없으면 None)
+    - submit() 은 Future 를 돌려주고, 배치가 끝나면 각 호출자의 Future 에 결과가 채워진다
+    - 대기열은 max_queue_size 로 제한되며, 가득 차면 submit() 이 LLMQueueFull 을 던진다
+    - submit_stream() 으로 들어온 요청은 배치 없이 단독으로 stream_fn(prompt, on_text, stop) 에 넘긴다
+    """
+
+    def __init__(
+        self,
+        generate_fn,
+        stream_fn=None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+    ):
+        self.generate_fn = generate_fn
+        self.stream_fn = stream_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue(maxsize=max(1, max_queue_size))
+        self._held = None  # 배치를 모으다 만난 스트리밍 요청 (다음 차례에 단독 처리)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # 통계
+        self._started_at = time.perf_counter()
+        self._completed = 0
+        self._failed = 0
+        self._batches = 0
+        self._batch_items = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._queue_waits = deque(maxlen=LATENCY_WINDOW)
+        self._batch_durations = deque(maxlen=LATENCY_WINDOW)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+            self._thread.start()
+
+    def submit(self, prompt: str, stop=None) -> Future:
+        return self._enqueue(_Job(prompt, stop=stop))
+
+    def submit_stream(self, prompt: str, on_text, stop=None) -> Future:
+        """
+        생성된 텍스트 조각이 나올 때마다 워커 스레드에서 on_text(text) 를 호출한다.
+        Future 에는 submit() 과 같은 형태의 전체 텍스트가 채워진다
+        """
+        return self._enqueue(_Job(prompt, on_text, stop))
+
+    def _enqueue(self, job: _Job) -> Future:
+        self.start()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise LLMQueueFull(self._queue.qsize(), self._retry_after())
+        return job.future
+
+    def _retry_after(self) -> int:
+        # 대기열이 비는 데 걸릴 시간 = 남은 배치 수 × 평균 배치 처리 시간
+        with self._lock:
+            durations = list(self._batch_durations)
+        avg = sum(durations) / len(durations) if durations else 1.0
+        batches = self._queue.qsize() / self.max_batch_size
+        return max(1, int(round(batches * avg)))
+
+    def _collect(self) -> list:
+        # 첫 요청은 올 때까지 기다리고, 이후로는 창이 닫힐 때까지 최대 배치 크기만큼 모은다
+        first, self._held = self._held or self._queue.get(), None
+        if first.on_text is not None:
+            return [first]
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job.on_text is not None:
+                self._held = job
+                break
+            batch.append(job)
+        return batch
+
+    def _generate(self, batch) -> list:
+        job = batch[0]
+        if job.on_text is None:
+            return self.generate_fn([job.prompt for job in batch], [job.stop for job in batch])
+        if self.stream_fn is not None:
+            return [self.stream_fn(job.prompt, job.on_text, job.stop)]
+
+        # 스트리밍 함수가 없으면 한 번에 생성해서 통째로 넘긴다
+        text = self.generate_fn([job.prompt], [job.stop])[0]
+        job.on_text(text)
+        return [text]
+
+    def _run(self):
+        while True:
+            # 기다리던 호출자가 취소한 요청은 생성하지 않는다
+            batch = [job for job in self._collect() if job.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started_at = time.perf_counter()
+            try:
+                # generate_fn 안에서 기록한 단계(토큰화, prefill, decode 등) 를 모아 각 요청의 Future 에 실어 보낸다
+                with metrics.collect() as timings:
+                    outputs = self._generate(batch)
+            except Exception as e:
+                self._attach_timings(batch, started_at, timings)
+                for job in batch:
+                    job.future.set_exception(e)
+                self._record(batch, started_at, failed=True)
+                continue
+
+            self._attach_timings(batch, started_at, timings)
+            for job, text in zip(batch, outputs):
+                job.future.set_result(text)
+            self._record(batch, started_at)
+
+    @staticmethod
+    def _attach_timings(batch, started_at: float, timings: list):
+        for job in batch:
+            wait = started_at - job.submitted_at
+            metrics.STAGE_SECONDS.labels("llm_queue").observe(wait)
+            job.future.timings = [("llm_queue", wait)] + timings
+
+    def _record(self, batch, started_at: float, failed: bool = False):
+        now = time.perf_counter()
+        with self._lock:
+            self._batches += 1
+            self._batch_items += len(batch)
+            self._batch_durations.append(now - started_at)
+            for job in batch:
+                self._queue_waits.append(started_at - job.submitted_at)
+            if failed:
+                self._failed += len(batch)
+                return
+            self._completed += len(batch)
+            for job in batch:
+                self._latencies.append(now - job.submitted_at)
+
+    def stats(self) -> dict:
+        """
+        처리량, 요청별 지연시간(p50/p95/p99, 초), 대기열 깊이와 대기 시간 스냅샷
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._started_at
+            latencies = sorted(self._latencies)
+            waits = sorted(self._queue_waits)
+            return {
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "queue_depth": self._queue.qsize(),
+                "queue_max_size": self._queue.maxsize,
+                "queue_wait_p50": _percentile(waits, 50),
+                "queue_wait_p95": _percentile(waits, 95),
+                "queue_wait_max": waits[-1] if waits else 0.0,
+                "batches": self._batches,
+                "avg_batch_size": self._batch_items / self._batches if self._batches else 0.0,
+                "throughput_rps": self._completed / elapsed if elapsed > 0 else 0.0,
+                "latency_p50": _percentile(latencies, 50),
+                "latency_p95": _percentile(latencies, 95),
+                "latency_p99": _percentile(latencies, 99),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
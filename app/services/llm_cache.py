@@ -0,0 +1,167 @@
+import logging
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 캐시 설정: 최대 항목 수 / 유효 시간(초, 0 이면 만료 없음) / 저장 파일 (비우면 메모리만 사용)
+CACHE_MAX_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+# 새 항목이 이만큼 쌓일 때마다 파일에 저장
+CACHE_PERSIST_EVERY = int(os.getenv("LLM_CACHE_PERSIST_EVERY", "50"))
+
+
+def make_cache_key(top5_list: list[dict], conditions: dict = None, limits: tuple = None) -> str:
+    """
+    (메뉴 목록, 조건, 로직 모드, 종료 기준) 를 정규화해서 캐시 키로 만든다
+
+    - 메뉴 순서는 유지 (첫 메뉴가 대표 메뉴로 쓰이므로)
+    - 조건은 빈 값 제거 + 문자열화 + 키 정렬
+    - limits: 엔드포인트별 (최대 문장 수, 최대 글자 수). 기준이 다르면 잘린 문구도 다르므로 따로 캐시
+    """
+    menus = [str(item.get("menu", "")) for item in top5_list]
+
+    conditions = conditions or {}
+    logic = conditions.get("logic") or ("context" if conditions else "default")
+    canonical_conditions = {
+        k: str(v).strip()
+        for k, v in sorted(conditions.items())
+        if k != "logic" and v is not None and str(v).strip() != ""
+    }
+
+    raw = json.dumps(
+        {"menus": menus, "conditions": canonical_conditions, "logic": logic,
+         "limits": list(limits) if limits is not None else None},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AdviceCache:
+    """
+    LLM 설명 문구 캐시 (LRU + TTL, 선택적으로 로컬 파일에 저장해 재시작 후에도 유지)
+    """
+
+    def __init__(
+        self,
+        max_size: int = CACHE_MAX_SIZE,
+        ttl: float = CACHE_TTL,
+        path: str = CACHE_PATH,
+        persist_every: int = CACHE_PERSIST_EVERY,
+    ):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.path = path
+        self.persist_every = max(1, persist_every)
+
+        self._data = OrderedDict()  # key → (저장 시각, 문구)
+        self._lock = threading.Lock()
+        # 파일 저장은 한 번에 하나씩 (워커 스레드의 주기 저장과 종료 시 저장이 겹칠 수 있음)
+        self._save_lock = threading.Lock()
+        self._dirty = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.path:
+            self.load()
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - stored_at > self.ttl
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[0], now):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+            self._dirty += 1
+            should_save = self.path and self._dirty >= self.persist_every
+        if should_save:
+            self.save()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ LLM 캐시 파일 로드 실패 (%s): %s", self.path, e)
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, stored_at, value in items:
+                if not self._expired(stored_at, now):
+                    self._data[key] = (stored_at, value)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def save(self) -> bool:
+        """
+        임시 파일에 쓴 뒤 교체해서, 저장 도중 죽어도 기존 파일이 깨지지 않게 한다
+        LLM 워커의 완료 콜백에서도 불리므로 디스크 오류는 올리지 않고 로그만 남긴다. 반환: 저장 성공 여부
+        """
+        if not self.path:
+            return False
+        with self._save_lock:
+            # 저장 잠금 안에서 스냅샷을 떠야 나중에 끝나는 저장이 항상 더 최신 내용을 쓴다
+            with self._lock:
+                items = [[key, stored_at, value] for key, (stored_at, value) in self._data.items()]
+                self._dirty = 0
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            tmp_path = None
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(items, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                return True
+            except OSError as e:
+                logger.warning("⚠️ LLM 캐시 파일 저장 실패 (%s): %s", self.path, e)
+                if tmp_path is not None:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "persist_path": self.path or None,
+            }
+
+
+advice_cache = AdviceCache()
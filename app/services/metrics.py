@@ -0,0 +1,182 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# 초 단위 버킷: 1ms ~ 30s (Cypher 한 번 ~ LLM 생성 전체까지)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "menu_stage_seconds", "추천 요청 단계별 소요 시간 (프롬프트 구성, 토큰화, prefill, decode, 후처리 등)",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+CYPHER_SECONDS = Histogram(
+    "menu_cypher_seconds", "이름 붙은 Cypher 쿼리 소요 시간",
+    ["query"], buckets=LATENCY_BUCKETS,
+)
+HTTP_SECONDS = Histogram(
+    "menu_http_request_seconds", "HTTP 요청 처리 시간 (스트리밍 응답은 끝날 때까지)",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "menu_llm_tokens_total", "LLM 토큰 수 (prompt: 프롬프트 전체, prefill: 실제 prefill, generated: 생성)",
+    ["kind"],
+)
+LLM_DRAFT_TOKENS = Counter(
+    "menu_llm_draft_tokens_total", "assisted generation draft 토큰 수 (proposed: 제안, accepted: 본 모델이 수락)",
+    ["kind"],
+)
+LLM_DECODE_TPS = Histogram(
+    "menu_llm_decode_tokens_per_second", "generate 한 번(배치)의 decode 처리량 (생성 토큰 수 / decode 시간)",
+    buckets=(1, 2.5, 5, 10, 20, 40, 80, 160, 320, 640),
+)
+
+# ==========================================
+# 1. 요청별 단계 기록 (Server-Timing 헤더용)
+# ==========================================
+# 현재 요청의 (단계, 초) 목록. 미들웨어가 요청마다 새 list 를 넣고, 같은 컨텍스트의 코드가 여기에 추가한다
+_timings = contextvars.ContextVar("server_timings", default=None)
+
+
+def start_request() -> list:
+    timings = []
+    _timings.set(timings)
+    return timings
+
+
+@contextmanager
+def collect():
+    """
+    요청 컨텍스트 밖(LLM 워커 스레드 등)에서 단계 기록을 모을 때 사용
+    모은 목록은 Future 등에 실어서 요청 쪽에서 add_timings() 로 합친다
+    """
+    timings = []
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def record(name: str, seconds: float):
+    """
+    히스토그램과 현재 요청의 단계 목록에 함께 기록
+    """
+    STAGE_SECONDS.labels(name).observe(seconds)
+    add_timings([(name, seconds)])
+
+
+def add_timings(items):
+    """
+    다른 곳에서 이미 히스토그램에 기록한 단계를 현재 요청의 목록에만 추가
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings.extend(items)
+
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+@contextmanager
+def cypher(name: str):
+    """
+    Cypher 쿼리 한 번을 이름으로 측정 (Server-Timing 에는 cypher_<이름> 으로 표시)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        CYPHER_SECONDS.labels(name).observe(seconds)
+        add_timings([(f"cypher_{name}", seconds)])
+
+
+def record_tokens(prompt_tokens: int, prefill_tokens: int, generated_tokens: int, decode_seconds: float):
+    LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels("prefill").inc(prefill_tokens)
+    LLM_TOKENS.labels("generated").inc(generated_tokens)
+    if decode_seconds > 0 and generated_tokens > 0:
+        LLM_DECODE_TPS.observe(generated_tokens / decode_seconds)
+
+
+def record_draft_tokens(proposed: int, accepted: int):
+    LLM_DRAFT_TOKENS.labels("proposed").inc(proposed)
+    LLM_DRAFT_TOKENS.labels("accepted").inc(accepted)
+
+
+def server_timing(timings, total: float = None) -> str:
+    """
+    Server-Timing 헤더 값. 같은 이름은 합산하고 처음 나온 순서를 유지한다 (단위 ms)
+    """
+    merged = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    if total is not None:
+        merged["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000.0:.1f}" for name, seconds in merged.items())
+
+
+# ==========================================
+# 2. 미들웨어 / /metrics
+# ==========================================
+class ServerTimingMiddleware:
+    """
+    순수 ASGI 미들웨어 (BaseHTTPMiddleware 보다 가볍고 스트리밍 응답을 버퍼링하지 않음)
+
+    - 요청마다 단계 목록을 새로 만들고, 응답 헤더를 보내는 시점까지 모인 단계를 Server-Timing 으로 붙인다
+      (SSE 는 헤더가 먼저 나가므로 검색 단계까지만 들어감)
+    - 응답이 끝나면 라우트 경로 템플릿 기준으로 HTTP 처리 시간을 기록
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request()
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(timings, time.perf_counter() - started)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_SECONDS.labels(scope["method"], _route_label(scope), str(status)).observe(time.perf_counter() - started)
+
+
+def _route_label(scope) -> str:
+    """
+    매칭된 라우트만 경로로 남김 (없는 경로 스캔으로 라벨이 늘어나지 않게)
+    include_router 한 라우트의 path 에는 prefix 가 빠져 있으므로 경로 파라미터가 없으면 실제 경로를 쓴다
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    if scope.get("path_params"):
+        return getattr(route, "path", "unmatched")
+    return scope["path"]
+
+
+def render() -> tuple[bytes, str]:
+    """
+    Prometheus 텍스트 형식 (본문, Content-Type)
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,235 @@
+import logging
+import os
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from app.services import metrics
+from app.db.queries import WITH_GRAPH_VERSION_BUMP
+
+logger = logging.getLogger(__name__)
+
+# 주문 로그 파일 (아직 그래프에 반영되지 않은 주문만 남아 있음)
+LOG_PATH = os.getenv("ORDER_LOG_PATH", "data/cache/order_log.jsonl")
+# 모아서 반영하는 주기(ms) / 이만큼 쌓이면 주기를 기다리지 않고 바로 반영
+FLUSH_INTERVAL_MS = float(os.getenv("ORDER_FLUSH_INTERVAL_MS", "200"))
+FLUSH_MAX_ORDERS = int(os.getenv("ORDER_FLUSH_MAX_ORDERS", "100"))
+# 0 이면 로그 없이 요청마다 바로 그래프에 쓴다
+WRITE_BEHIND = os.getenv("ORDER_WRITE_BEHIND", "1") == "1"
+
+# (유저, 메뉴) 별로 합친 주문을 한 번의 트랜잭션으로 반영
+# seq 는 단조 증가하는 주문 번호. 관계에 저장된 last_seq 이하인 주문은 세지 않아서 재실행해도 두 번 세지 않는다
+# (복구한 반영 완료 주문과 새 주문이 한 행에 합쳐져도 seqs 로 하나씩 걸러냄)
+# User 노드는 아웃박스 릴레이가 비동기로 만들므로 아직 없으면 여기서 user_id 만으로 만들어 둔다
+# (MATCH 로 하면 릴레이가 따라오기 전 주문은 반영된 것으로 처리된 채 사라짐. 이름/나이/성별은 릴레이가 채움)
+ORDER_BATCH_QUERY = """
+    UNWIND $rows AS row
+    MERGE (u:User {user_id: row.uid})
+    MERGE (m:Menu {name: row.menu})
+    MERGE (u)-[r:ORDERED]->(m)
+    WITH r, row, size([s IN row.seqs WHERE s > coalesce(r.last_seq, -1)]) AS n
+    SET r.count = coalesce(r.count, 0) + n,
+        r.last_eaten = CASE WHEN n > 0 THEN datetime() ELSE r.last_eaten END,
+        r.last_seq = CASE WHEN n > 0 THEN row.seq ELSE r.last_seq END
+""" + WITH_GRAPH_VERSION_BUMP
+
+
+def coalesce_orders(entries) -> list[dict]:
+    """
+    주문 목록을 (유저, 메뉴) 별로 합쳐 UNWIND 파라미터로 만든다
+    seqs: 합친 주문 번호 전부, seq: 그중 최댓값 (반영 후 last_seq)
+    """
+    rows = OrderedDict()
+    for entry in entries:
+        key = (entry["uid"], entry["menu"])
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {"uid": entry["uid"], "menu": entry["menu"], "seqs": [entry["seq"]], "seq": entry["seq"]}
+        else:
+            row["seqs"].append(entry["seq"])
+            row["seq"] = max(row["seq"], entry["seq"])
+    return list(rows.values())
+
+
+class OrderLog:
+    """
+    주문 write-behind 버퍼
+
+    - append() : 로그 파일에 한 줄 쓰고 fsync 한 뒤 바로 반환 (요청은 여기까지만 기다림)
+    - 플러셔 스레드 : FLUSH_INTERVAL_MS 마다 또는 FLUSH_MAX_ORDERS 개가 쌓이면 한 번에 반영
+    - 반영이 끝나면 로그를 아직 반영 안 된 주문만 남기도록 다시 쓴다
+    - 서버 재시작 시 로그에 남은 주문을 다시 읽어서 반영 (crash 복구)
+    """
+
+    def __init__(self, path: str = LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 반영 중에는 인기 카운터 재집계가 그래프를 읽지 않도록
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._pending = []
+        self._file = None
+        self._last_seq = 0
+        self._thread = None
+        self._session_factory = None
+
+        self.appended = 0
+        self.flushed = 0
+        self.flush_batches = 0
+        self.failures = 0
+
+    def next_seq(self) -> int:
+        """
+        새 주문 번호 (write-behind 를 끈 경우 요청마다 바로 쓸 때 사용)
+        """
+        with self._lock:
+            return self._next_seq()
+
+    def _next_seq(self) -> int:
+        # 재시작 후에도 이전 번호보다 커지도록 시각(ns) 기반 (락 안에서 호출)
+        self._last_seq = max(time.time_ns(), self._last_seq + 1)
+        return self._last_seq
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def replay(self) -> int:
+        """
+        로그에 남아 있는 (반영 전에 서버가 죽은) 주문을 대기열로 다시 올린다
+        """
+        entries = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # 쓰는 도중 죽어서 잘린 마지막 줄
+                        continue
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self._pending = entries + self._pending
+            if entries:
+                self._last_seq = max(self._last_seq, max(e["seq"] for e in entries))
+        if entries:
+            logger.info("♻️ 주문 로그 복구: 미반영 주문 %d건", len(entries))
+        return len(entries)
+
+    def append(self, user_id, menu_name: str):
+        with self._lock:
+            if self._file is None:
+                self._open()
+            entry = {"seq": self._next_seq(), "uid": user_id, "menu": menu_name}
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending.append(entry)
+            self.appended += 1
+            full = len(self._pending) >= FLUSH_MAX_ORDERS
+        if full:
+            self._wakeup.set()
+
+    def _rewrite(self):
+        # 남은 주문만 담은 새 로그로 교체 (append 와 같은 락 안에서 호출)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+        os.replace(tmp_path, self.path)
+        self._open()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        # 반영이 끝날 때까지 대기열에 남겨 둔다 (pending_counts 가 반영 중인 주문도 세도록)
+        with self._lock:
+            batch = list(self._pending)
+        if not batch:
+            return 0
+
+        rows = coalesce_orders(batch)
+        try:
+            with self._session_factory() as session, metrics.cypher("order_batch"):
+                session.execute_write(lambda tx: tx.run(ORDER_BATCH_QUERY, rows=rows).consume())
+        except Exception as e:
+            # 반영 실패 → 대기열에 그대로 두고 다음 주기에 재시도 (로그 파일도 그대로라 유실 없음)
+            with self._lock:
+                self.failures += 1
+            logger.warning("⚠️ 주문 반영 실패 (%d건 대기): %s", len(batch), e)
+            return 0
+
+        with self._lock:
+            # 반영하는 동안 뒤에 붙은 주문만 남긴다 (append 는 뒤에만 붙임)
+            self._pending = self._pending[len(batch):]
+            self._rewrite()
+            self.flushed += len(batch)
+            self.flush_batches += 1
+        return len(batch)
+
+    @contextmanager
+    def paused(self):
+        """
+        이 블록 동안은 반영하지 않는다. 그래프 읽기와 pending_counts() 를 같은 시점으로 맞출 때 사용
+        """
+        with self._flush_lock:
+            yield
+
+    def pending_counts(self) -> Counter:
+        """
+        아직 그래프에 반영되지 않은 메뉴별 주문 수
+        """
+        with self._lock:
+            return Counter(entry["menu"] for entry in self._pending)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(FLUSH_INTERVAL_MS / 1000.0)
+            self._wakeup.clear()
+            self.flush()
+        # 종료 시 남은 주문을 한 번 더 반영 시도 (실패해도 로그에 남아 있음)
+        self.flush()
+
+    def start(self, session_factory):
+        self._session_factory = session_factory
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.replay()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="order-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "write_behind": WRITE_BEHIND,
+                "pending": len(self._pending),
+                "appended": self.appended,
+                "flushed": self.flushed,
+                "flush_batches": self.flush_batches,
+                "failures": self.failures,
+                "avg_batch_size": self.flushed / self.flush_batches if self.flush_batches else 0.0,
+            }
+
+
+order_log = OrderLog()
@@ -0,0 +1,182 @@
+import logging
+import os
+import json
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app.db.models.outbox import OutboxEvent
+from app.services import metrics
+from app.db.queries import WITH_GRAPH_VERSION_BUMP
+
+logger = logging.getLogger(__name__)
+
+# 미처리 이벤트를 확인하는 주기(ms) / 한 번에 Neo4j 로 보낼 이벤트 수
+POLL_INTERVAL_MS = float(os.getenv("OUTBOX_POLL_INTERVAL_MS", "500"))
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+# 연속 실패 시 재시도 간격 상한(초). 실패할 때마다 주기를 두 배로 늘린다
+MAX_BACKOFF = float(os.getenv("OUTBOX_MAX_BACKOFF", "30"))
+
+USER_CREATED = "user_created"
+
+# 유저 노드 일괄 생성. user_id 기준 MERGE 라서 같은 이벤트를 다시 보내도 중복 노드가 생기지 않는다
+# 릴레이보다 주문이 먼저 반영되면 user_id 만 있는 노드가 이미 있으므로 ON CREATE 가 아니라 항상 SET 으로 채운다
+USER_BATCH_QUERY = """
+    UNWIND $rows AS row
+    MERGE (u:User {user_id: row.uid})
+    SET u.username = row.uname,
+        u.age = row.age,
+        u.gender = row.gender,
+        u.created_at = coalesce(u.created_at, datetime())
+""" + WITH_GRAPH_VERSION_BUMP
+
+
+def user_created_event(user) -> dict:
+    """
+    유저 저장과 같은 트랜잭션에 넣을 아웃박스 이벤트 내용
+    """
+    return {
+        "event_type": USER_CREATED,
+        "aggregate_id": user.id,
+        "payload": json.dumps(
+            {"uid": user.id, "uname": user.username, "age": user.age, "gender": user.gender},
+            ensure_ascii=False,
+        ),
+    }
+
+
+class OutboxRelay:
+    """
+    아웃박스 테이블의 미처리 이벤트를 Neo4j 로 옮기는 백그라운드 릴레이
+
+    - notify() : 회원가입 커밋 직후 호출 → 주기를 기다리지 않고 바로 깨어남
+    - 한 번에 BATCH_SIZE 개를 읽어 UNWIND 한 번으로 반영하고 processed_at 을 채움
+    - 실패하면 attempts/last_error 만 기록하고 다음 주기에 다시 시도 (MERGE 라 중복 반영 안전)
+    - 여러 워커가 동시에 돌아도 SKIP LOCKED 로 같은 이벤트를 나눠 갖지 않음
+    """
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._db_factory = None
+        self._graph_factory = None
+        self._lock = threading.Lock()
+
+        self.relayed = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_relayed_at = None
+
+    def notify(self):
+        self._wakeup.set()
+
+    def relay_once(self) -> int:
+        """
+        미처리 이벤트 한 묶음을 반영. 반환: 반영한 이벤트 수 (실패 시 예외)
+        """
+        db = self._db_factory()
+        try:
+            events = (
+                db.query(OutboxEvent)
+                .filter(OutboxEvent.processed_at.is_(None))
+                .order_by(OutboxEvent.id)
+                .limit(BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not events:
+                db.rollback()
+                return 0
+
+            rows = [json.loads(e.payload) for e in events if e.event_type == USER_CREATED]
+            try:
+                if rows:
+                    with self._graph_factory() as session, metrics.cypher("user_batch"):
+                        session.execute_write(lambda tx: tx.run(USER_BATCH_QUERY, rows=rows).consume())
+            except Exception as e:
+                for event in events:
+                    event.attempts += 1
+                    event.last_error = str(e)[:1000]
+                db.commit()
+                raise
+
+            now = datetime.utcnow()
+            for event in events:
+                event.processed_at = now
+                event.attempts += 1
+                event.last_error = None
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self.relayed += len(events)
+            self.batches += 1
+            self.last_relayed_at = time.time()
+        return len(events)
+
+    def _run(self):
+        delay = POLL_INTERVAL_MS / 1000.0
+        while not self._stop.is_set():
+            try:
+                # 한 묶음이 꽉 찼으면 남은 게 더 있을 수 있으므로 바로 이어서 처리
+                while self.relay_once() >= BATCH_SIZE and not self._stop.is_set():
+                    pass
+                delay = POLL_INTERVAL_MS / 1000.0
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    self.last_error = str(e)
+                delay = min(max(delay * 2, POLL_INTERVAL_MS / 1000.0), MAX_BACKOFF)
+                logger.warning("⚠️ 아웃박스 반영 실패 (%.1fs 후 재시도): %s", delay, e)
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+    def start(self, db_factory, graph_factory):
+        self._db_factory = db_factory
+        self._graph_factory = graph_factory
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """
+        lag_seconds : 가장 오래된 미처리 이벤트가 기다린 시간 (0 이면 밀린 것 없음)
+        """
+        pending, oldest = 0, None
+        if self._db_factory is not None:
+            db = self._db_factory()
+            try:
+                pending, oldest = (
+                    db.query(func.count(OutboxEvent.id), func.min(OutboxEvent.created_at))
+                    .filter(OutboxEvent.processed_at.is_(None))
+                    .one()
+                )
+            finally:
+                db.close()
+
+        with self._lock:
+            return {
+                "pending": pending,
+                "lag_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+                "relayed": self.relayed,
+                "batches": self.batches,
+                "failures": self.failures,
+                "last_error": self.last_error,
+                "last_relayed_at": self.last_relayed_at,
+            }
+
+
+outbox_relay = OutboxRelay()
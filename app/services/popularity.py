@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from app.services import metrics
+from app.services.order_log import order_log
+
+logger = logging.getLogger(__name__)
+
+# 그래프 기준으로 누적 카운터를 다시 맞추는 주기 (초)
+RECONCILE_INTERVAL = float(os.getenv("POPULARITY_RECONCILE_INTERVAL", "3600"))
+# 윈도우별로 미리 정렬해 둘 상위 메뉴 수
+TOP_K = int(os.getenv("POPULARITY_TOP_K", "10"))
+
+HOUR = 3600
+WEEK_HOURS = 7 * 24
+
+WINDOWS = ("all", "7d", "1h")
+
+# 메뉴별 누적 주문 수 (ORDERED.count 합계)
+ORDER_TOTALS_QUERY = """
+    MATCH (:User)-[r:ORDERED]->(m:Menu)
+    RETURN m.name AS menu, sum(r.count) AS orders
+"""
+
+
+class PopularityCounter:
+    """
+    메뉴 인기도를 주문이 들어올 때마다 증분으로 갱신하는 메모리 집계
+
+    - all    : 전체 기간 주문 수 (주기적으로 그래프에서 다시 맞춤)
+    - 7d     : 최근 7일 주문 수 (시간 단위 버킷 168개의 합을 따로 유지)
+    - 1h     : 현재 시간 버킷의 주문 수
+    읽기는 윈도우별로 미리 정렬해 둔 상위 TOP_K 목록을 잘라서 반환
+    """
+
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = max(1, top_k)
+        self._lock = threading.Lock()
+        self._all = Counter()
+        self._week = Counter()
+        self._hours = {}  # 시간 번호(epoch // 3600) → Counter
+        self._top = {}  # 윈도우 → 정렬된 [(메뉴, 주문 수)]
+        self._hour = None  # 정렬 목록을 만든 시간 번호
+        self.reconciled_at = None
+
+    def _expire(self, hour: int):
+        # 시간이 바뀌면 1h 목록이, 버킷이 빠지면 7d 목록이 달라지므로 정렬 목록도 버린다
+        if hour != self._hour:
+            self._hour = hour
+            self._top.clear()
+        # 7일이 지난 버킷은 7일 합계에서 빼고 버린다
+        expired = [h for h in self._hours if h <= hour - WEEK_HOURS]
+        for old in expired:
+            self._week.subtract(self._hours.pop(old))
+        if expired:
+            self._week += Counter()  # 0 이하 항목 정리
+            self._top.clear()
+
+    def record(self, menu: str, count: int = 1, now: float = None):
+        hour = int((now or time.time()) // HOUR)
+        with self._lock:
+            self._expire(hour)
+            self._all[menu] += count
+            self._week[menu] += count
+            self._hours.setdefault(hour, Counter())[menu] += count
+            self._top.clear()
+
+    def reconcile(self, totals: dict):
+        """
+        그래프에서 읽은 메뉴별 누적 주문 수로 전체 기간 카운터를 교체
+        totals 에는 아직 반영 전인(write-behind 대기) 주문도 더해서 넘겨야 한다
+        (ORDERED 에는 마지막 주문 시각만 있어서 7일/1시간 윈도우는 주문 스트림으로만 유지)
+        """
+        with self._lock:
+            self._all = Counter({menu: int(n) for menu, n in totals.items() if n})
+            self._top.clear()
+            self.reconciled_at = time.time()
+
+    def _counter(self, window: str, hour: int) -> Counter:
+        if window == "all":
+            return self._all
+        if window == "7d":
+            return self._week
+        if window == "1h":
+            return self._hours.get(hour, Counter())
+        raise ValueError(f"unknown window: {window}")
+
+    def top(self, k: int = 3, window: str = "all") -> list[tuple[str, int]]:
+        hour = int(time.time() // HOUR)
+        with self._lock:
+            self._expire(hour)
+            ranked = self._top.get(window)
+            if ranked is None:
+                ranked = self._counter(window, hour).most_common(self.top_k)
+                self._top[window] = ranked
+            return ranked[:k]
+
+    def top_filled(self, k: int = 3, windows=("7d", "all")) -> list[tuple[str, int]]:
+        """
+        앞 윈도우 순위부터 채우고 모자라면 다음 윈도우로 k 개까지 채운다
+        (재시작 직후엔 7d/1h 가 메모리에만 있어서 비어 있거나 몇 개뿐이므로)
+        """
+        ranked, seen = [], set()
+        for window in windows:
+            for menu, orders in self.top(self.top_k, window=window):
+                if menu not in seen:
+                    seen.add(menu)
+                    ranked.append((menu, orders))
+                if len(ranked) >= k:
+                    return ranked
+        return ranked
+
+    def loaded(self) -> bool:
+        return self.reconciled_at is not None or bool(self._all)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "menus": len(self._all),
+                "orders_all": sum(self._all.values()),
+                "orders_7d": sum(self._week.values()),
+                "hour_buckets": len(self._hours),
+                "reconciled_at": self.reconciled_at,
+            }
+
+
+popularity = PopularityCounter()
+
+
+def _reconcile(records, pending: Counter):
+    totals = Counter({record["menu"]: record["orders"] for record in records})
+    # 카운트는 했지만 아직 그래프에 반영되지 않은 주문을 더해야 재집계 때 빠지지 않는다
+    totals.update(pending)
+    popularity.reconcile(totals)
+    logger.info("🔄 인기 메뉴 카운터 재집계 (메뉴 %d개, 반영 대기 %d건)", len(totals), sum(pending.values()))
+
+
+def reconcile_from_graph(graph_session):
+    # 반영을 잠시 멈추고 읽어서 그래프 합계와 대기 주문이 겹치거나 빠지지 않게 한다
+    with order_log.paused():
+        with metrics.cypher("order_totals"):
+            records = list(graph_session.run(ORDER_TOTALS_QUERY))
+        pending = order_log.pending_counts()
+    _reconcile(records, pending)
+
+
+async def reconcile_from_graph_async(graph_session):
+    # 첫 폴백 요청에서 한 번만 타는 경로. 이벤트 루프를 반영 락으로 막지 않도록 멈추지 않고 읽는다
+    # (그 사이 반영된 주문은 다음 주기 재집계에서 바로잡힘)
+    with metrics.cypher("order_totals"):
+        records = await graph_session.run(ORDER_TOTALS_QUERY)
+    _reconcile(records, order_log.pending_counts())
+
+
+_reconciler = None
+_reconciler_stop = threading.Event()
+
+
+def _reconcile_loop(session_factory):
+    while True:
+        try:
+            with session_factory() as session:
+                reconcile_from_graph(session)
+        except Exception as e:
+            # Neo4j 가 아직 안 떠 있으면 기존 카운터를 유지하고 다음 주기에 재시도
+            logger.warning("⚠️ 인기 메뉴 재집계 실패: %s", e)
+        if _reconciler_stop.wait(RECONCILE_INTERVAL):
+            return
+
+
+def start_reconciler(session_factory):
+    """
+    시작 시 한 번 + RECONCILE_INTERVAL 마다 그래프에서 누적 카운터를 다시 맞추는 백그라운드 스레드
+    """
+    global _reconciler
+    if _reconciler is not None and _reconciler.is_alive():
+        return
+    _reconciler_stop.clear()
+    _reconciler = threading.Thread(
+        target=_reconcile_loop, args=(session_factory,), name="popularity-reconciler", daemon=True
+    )
+    _reconciler.start()
+
+
+def stop_reconciler():
+    _reconciler_stop.set()
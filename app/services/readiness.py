@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.database import neo4j_conn, async_neo4j_conn
+from app.db import graph_schema
+from app.services import context_graph
+from app.services import hf_llm
+
+logger = logging.getLogger(__name__)
+
+# 서버 시작 시 모델을 미리 올릴지 (0 이면 첫 요청 때 로드, /readyz 도 모델을 기다리지 않음)
+LLM_EAGER_LOAD = os.getenv("LLM_EAGER_LOAD", "1") == "1"
+# 모델 로드 후 돌려볼 워밍업 생성 횟수
+LLM_WARMUP_RUNS = int(os.getenv("LLM_WARMUP_RUNS", "1"))
+# Neo4j 연결 확인 재시도 간격 (초)
+NEO4J_RETRY_INTERVAL = float(os.getenv("NEO4J_READY_RETRY_INTERVAL", "2"))
+
+# 워밍업용 샘플 요청 (실제 프롬프트와 같은 경로를 타도록 상황 기반 조건 사용)
+WARMUP_MENUS = [{"menu": "오늘의사시미"}]
+WARMUP_CONDITIONS = {"people": "2명", "time": "18시", "season": "겨울", "price": "20000원대"}
+
+_state = {
+    "neo4j": False,
+    "neo4j_async": False,
+    "schema": None,
+    "model": not LLM_EAGER_LOAD,
+    "warmup_runs": 0,
+    "error": None,
+}
+_lock = threading.Lock()
+_stop = threading.Event()
+_async_task = None
+
+
+def _set(**kwargs):
+    with _lock:
+        _state.update(kwargs)
+
+
+def _warm_neo4j():
+    while not _stop.is_set():
+        try:
+            neo4j_conn.driver.verify_connectivity()
+            _set(neo4j=True)
+            logger.info("✅ Neo4j 연결 확인 완료")
+            break
+        except Exception as e:
+            logger.info("⏳ Neo4j 연결 대기 중: %s", e)
+            _stop.wait(NEO4J_RETRY_INTERVAL)
+    else:
+        return
+
+    # 제약조건/인덱스 적용 (실패해도 서비스는 계속 동작하므로 readiness 에는 반영하지 않음)
+    if graph_schema.GRAPH_SCHEMA_ON_STARTUP:
+        try:
+            with neo4j_conn.get_session() as session:
+                _set(schema=graph_schema.bootstrap_schema(session))
+        except Exception as e:
+            _set(schema=False)
+            logger.error("❌ 그래프 스키마 적용 실패: %s", e)
+
+    # 첫 상황 추천 요청이 스냅샷 로딩을 떠안지 않도록 미리 만든다
+    try:
+        with neo4j_conn.get_session() as session:
+            context_graph.refresh(session)
+    except Exception as e:
+        logger.warning("⚠️ 상황 그래프 스냅샷 미리 로드 실패: %s", e)
+
+
+async def _warm_async_neo4j():
+    """
+    v2 라우터가 실제로 쓰는 비동기 드라이버도 따로 확인 (동기 드라이버와 풀이 분리되어 있음)
+    """
+    while True:
+        try:
+            await async_neo4j_conn.driver.verify_connectivity()
+            _set(neo4j_async=True)
+            logger.info("✅ Neo4j 비동기 드라이버 연결 확인 완료")
+            return
+        except Exception as e:
+            logger.info("⏳ Neo4j 비동기 드라이버 연결 대기 중: %s", e)
+            await asyncio.sleep(NEO4J_RETRY_INTERVAL)
+
+
+def _warm_model():
+    try:
+        started = time.perf_counter()
+        hf_llm.load_model()
+        logger.info("✅ 모델 로드 완료 (%.1fs)", time.perf_counter() - started)
+
+        # 캐시를 거치지 않고 스케줄러로 직접 생성 → 실제 요청과 같은 워커 스레드에서 커널 워밍업
+        prompt = hf_llm.build_prompt(WARMUP_MENUS, WARMUP_CONDITIONS)
+        for i in range(LLM_WARMUP_RUNS):
+            started = time.perf_counter()
+            hf_llm.get_scheduler().submit(prompt).result()
+            _set(warmup_runs=i + 1)
+            logger.info("🔥 워밍업 생성 %d/%d (%.1fs)", i + 1, LLM_WARMUP_RUNS, time.perf_counter() - started)
+
+        _set(model=True)
+    except Exception as e:
+        _set(error=f"model: {e}")
+        logger.error("❌ 모델 워밍업 실패: %s", e)
+
+
+def start_warmup():
+    """
+    Neo4j 연결 확인과 모델 로드/워밍업을 백그라운드로 시작 (서버 시작을 막지 않음)
+    lifespan 안(이벤트 루프 위)에서 호출해야 한다 (비동기 드라이버 확인은 같은 루프의 태스크로)
+    """
+    global _async_task
+    _stop.clear()
+    threading.Thread(target=_warm_neo4j, name="neo4j-warmup", daemon=True).start()
+    _async_task = asyncio.get_running_loop().create_task(_warm_async_neo4j())
+    if LLM_EAGER_LOAD:
+        threading.Thread(target=_warm_model, name="llm-warmup", daemon=True).start()
+
+
+def stop_warmup():
+    _stop.set()
+    if _async_task is not None:
+        _async_task.cancel()
+
+
+def readiness() -> dict:
+    with _lock:
+        state = dict(_state)
+    state["ready"] = state["neo4j"] and state["neo4j_async"] and state["model"]
+    return state
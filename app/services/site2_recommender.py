@@ -1,37 +1,155 @@
+import logging
 import os
-import json
-from collections import defaultdict
+import threading
 
-BASE_PATH = "data/site2_db"
+import numpy as np
+from scipy import sparse
 
-# 추천 메뉴 + 가중치 리스트 생성 함수
-def get_top5_menu_with_weights(input_menu: str):
-    weight_map = defaultdict(lambda: defaultdict(float))
+from app.services.weight_artifact import get_artifact, artifact_mtime, ARTIFACT_PATH
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 5
+
+# 파일 변경 감시 주기 (초)
+WATCH_INTERVAL = float(os.getenv("SITE2_WATCH_INTERVAL", "5"))
+# 추천에 합산할 차원 (기존 site2_db 와 같은 구성, category 는 제외)
+PAIRING_DIMS = [
+    d.strip() for d in os.getenv("SITE2_PAIRING_DIMS", "alchol,comb,people,price,rain,season,time").split(",")
+    if d.strip()
+]
+
+
+class PairingTable:
+    """
+    가중치 파일(weights.bin)의 차원별 CSR 로 만든 메뉴 × 메뉴 가중치 테이블
+
+    - dims   : 차원 이름 목록 (예: alchol, price ...)
+    - menus  : 메뉴 이름 목록 (행/열 번호 공용, 가중치 파일의 메뉴 ID 와 같음)
+    - matrix : 차원별 희소 행렬 (입력 메뉴 × 추천 메뉴)
+    - top5   : 입력 메뉴 → 미리 계산해 둔 상위 5개 결과
+    """
+
+    def __init__(self, dims, menus, matrix, top5, mtimes):
+        self.dims = dims
+        self.menus = menus
+        self.matrix = matrix
+        self.top5 = top5
+        self.mtimes = mtimes
 
-    for file in os.listdir(BASE_PATH):
-        if not file.endswith(".json"):
+
+def _file_mtimes(path=None):
+    return artifact_mtime(path or ARTIFACT_PATH)
+
+
+def build_pairing_table(path=None, k: int = TOP_K) -> PairingTable:
+    """
+    가중치 파일의 차원별 CSR 을 그대로 희소 행렬로 감싸고, 입력 메뉴마다 상위 k개 결과를 미리 계산한다
+    """
+    artifact = get_artifact(path)
+    menus = artifact.menus
+    n = len(menus)
+    dims = [d for d in PAIRING_DIMS if d in artifact.pairings]
+
+    # 같은 (입력, 추천) 쌍은 컴파일 때 이미 합산됨
+    # 가중치 0 항목도 결과에 포함되도록 등장 여부는 별도 행렬로 관리
+    matrix = {}
+    present = sparse.csr_matrix((n, n), dtype=np.int32)
+    for key_name in dims:
+        view = artifact.pairing(key_name)
+        m = sparse.csr_matrix((view.weights, view.indices, view.indptr), shape=(n, n))
+        matrix[key_name] = m.astype(np.float64)
+        present = present + sparse.csr_matrix(
+            (np.ones(len(view.indices), dtype=np.int32), view.indices, view.indptr), shape=(n, n)
+        )
+
+    total = sparse.csr_matrix((n, n), dtype=np.float64)
+    for m in matrix.values():
+        total = total + m
+
+    top5 = {}
+    for src in range(n):
+        start, end = present.indptr[src], present.indptr[src + 1]
+        if start == end:
             continue
+        targets = present.indices[start:end]
+
+        items = []
+        for dst in targets:
+            item = {"menu": menus[dst], "weight_sum": round(float(total[src, dst]), 4)}
+            for key_name in dims:
+                m = matrix[key_name]
+                if _has_entry(m, src, dst):
+                    item[f"{key_name}_weight"] = round(float(m[src, dst]), 4)
+            items.append(item)
+
+        items.sort(key=lambda x: x["weight_sum"], reverse=True)
+        top5[menus[src]] = items[:k]
+
+    return PairingTable(dims, menus, matrix, top5, artifact.mtime)
 
-        file_path = os.path.join(BASE_PATH, file)
-        key_name = file.replace(".json", "")  # 예: alchol, price, etc
-
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        for entry in data:
-            if entry.get("menu") == input_menu:
-                for cat in entry.get("category", []):
-                    menu_name = cat["type"]
-                    weight_map[menu_name][f"{key_name}_weight"] += cat["weight"]
-
-    result = []
-    for menu, weights in weight_map.items():
-        total = sum(weights.values())
-        item = {
-            "menu": menu,
-            "weight_sum": round(total, 4),
-            **{k: round(v, 4) for k, v in weights.items()}
-        }
-        result.append(item)
-
-    return sorted(result, key=lambda x: x["weight_sum"], reverse=True)[:5]
\ No newline at end of file
+
+def _has_entry(m, row, col) -> bool:
+    start, end = m.indptr[row], m.indptr[row + 1]
+    return col in m.indices[start:end]
+
+
+_table = None
+_table_lock = threading.Lock()
+_watcher = None
+_watcher_stop = threading.Event()
+
+
+def get_pairing_table() -> PairingTable:
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = build_pairing_table()
+    return _table
+
+
+def reload_pairing_table(force: bool = False) -> bool:
+    """
+    파일이 바뀌었으면 새 테이블을 만든 뒤 참조만 교체한다 (요청 중에는 항상 완성된 테이블만 보임)
+    """
+    global _table
+    with _table_lock:
+        if not force and _table is not None and _file_mtimes() == _table.mtimes:
+            return False
+        table = build_pairing_table()
+        _table = table
+    logger.info("🔄 site2 페어링 테이블 갱신 (메뉴 %d개)", len(table.top5))
+    return True
+
+
+def _watch_loop():
+    while not _watcher_stop.wait(WATCH_INTERVAL):
+        try:
+            reload_pairing_table()
+        except Exception as e:
+            # 가중치 파일을 읽지 못함 → 기존 테이블 유지 후 다음 주기에 재시도
+            logger.warning("⚠️ site2 페어링 테이블 갱신 실패: %s", e)
+
+
+def start_watcher():
+    """
+    가중치 파일 변경(재빌드)을 감시하는 백그라운드 스레드 시작
+    """
+    global _watcher
+    get_pairing_table()
+    if _watcher is not None and _watcher.is_alive():
+        return
+    _watcher_stop.clear()
+    _watcher = threading.Thread(target=_watch_loop, name="site2-watcher", daemon=True)
+    _watcher.start()
+
+
+def stop_watcher():
+    _watcher_stop.set()
+
+
+# 추천 메뉴 + 가중치 리스트 생성 함수
+def get_top5_menu_with_weights(input_menu: str):
+    items = get_pairing_table().top5.get(input_menu, [])
+    return [dict(item) for item in items]
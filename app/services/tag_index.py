@@ -0,0 +1,261 @@
+import logging
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+from app.services import metrics
+from app.db.queries import WITH_GRAPH_VERSION_BUMP
+
+logger = logging.getLogger(__name__)
+
+# 전체 재구성 주기 (초). 그 사이 태그 변경은 update_menu_tags() 로 부분 갱신
+REFRESH_INTERVAL = float(os.getenv("TAG_INDEX_REFRESH_INTERVAL", "600"))
+# 메뉴마다 보관할 이웃(태그가 겹치는 메뉴) 수
+NEIGHBORS_TOP_N = int(os.getenv("TAG_INDEX_TOP_N", "50"))
+
+# 메뉴 ↔ 태그 전체 간선
+MENU_TAGS_QUERY = """
+    MATCH (m:Menu)-[:HAS_TAG]->(t:Tag)
+    RETURN m.name AS menu, t.name AS tag
+"""
+
+# 유저가 주문한 메뉴 목록 (user_id 제약조건으로 바로 찾음)
+EATEN_MENUS_QUERY = """
+    MATCH (u:User {user_id: $uid})-[:ORDERED]->(m:Menu)
+    RETURN m.name AS menu
+"""
+
+# 메뉴의 태그를 통째로 교체
+REPLACE_MENU_TAGS_QUERY = """
+    MERGE (m:Menu {name: $menu_name})
+    WITH m
+    OPTIONAL MATCH (m)-[old:HAS_TAG]->(:Tag)
+    DELETE old
+    WITH DISTINCT m
+    UNWIND $tags AS tag_name
+    MERGE (t:Tag {name: tag_name})
+    MERGE (m)-[:HAS_TAG]->(t)
+""" + WITH_GRAPH_VERSION_BUMP
+
+
+class TagIndex:
+    """
+    Menu × Tag 희소 행렬과, 그로부터 계산한 메뉴별 태그 겹침 상위 N 이웃 목록
+
+    - menu_tags   : 메뉴 번호 → 태그 번호 집합 (증분 갱신의 기준 데이터)
+    - incidence   : (메뉴 × 태그) 0/1 CSR 행렬
+    - neighbors   : (메뉴 × 메뉴) CSR 행렬, 값 = 겹치는 태그 수 (메뉴마다 상위 N개만)
+    """
+
+    def __init__(self, top_n: int = NEIGHBORS_TOP_N):
+        self.top_n = max(1, top_n)
+        self.menus = []
+        self.menu_ids = {}
+        self.tags = []
+        self.tag_ids = {}
+        self.menu_tags = []
+        self.tag_menus = []  # 태그 번호 → 메뉴 번호 집합 (영향 범위 계산용)
+        self.neighbor_lists = []  # 메뉴 번호 → (이웃 번호 배열, 겹침 수 배열)
+        self.incidence = sparse.csr_matrix((0, 0))
+        self.neighbors = sparse.csr_matrix((0, 0))
+        self.loaded_at = time.monotonic()
+
+    def _menu_id(self, name) -> int:
+        if name not in self.menu_ids:
+            self.menu_ids[name] = len(self.menus)
+            self.menus.append(name)
+            self.menu_tags.append(set())
+            self.neighbor_lists.append((np.empty(0, dtype=np.int64), np.empty(0)))
+        return self.menu_ids[name]
+
+    def _tag_id(self, name) -> int:
+        if name not in self.tag_ids:
+            self.tag_ids[name] = len(self.tags)
+            self.tags.append(name)
+            self.tag_menus.append(set())
+        return self.tag_ids[name]
+
+    def _build_incidence(self):
+        rows = [m for m, tag_set in enumerate(self.menu_tags) for _ in tag_set]
+        cols = [t for tag_set in self.menu_tags for t in tag_set]
+        self.incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(self.menus), len(self.tags)),
+        )
+
+    def _compute_neighbors(self, menu_ids):
+        # 선택한 메뉴 행들과 전체 메뉴의 겹침 수를 한 번의 희소 행렬 곱으로 계산
+        overlap = (self.incidence[menu_ids] @ self.incidence.T).tocsr()
+        for i, menu in enumerate(menu_ids):
+            start, end = overlap.indptr[i], overlap.indptr[i + 1]
+            cols = overlap.indices[start:end]
+            counts = overlap.data[start:end]
+            keep = cols != menu
+            cols, counts = cols[keep], counts[keep]
+            if len(cols) > self.top_n:
+                top = np.argpartition(-counts, self.top_n - 1)[: self.top_n]
+                cols, counts = cols[top], counts[top]
+            self.neighbor_lists[menu] = (cols.astype(np.int64), counts)
+
+    def _build_neighbors(self):
+        n = len(self.menus)
+        rows = np.concatenate(
+            [np.full(len(cols), m, dtype=np.int64) for m, (cols, _) in enumerate(self.neighbor_lists)]
+            or [np.empty(0, dtype=np.int64)]
+        )
+        cols = np.concatenate([cols for cols, _ in self.neighbor_lists] or [np.empty(0, dtype=np.int64)])
+        data = np.concatenate([counts for _, counts in self.neighbor_lists] or [np.empty(0)])
+        self.neighbors = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+
+    def load(self, records):
+        for record in records:
+            menu = self._menu_id(record["menu"])
+            tag = self._tag_id(record["tag"])
+            self.menu_tags[menu].add(tag)
+            self.tag_menus[tag].add(menu)
+
+        self._build_incidence()
+        self._compute_neighbors(list(range(len(self.menus))))
+        self._build_neighbors()
+        self.loaded_at = time.monotonic()
+
+    def update_menu_tags(self, menu_name: str, tag_names) -> int:
+        """
+        한 메뉴의 태그가 바뀌었을 때, 겹침이 달라질 수 있는 메뉴들의 이웃 목록만 다시 계산
+        반환: 다시 계산한 메뉴 수
+        """
+        menu = self._menu_id(menu_name)
+        old_tags = self.menu_tags[menu]
+        new_tags = {self._tag_id(name) for name in tag_names}
+
+        for tag in old_tags - new_tags:
+            self.tag_menus[tag].discard(menu)
+        for tag in new_tags - old_tags:
+            self.tag_menus[tag].add(menu)
+        self.menu_tags[menu] = new_tags
+
+        # 예전 태그나 새 태그를 하나라도 가진 메뉴 + 자기 자신
+        affected = {menu}
+        for tag in old_tags | new_tags:
+            affected |= self.tag_menus[tag]
+
+        self._build_incidence()
+        self._compute_neighbors(sorted(affected))
+        self._build_neighbors()
+        return len(affected)
+
+    def recommend(self, eaten_names, k: int = 3) -> list[dict]:
+        """
+        먹은 메뉴들의 이웃 목록을 합산 → 먹은 메뉴 제외 → 상위 k개
+        score 는 기존 쿼리의 count(t) 와 같은 값 (먹은 메뉴별 겹치는 태그 수의 합)
+        """
+        eaten = [self.menu_ids[name] for name in eaten_names if name in self.menu_ids]
+        if not eaten:
+            return []
+
+        scores = np.asarray(self.neighbors[eaten].sum(axis=0)).ravel()
+        scores[eaten] = 0
+        candidates = np.flatnonzero(scores > 0)
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+
+        cand_scores = scores[candidates]
+        top = np.argpartition(-cand_scores, k - 1)[:k]
+        top = candidates[top[np.argsort(-cand_scores[top], kind="stable")]]
+
+        # 이유: 추천 메뉴의 태그 중 먹은 메뉴들이 가진 태그
+        eaten_tags = set().union(*(self.menu_tags[m] for m in eaten))
+        return [
+            {
+                "menu": self.menus[i],
+                "reasons": [self.tags[t] for t in sorted(self.menu_tags[i] & eaten_tags)],
+                "score": int(scores[i]),
+            }
+            for i in top
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "menus": len(self.menus),
+            "tags": len(self.tags),
+            "tag_edges": int(self.incidence.nnz),
+            "neighbor_edges": int(self.neighbors.nnz),
+            "top_n": self.top_n,
+            "age_seconds": time.monotonic() - self.loaded_at,
+        }
+
+
+_index = None
+_index_lock = threading.Lock()  # 증분 갱신과 조회가 서로의 중간 상태를 보지 않도록
+_refresh_lock = asyncio.Lock()
+
+
+def build_tag_index(records) -> TagIndex:
+    index = TagIndex()
+    index.load(records)
+    return index
+
+
+def _is_fresh() -> bool:
+    return _index is not None and time.monotonic() - _index.loaded_at <= REFRESH_INTERVAL
+
+
+async def get_tag_index(graph_session) -> TagIndex:
+    """
+    현재 인덱스를 반환. 없거나 재구성 주기가 지났을 때만 Neo4j 를 다시 읽는다
+    """
+    global _index
+    if _is_fresh():
+        return _index
+
+    async with _refresh_lock:
+        if _is_fresh():
+            return _index
+        try:
+            with metrics.cypher("menu_tags"):
+                records = await graph_session.run(MENU_TAGS_QUERY)
+            index = build_tag_index(records)
+        except Exception as e:
+            if _index is None:
+                raise
+            logger.warning("⚠️ 태그 인덱스 갱신 실패, 기존 인덱스 사용: %s", e)
+            return _index
+        with _index_lock:
+            _index = index
+    logger.info("🔄 태그 인덱스 갱신 (메뉴 %d개, 태그 %d개)", len(index.menus), len(index.tags))
+    return index
+
+
+async def recommend_for_user(graph_session, user_id, k: int = 3) -> list[dict]:
+    """
+    유저가 먹은 메뉴만 Neo4j 에서 읽고, 나머지 탐색은 메모리 인덱스에서 처리
+    """
+    with metrics.cypher("eaten_menus"):
+        eaten = [record["menu"] for record in await graph_session.run(EATEN_MENUS_QUERY, uid=user_id)]
+    index = await get_tag_index(graph_session)
+    with _index_lock:
+        return index.recommend(eaten, k=k)
+
+
+async def update_menu_tags(graph_session, menu_name: str, tag_names) -> int:
+    """
+    Neo4j 의 HAS_TAG 를 교체하고 메모리 인덱스도 해당 부분만 갱신
+    """
+    tag_names = list(dict.fromkeys(tag_names))
+    with metrics.cypher("replace_menu_tags"):
+        await graph_session.run(REPLACE_MENU_TAGS_QUERY, menu_name=menu_name, tags=tag_names)
+    index = await get_tag_index(graph_session)
+    with _index_lock:
+        return index.update_menu_tags(menu_name, tag_names)
+
+
+def get_stats() -> dict:
+    index = _index
+    if index is None:
+        return {"loaded": False}
+    return {"loaded": True, **index.stats()}
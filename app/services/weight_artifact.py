@@ -0,0 +1,305 @@
+import logging
+import os
+import json
+import hashlib
+import mmap
+import struct
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 컴파일된 가중치 파일 / 원본 CSV 폴더 (var, non_var 하위 폴더)
+ARTIFACT_PATH = os.getenv("WEIGHT_ARTIFACT_PATH", "data/weights.bin")
+DATA_ROOT = os.getenv("WEIGHT_DATA_ROOT", "data")
+
+MAGIC = b"MENUWGT\x00"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+# 조건 이름 : var CSV (메뉴 → 조건 값)
+CONDITION_FILES = {
+    "people": "people.csv",
+    "price": "price.csv",
+    "time": "time.csv",
+    "rain": "rain.csv",
+    "season": "season.csv",
+    "alcohol": "alchol.csv",
+    "category": "category.csv",
+}
+
+# 차원 이름 : non_var CSV (메뉴 → 메뉴)
+PAIRING_FILES = {
+    "alchol": "menu_alchol_edges.csv",
+    "category": "menu_category_edges.csv",
+    "comb": "menu_comb_edges.csv",
+    "people": "menu_people_edges.csv",
+    "price": "menu_price_edges.csv",
+    "rain": "menu_rain_edges.csv",
+    "season": "menu_season_edges.csv",
+    "time": "menu_time_edges.csv",
+}
+
+# CSV 의 조건 값(DB 표기) → 프론트엔드/site1 표기
+SITE1_KEYS = {
+    "price": {
+        "0~10000원": "0", "10000원대": "10000", "20000원대": "20000", "30000원대": "30000",
+        "40000원대": "40000", "50000~100000원": "50000", "10만원 이상": "100000",
+    },
+    "rain": {"0mm": "0mm", "0~3mm": "3mm", "3~15mm": "3", "15~30mm": "15", "30mm 이상": "30mm"},
+    "season": {"봄": "spring", "여름": "summer", "가을": "autumn", "겨울": "winter"},
+    "alcohol": {
+        "맥주": "beer", "사케": "sake", "생맥주": "fr_beer", "소주": "soju",
+        "위스키": "wisky", "증류소주": "pri_sohu",
+    },
+}
+
+
+def site1_key(dim: str, value: str) -> str:
+    if dim == "people":
+        return value.removesuffix("명")
+    if dim == "time":
+        return value.removesuffix("시")
+    return SITE1_KEYS.get(dim, {}).get(value, value)
+
+
+# ==========================================
+# 1. 빌드 (CSV → 바이너리)
+# ==========================================
+def _read_edges(file_path: str) -> pd.DataFrame:
+    df = pd.read_csv(file_path, encoding="utf-8-sig")
+    df.columns = [c.strip() for c in df.columns]
+    df = df[["source", "target", "weight"]].dropna(subset=["source", "target"])
+    df["source"] = df["source"].astype(str).str.strip()
+    df["target"] = df["target"].astype(str).str.strip()
+    # 기존 JSON 과 같은 값이 나오도록 소수 4자리로 반올림
+    df["weight"] = pd.to_numeric(df["weight"], errors="coerce").fillna(0.0).round(4)
+    return df
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, n_rows: int):
+    # 행 번호 기준 안정 정렬 → 같은 행 안에서는 CSV 순서 유지
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n_rows + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32), weights[order].astype(np.float32)
+
+
+def compile_weights(data_root: str = None, out_path: str = None) -> dict:
+    """
+    var / non_var CSV 전체를 하나의 바이너리 파일로 컴파일
+
+    - 메뉴 이름은 하나의 ID 테이블로 인터닝 (헤더 JSON 에 저장)
+    - 조건별 (조건 값 × 메뉴), 차원별 (입력 메뉴 × 추천 메뉴) CSR 배열을 float32/int32 로 저장
+    - 헤더에는 원본 CSV 해시로 만든 data_version 을 기록
+    """
+    data_root = data_root or DATA_ROOT
+    out_path = out_path or ARTIFACT_PATH
+    started = time.perf_counter()
+
+    frames = {}
+    sources = {}
+    for group, files in (("var", CONDITION_FILES), ("non_var", PAIRING_FILES)):
+        for dim, filename in files.items():
+            path = os.path.join(data_root, group, filename)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                sources[f"{group}/{filename}"] = hashlib.sha256(f.read()).hexdigest()
+            df = _read_edges(path)
+            if group == "var":
+                # 조건 값(target) 기준 정렬, 같은 (값, 메뉴) 가 여러 번이면 마지막 값 사용
+                df = df.drop_duplicates(["target", "source"], keep="last")
+                df = df.sort_values("target", kind="stable")
+            else:
+                # 입력 메뉴(target) 기준 정렬, 같은 쌍은 합산
+                df = df.groupby(["target", "source"], sort=False, as_index=False)["weight"].sum()
+                df = df.sort_values("target", kind="stable")
+            frames[(group, dim)] = df
+
+    # 메뉴 인터닝: 조건 파일(메뉴 = source) → 페어링 파일(입력 target, 추천 source) 순서로 처음 나온 순
+    names = []
+    for (group, _), df in frames.items():
+        if group == "var":
+            names.append(df["source"])
+        else:
+            names.append(pd.Series(np.column_stack([df["target"], df["source"]]).ravel()))
+    menus = pd.unique(pd.concat(names, ignore_index=True)) if names else np.array([], dtype=object)
+    menu_ids = pd.Index(menus)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "data_version": hashlib.sha256(json.dumps(sources, sort_keys=True).encode()).hexdigest()[:16],
+        "built_at": time.time(),
+        "sources": sources,
+        "menus": [str(m) for m in menus],
+        "conditions": {},
+        "pairings": {},
+    }
+    arrays = []  # (헤더 위치, 배열)
+
+    for (group, dim), df in frames.items():
+        if group == "var":
+            values, rows = np.unique(df["target"].to_numpy(), return_inverse=True)
+            cols = menu_ids.get_indexer(df["source"])
+            entry = {
+                "values": [str(v) for v in values],
+                "keys": [site1_key(dim, str(v)) for v in values],
+            }
+            header["conditions"][dim] = entry
+            n_rows = len(values)
+        else:
+            rows = menu_ids.get_indexer(df["target"])
+            cols = menu_ids.get_indexer(df["source"])
+            entry = {}
+            header["pairings"][dim] = entry
+            n_rows = len(menus)
+
+        indptr, indices, weights = _csr(rows, cols, df["weight"].to_numpy(), n_rows)
+        for name, array in (("indptr", indptr), ("indices", indices), ("weights", weights)):
+            arrays.append((entry, name, array))
+
+    # 배열 오프셋 계산 (오프셋 숫자 길이에 따라 헤더 크기가 바뀌므로 변하지 않을 때까지 반복)
+    data_start = None
+    while True:
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        start = _align(len(MAGIC) + 8 + len(header_bytes))
+        if start == data_start:
+            break
+        data_start = offset = start
+        for entry, name, array in arrays:
+            entry[name] = {"offset": offset, "count": int(array.size), "dtype": array.dtype.str}
+            offset = _align(offset + array.nbytes)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for entry, name, array in arrays:
+            f.write(b"\x00" * (entry[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    # 교체는 rename 으로 → 기존 파일을 mmap 중인 워커는 이전 버전을 계속 안전하게 읽음
+    os.replace(tmp_path, out_path)
+
+    return {
+        "path": out_path,
+        "data_version": header["data_version"],
+        "menus": len(menus),
+        "conditions": len(header["conditions"]),
+        "pairings": len(header["pairings"]),
+        "edges": sum(len(df) for df in frames.values()),
+        "bytes": os.path.getsize(out_path),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+# ==========================================
+# 2. 읽기 (mmap, 복사 없음)
+# ==========================================
+class CsrView:
+    """
+    mmap 위의 CSR 배열 (읽기 전용 numpy 뷰)
+    """
+
+    def __init__(self, indptr, indices, weights):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    def row(self, i: int):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+
+class WeightArtifact:
+    """
+    compile_weights() 로 만든 파일을 mmap 으로 연다. 같은 파일을 여는 워커들은 페이지 캐시를 공유한다
+
+    - menus              : 메뉴 ID → 이름
+    - condition(dim)     : (조건 값 × 메뉴) CsrView, values / keys 로 행 번호를 찾음
+    - pairing(dim)       : (입력 메뉴 × 추천 메뉴) CsrView
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or ARTIFACT_PATH
+        with open(self.path, "rb") as f:
+            self.mtime = os.fstat(f.fileno()).st_mtime_ns
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"가중치 파일 형식이 아닙니다: {self.path}")
+        (header_len,) = struct.unpack_from("<Q", self._mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mm[start:start + header_len].decode("utf-8"))
+        if self.header["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 가중치 파일 버전: {self.header['format_version']}")
+
+        self.data_version = self.header["data_version"]
+        self.menus = self.header["menus"]
+        self.menu_ids = {name: i for i, name in enumerate(self.menus)}
+
+        self.conditions = {}
+        self.condition_values = {}  # 조건 → {DB 표기 값: 행}
+        self.condition_keys = {}  # 조건 → {site1 표기 값: 행}
+        for dim, entry in self.header["conditions"].items():
+            self.conditions[dim] = self._view(entry)
+            self.condition_values[dim] = {v: i for i, v in enumerate(entry["values"])}
+            self.condition_keys[dim] = {k: i for i, k in enumerate(entry["keys"])}
+
+        self.pairings = {dim: self._view(entry) for dim, entry in self.header["pairings"].items()}
+
+    def _array(self, spec):
+        return np.frombuffer(self._mm, dtype=np.dtype(spec["dtype"]), count=spec["count"], offset=spec["offset"])
+
+    def _view(self, entry) -> CsrView:
+        return CsrView(self._array(entry["indptr"]), self._array(entry["indices"]), self._array(entry["weights"]))
+
+    def condition(self, dim: str) -> CsrView:
+        return self.conditions[dim]
+
+    def pairing(self, dim: str) -> CsrView:
+        return self.pairings[dim]
+
+
+_artifact = None
+_artifact_lock = threading.Lock()
+
+
+def artifact_mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_artifact(path: str = None) -> WeightArtifact:
+    """
+    현재 가중치 파일을 반환. 파일이 없으면 CSV 에서 한 번 컴파일하고, 새로 빌드됐으면 다시 연다
+    """
+    global _artifact
+    path = path or ARTIFACT_PATH
+    mtime = artifact_mtime(path)
+    if _artifact is not None and _artifact.path == path and _artifact.mtime == mtime:
+        return _artifact
+
+    with _artifact_lock:
+        mtime = artifact_mtime(path)
+        if _artifact is not None and _artifact.path == path and _artifact.mtime == mtime:
+            return _artifact
+        if mtime is None:
+            result = compile_weights(out_path=path)
+            logger.info("🛠️ 가중치 파일 생성: %s (메뉴 %d개, %.0fms)", path, result["menus"], result["seconds"] * 1000)
+        _artifact = WeightArtifact(path)
+        logger.info("📦 가중치 파일 로드: %s (version %s)", path, _artifact.data_version)
+    return _artifact
@@ -0,0 +1,50 @@
+# app/utils/log.py
+import json
+import logging
+import os
+import sys
+
+# 로그 레벨 / 형식 (text: 사람이 읽는 한 줄, json: 수집기용 한 줄 JSON)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+# LogRecord 기본 속성 (이 외의 속성은 extra= 로 넘긴 필드로 보고 그대로 출력)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    한 줄 JSON. extra={"conditions": ...} 처럼 넘긴 필드는 최상위 키로 들어간다
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging():
+    """
+    app 로거에 핸들러를 한 번만 붙인다 (uvicorn 로거 설정은 건드리지 않음)
+    """
+    logger = logging.getLogger("app")
+    if logger.handlers:
+        return logger
+    handler = logging.StreamHandler(sys.stderr)
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    return logger
@@ -1,4 +1,12 @@
 # app/utils/security.py
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from passlib.context import CryptContext
@@ -9,7 +17,24 @@ SECRET_KEY = "super_secret_key_for_dev_only"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24시간 유효
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 관리자 전용 API(메뉴 태그 수정, 모니터링 등)용 내부 토큰. X-Admin-Token 헤더로 전달, 비우면 관리자 API 는 모두 거부
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# bcrypt cost (2^rounds 번 반복, 1 올릴 때마다 약 2배 느려짐). 기존 해시는 저장된 cost 그대로 검증됨
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 해시/검증 전용 스레드 수. 로그인이 몰려도 이 수만큼만 CPU 를 쓰고 나머지는 대기
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# 검증된 토큰 캐시 최대 항목 수 (0 이면 캐시 안 함)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt 는 GIL 을 놓고 계산하므로 스레드 풀로 충분 (FastAPI 기본 스레드풀과 분리)
+_hash_pool = ThreadPoolExecutor(max_workers=max(1, PASSWORD_HASH_WORKERS), thread_name_prefix="bcrypt")
+
+def is_admin_token(token: Optional[str]) -> bool:
+    # 설정이 비어 있으면 누구도 관리자가 아님 (비교는 타이밍 차이가 없도록 compare_digest)
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -17,6 +42,17 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def get_password_hash_async(password: str) -> str:
+    """
+    해시 전용 스레드 풀에서 계산 (이벤트 루프/요청 스레드풀을 막지 않음)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     유저 정보(data)를 받아서 JWT 토큰을 생성하는 함수
@@ -33,4 +69,65 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     
     # 암호화하여 토큰 문자열 생성
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+
+class TokenCache:
+    """
+    검증이 끝난 JWT 의 결과(유저 정보) 캐시
+
+    - 키는 토큰 원문이 아니라 sha256 digest (메모리에 토큰을 그대로 들고 있지 않도록)
+    - 항목은 토큰의 exp 까지만 유효 → 만료된 토큰은 캐시에 있어도 다시 검증(→ 거절)
+    - 최대 max_size 개, 넘치면 가장 오래 안 쓴 항목부터 제거 (LRU)
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._data = OrderedDict()  # digest → (exp, 유저 정보)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str):
+        if self.max_size <= 0:
+            return None
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, exp: float, user: dict):
+        if self.max_size <= 0:
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._data[key] = (exp, user)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+token_cache = TokenCache()
@@ -0,0 +1,194 @@
+"""
+assisted generation(draft 모델) vs 일반 generate 처리량 비교 (CPU 로 검증 가능)
+
+앱과 같은 프롬프트(hf_llm.build_prompt)를 두 방식으로 한 개씩 생성해서
+생성 토큰/초, 요청당 지연, draft 수락률, 본 모델 forward 1번당 토큰 수를 비교한다.
+본 모델과 draft 는 같은 토크나이저 계열의 작은 체크포인트를 쓴다 (기본: SmolLM2 360M / 135M).
+
+    # 작은 체크포인트로 비교 (처음 한 번은 Hugging Face 에서 내려받음)
+    python -m benchmarks.assisted --prompts 8 --max-new-tokens 64
+
+    # 로컬 체크포인트 / 앱과 같은 샘플링 설정
+    python -m benchmarks.assisted --main ./ckpt/main --draft ./ckpt/draft --sample
+
+    # 내려받기 없이 코드 경로만 확인: 무작위 초기화 소형 Llama, draft = 본 모델 복사본 (수락률 100% 가 나와야 정상)
+    python -m benchmarks.assisted --tiny
+
+greedy(기본)면 두 방식의 출력이 토큰 단위로 같아야 하므로 일치 여부도 함께 표시한다.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import torch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.services import hf_llm  # noqa: E402
+
+DEFAULT_MAIN = "HuggingFaceTB/SmolLM2-360M-Instruct"
+DEFAULT_DRAFT = "HuggingFaceTB/SmolLM2-135M-Instruct"
+
+# 프롬프트용 샘플 요청 (build_guide 의 세 갈래: 유저 유사도 / 상황 / 기본)
+SAMPLE_REQUESTS = [
+    ([{"menu": "오늘의사시미"}, {"menu": "모나카"}], {"people": "2명", "time": "18시", "season": "겨울", "price": "20000원대"}),
+    ([{"menu": "우니한판"}], {"logic": "User Similarity", "history": "오늘의사시미"}),
+    ([{"menu": "모나카"}], {"people": "4명", "rain": "15mm", "time": "20시", "price": "0", "category": "튀김"}),
+    ([{"menu": "오늘의사시미"}], None),
+]
+
+
+# ==========================================
+# 1. 모델 준비
+# ==========================================
+def load_pretrained(args):
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(args.main)
+    if tokenizer.pad_token_id is None:
+        tokenizer.pad_token_id = tokenizer.eos_token_id
+    main = AutoModelForCausalLM.from_pretrained(args.main, dtype=torch.float32).eval()
+    draft = AutoModelForCausalLM.from_pretrained(args.draft, dtype=torch.float32)
+    if draft.config.vocab_size != main.config.vocab_size:
+        sys.exit(f"❌ 어휘 크기가 다름 ({draft.config.vocab_size} vs {main.config.vocab_size}) → 같은 토크나이저 계열 draft 필요")
+
+    prompts = [hf_llm.build_prompt(*SAMPLE_REQUESTS[i % len(SAMPLE_REQUESTS)]) for i in range(args.prompts)]
+    inputs = [tokenizer(p, return_tensors="pt").input_ids for p in prompts]
+    return main, draft, inputs, tokenizer.eos_token_id, tokenizer.pad_token_id
+
+
+def build_tiny(args):
+    """
+    내려받기 없는 확인용: 무작위 소형 Llama + 그대로 복사한 draft, 프롬프트는 무작위 토큰
+    """
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(args.seed)
+    config = LlamaConfig(
+        vocab_size=1024, hidden_size=128, intermediate_size=256, num_hidden_layers=4,
+        num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=1024,
+        bos_token_id=None, eos_token_id=None, pad_token_id=0,
+    )
+    main = LlamaForCausalLM(config).eval()
+    draft = copy.deepcopy(main)
+    inputs = [torch.randint(1, config.vocab_size, (1, 48)) for _ in range(args.prompts)]
+    return main, draft, inputs, None, 0
+
+
+# ==========================================
+# 2. 생성 / 측정
+# ==========================================
+def generate(model, input_ids, args, eos_token_id, pad_token_id, draft=None, seed: int = 0):
+    kwargs = dict(max_new_tokens=args.max_new_tokens, eos_token_id=eos_token_id, pad_token_id=pad_token_id)
+    if args.sample:
+        kwargs.update({k: v for k, v in hf_llm.GENERATION_KWARGS.items() if k != "max_new_tokens"})
+    else:
+        kwargs["do_sample"] = False
+    if draft is not None:
+        kwargs["assistant_model"] = draft
+
+    torch.manual_seed(seed)
+    counter = hf_llm.ForwardCounter(model, draft)
+    started = time.perf_counter()
+    with torch.no_grad(), counter:
+        outputs = model.generate(input_ids=input_ids, attention_mask=torch.ones_like(input_ids), **kwargs)
+    seconds = time.perf_counter() - started
+
+    new_tokens = outputs[0, input_ids.shape[1]:]
+    # eos 가 없으면(tiny) 패딩도 없으므로 새 토큰 전부
+    generated = len(new_tokens) if eos_token_id is None else hf_llm._count_generated(outputs, input_ids.shape[1], pad_token_id)
+    proposed, accepted = counter.draft_tokens(generated)
+    return {
+        "tokens": new_tokens.tolist(),
+        "generated": generated,
+        "seconds": seconds,
+        "main_forwards": counter.calls["main"],
+        "proposed": proposed,
+        "accepted": accepted,
+    }
+
+
+def run_mode(name: str, model, inputs, args, eos_token_id, pad_token_id, draft=None) -> dict:
+    # 첫 호출의 초기화 비용(스레드 풀, 메모리 할당)을 빼기 위한 워밍업 1회
+    generate(model, inputs[0], args, eos_token_id, pad_token_id, draft, seed=args.seed)
+
+    runs = [generate(model, ids, args, eos_token_id, pad_token_id, draft, seed=args.seed + i) for i, ids in enumerate(inputs)]
+    generated = sum(r["generated"] for r in runs)
+    seconds = sum(r["seconds"] for r in runs)
+    forwards = sum(r["main_forwards"] for r in runs)
+    proposed = sum(r["proposed"] for r in runs)
+    return {
+        "mode": name,
+        "prompts": len(runs),
+        "generated_tokens": generated,
+        "tokens_per_second": generated / seconds if seconds > 0 else 0.0,
+        "mean_latency_ms": seconds * 1000.0 / len(runs),
+        "tokens_per_forward": generated / forwards if forwards else 0.0,
+        "acceptance_rate": sum(r["accepted"] for r in runs) / proposed if proposed else None,
+        "outputs": [r["tokens"] for r in runs],
+    }
+
+
+# ==========================================
+# 3. 실행
+# ==========================================
+def print_table(results: list[dict], speedup: float, identical):
+    print("\n⏱️ assisted generation 비교")
+    print(f"{'mode':<10} {'n':>4} {'tokens':>7} {'tok/s':>8} {'ms/req':>9} {'tok/fwd':>8} {'accept':>7}")
+    for r in results:
+        accept = f"{r['acceptance_rate'] * 100:.0f}%" if r["acceptance_rate"] is not None else "-"
+        print(f"{r['mode']:<10} {r['prompts']:>4} {r['generated_tokens']:>7} {r['tokens_per_second']:>8.1f} "
+              f"{r['mean_latency_ms']:>9.1f} {r['tokens_per_forward']:>8.2f} {accept:>7}")
+    print(f"\n🚀 속도 배율 (assisted / plain): x{speedup:.2f}")
+    if identical is not None:
+        print("✅ greedy 출력 일치" if identical else "⚠️ greedy 출력이 다름 (수치 오차로 갈린 경우 포함)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="assisted generation vs 일반 generate 처리량 비교")
+    parser.add_argument("--main", default=DEFAULT_MAIN, help="본 모델 (Hugging Face ID 또는 로컬 경로)")
+    parser.add_argument("--draft", default=DEFAULT_DRAFT, help="draft 모델 (본 모델과 같은 토크나이저 계열)")
+    parser.add_argument("--tiny", action="store_true", help="무작위 소형 모델로 코드 경로만 확인 (내려받기 없음)")
+    parser.add_argument("--prompts", type=int, default=8, help="프롬프트 수")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--draft-tokens", type=int, default=hf_llm.DRAFT_NUM_TOKENS, help="draft 가 한 번에 제안할 토큰 수 (시작값)")
+    parser.add_argument("--sample", action="store_true", help="앱과 같은 샘플링 설정 사용 (기본: greedy)")
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU 스레드 수 (0 이면 기본값)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    main_model, draft, inputs, eos_token_id, pad_token_id = build_tiny(args) if args.tiny else load_pretrained(args)
+    hf_llm.prepare_draft(draft, args.draft_tokens)
+
+    plain = run_mode("plain", main_model, inputs, args, eos_token_id, pad_token_id)
+    assisted = run_mode("assisted", main_model, inputs, args, eos_token_id, pad_token_id, draft=draft)
+    speedup = assisted["tokens_per_second"] / plain["tokens_per_second"] if plain["tokens_per_second"] else 0.0
+    identical = None if args.sample else plain["outputs"] == assisted["outputs"]
+    print_table([plain, assisted], speedup, identical)
+
+    if args.out:
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k != "out"},
+            "speedup": speedup,
+            "identical": identical,
+            "results": [{k: v for k, v in r.items() if k != "outputs"} for r in (plain, assisted)],
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+두 벤치마크 결과(JSON) 비교
+
+    python -m benchmarks.compare benchmarks/results/baseline.json benchmarks/results/latest.json --threshold 0.2
+
+지연시간(p50/p95/p99)이 threshold 비율 이상 늘었거나 처리량이 그만큼 줄었거나,
+오류율이 늘어난 엔드포인트를 회귀로 표시하고 종료 코드 1 로 끝낸다.
+"""
+import argparse
+import json
+import sys
+
+LATENCY_KEYS = ["p50_ms", "p95_ms", "p99_ms"]
+
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> dict:
+    """
+    엔드포인트별 변화율과 회귀 목록을 반환
+    """
+    rows = []
+    regressions = []
+    base_endpoints = baseline.get("endpoints", {})
+    for name, cur in current.get("endpoints", {}).items():
+        base = base_endpoints.get(name)
+        if base is None:
+            rows.append({"endpoint": name, "status": "new"})
+            continue
+
+        row = {"endpoint": name, "status": "ok", "changes": {}}
+        reasons = []
+        for key in LATENCY_KEYS + ["throughput_rps"]:
+            if not base.get(key):
+                continue
+            change = (cur.get(key, 0.0) - base[key]) / base[key]
+            row["changes"][key] = change
+            if key in LATENCY_KEYS and change > threshold:
+                reasons.append(f"{key} +{change * 100:.0f}%")
+            elif key == "throughput_rps" and change < -threshold:
+                reasons.append(f"{key} {change * 100:.0f}%")
+
+        if cur.get("error_rate", 0.0) > base.get("error_rate", 0.0):
+            reasons.append(f"error_rate {base.get('error_rate', 0.0):.1%} → {cur['error_rate']:.1%}")
+
+        if reasons:
+            row["status"] = "regressed"
+            row["reasons"] = reasons
+            regressions.append(name)
+        rows.append(row)
+
+    missing = sorted(set(base_endpoints) - set(current.get("endpoints", {})))
+    return {"threshold": threshold, "rows": rows, "missing": missing, "regressions": regressions}
+
+
+def print_report(report: dict):
+    print(f"\n📊 기준 대비 변화 (회귀 기준 {report['threshold'] * 100:.0f}%)")
+    print(f"{'endpoint':<28} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8}  상태")
+    for row in report["rows"]:
+        if row["status"] == "new":
+            print(f"{row['endpoint']:<28} {'':>8} {'':>8} {'':>8} {'':>8}  새 엔드포인트")
+            continue
+        cells = [
+            f"{row['changes'][key] * 100:+.0f}%" if key in row["changes"] else "-"
+            for key in LATENCY_KEYS + ["throughput_rps"]
+        ]
+        status = "❌ " + ", ".join(row["reasons"]) if row["status"] == "regressed" else "✅"
+        print(f"{row['endpoint']:<28} {cells[0]:>8} {cells[1]:>8} {cells[2]:>8} {cells[3]:>8}  {status}")
+    for name in report["missing"]:
+        print(f"{name:<28} 이번 결과에 없음")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument("baseline", help="기준 결과 JSON")
+    parser.add_argument("current", help="비교할 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 볼 변화 비율 (기본 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = compare(load(args.baseline), load(args.current), args.threshold)
+    print_report(report)
+    sys.exit(1 if report["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
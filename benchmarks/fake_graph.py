@@ -0,0 +1,323 @@
+"""
+Neo4j 대신 쓰는 메모리 그래프 (벤치마크 전용)
+
+앱이 실제로 보내는 쿼리 문자열(모듈 상수)마다 같은 결과 형태를 돌려주는 핸들러를 둔다.
+등록되지 않은 쿼리가 오면 바로 에러를 내서, 새 쿼리가 추가됐는데 여기 반영이 안 된 경우를 알 수 있게 한다.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+from import_var_data import read_edges, NON_VAR_FILES
+from app.services.context_graph import CONTEXT_EDGES_QUERY, ALCOHOL_EDGES_QUERY
+from app.services.tag_index import MENU_TAGS_QUERY, EATEN_MENUS_QUERY, REPLACE_MENU_TAGS_QUERY
+from app.services.popularity import ORDER_TOTALS_QUERY
+from app.services.order_log import ORDER_BATCH_QUERY
+from app.services.outbox_relay import USER_BATCH_QUERY
+from app.services.graph_view import GRAPH_VERSION_QUERY, OVERVIEW_QUERY, USER_EGO_QUERY, MENU_EGO_QUERY
+from app.db.queries import SIMILAR_USER_QUERY
+
+# var CSV 중 상황 노드(:Context)로 쓰이는 파일 / 주류 페어링 / 메뉴 태그
+CONTEXT_FILES = ["people.csv", "rain.csv", "season.csv", "time.csv"]
+ALCOHOL_FILE = "alchol.csv"
+TAG_FILE = "category.csv"
+
+
+class FakeNode(dict):
+    """
+    neo4j.graph.Node 와 같은 방식으로 읽히는 노드 (labels, element_id, get)
+    """
+
+    def __init__(self, element_id: str, label: str, **props):
+        super().__init__(props)
+        self.element_id = element_id
+        self.labels = {label}
+
+
+class FakeRelationship(dict):
+    def __init__(self, element_id: str, rel_type: str, start_node, end_node, **props):
+        super().__init__(props)
+        self.element_id = element_id
+        self.type = rel_type
+        self.start_node = start_node
+        self.end_node = end_node
+
+
+class _Summary:
+    def consume(self):
+        return self
+
+
+class FakeGraph:
+    """
+    메뉴/상황/태그 간선은 data/var, data/non_var CSV 에서, 유저/주문은 seed_orders() 로 채운다
+    """
+
+    def __init__(self, data_root: str = "data", latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000.0
+        self._lock = threading.Lock()
+
+        self.context_edges = []  # (상황 값, 메뉴, 가중치)
+        self.alcohol_edges = []  # (주류, 메뉴, 가중치)
+        self.menu_tags = defaultdict(set)  # 메뉴 → 태그
+        self.goes_with = []  # (메뉴, 메뉴, 차원, 가중치)
+        self.users = {}  # user_id → {"username", "age", "gender"}
+        self.orders = defaultdict(dict)  # user_id → {메뉴: {"count", "last_seq"}}
+        self.version = 0  # GraphVersion 노드 값 (쓰기 쿼리마다 +1)
+        self.queries = defaultdict(int)
+
+        self._load(data_root)
+        self.menus = sorted(
+            {m for _, m, _ in self.context_edges}
+            | {m for _, m, _ in self.alcohol_edges}
+            | set(self.menu_tags)
+        )
+
+        self._handlers = {
+            CONTEXT_EDGES_QUERY: self._context_edges,
+            ALCOHOL_EDGES_QUERY: self._alcohol_edges,
+            MENU_TAGS_QUERY: self._menu_tags,
+            EATEN_MENUS_QUERY: self._eaten_menus,
+            REPLACE_MENU_TAGS_QUERY: self._replace_menu_tags,
+            ORDER_TOTALS_QUERY: self._order_totals,
+            ORDER_BATCH_QUERY: self._order_batch,
+            USER_BATCH_QUERY: self._user_batch,
+            SIMILAR_USER_QUERY: self._similar_users,
+            GRAPH_VERSION_QUERY: self._graph_version,
+            OVERVIEW_QUERY: self._overview,
+            USER_EGO_QUERY: self._user_ego,
+            MENU_EGO_QUERY: self._menu_ego,
+        }
+
+    # ==========================================
+    # 1. 데이터 적재
+    # ==========================================
+    def _load(self, data_root: str):
+        var_dir = os.path.join(data_root, "var")
+        for filename in CONTEXT_FILES:
+            df = read_edges(os.path.join(var_dir, filename))
+            self.context_edges += list(zip(df["target"], df["source"], df["weight"]))
+
+        df = read_edges(os.path.join(var_dir, ALCOHOL_FILE))
+        self.alcohol_edges = list(zip(df["target"], df["source"], df["weight"]))
+
+        # 카테고리 가중치가 0 보다 큰 항목만 태그로 사용
+        df = read_edges(os.path.join(var_dir, TAG_FILE))
+        for menu, tag in zip(df.loc[df["weight"] > 0, "source"], df.loc[df["weight"] > 0, "target"]):
+            self.menu_tags[menu].add(tag)
+
+        non_var_dir = os.path.join(data_root, "non_var")
+        for filename, dimension in NON_VAR_FILES.items():
+            path = os.path.join(non_var_dir, filename)
+            if not os.path.exists(path):
+                continue
+            df = read_edges(path)
+            self.goes_with += [(s, t, dimension, w) for s, t, w in zip(df["source"], df["target"], df["weight"])]
+
+    def seed_orders(self, users: dict, orders_per_user: int = 5, seed: int = 0):
+        """
+        유저마다 메뉴를 몇 개씩 주문한 이력을 만든다 (같은 seed 면 항상 같은 이력)
+        users: user_id → username
+        """
+        rng = random.Random(seed)
+        with self._lock:
+            for user_id, username in users.items():
+                self.users.setdefault(user_id, {"username": username, "age": None, "gender": None})
+                for menu in rng.sample(self.menus, min(orders_per_user, len(self.menus))):
+                    self.orders[user_id][menu] = {"count": rng.randint(1, 3), "last_seq": 0}
+
+    # ==========================================
+    # 2. 쿼리 핸들러 (레코드는 dict, 노드/관계는 Fake* 객체)
+    # ==========================================
+    def run(self, query: str, **params) -> list:
+        handler = self._handlers.get(query)
+        if handler is None:
+            raise NotImplementedError(f"FakeGraph 에 없는 쿼리입니다:\n{query}")
+        with self._lock:
+            self.queries[handler.__name__.lstrip("_")] += 1
+            return handler(**params)
+
+    def _context_edges(self):
+        return [{"source": s, "menu": m, "weight": w} for s, m, w in self.context_edges]
+
+    def _alcohol_edges(self):
+        return [{"source": s, "menu": m, "weight": w} for s, m, w in self.alcohol_edges]
+
+    def _menu_tags(self):
+        return [{"menu": m, "tag": t} for m, tags in self.menu_tags.items() for t in sorted(tags)]
+
+    def _eaten_menus(self, uid):
+        return [{"menu": m} for m in self.orders.get(uid, {})]
+
+    def _replace_menu_tags(self, menu_name, tags):
+        self.menu_tags[menu_name] = set(tags)
+        self.version += 1
+        return []
+
+    def _order_totals(self):
+        totals = defaultdict(int)
+        for menus in self.orders.values():
+            for menu, rel in menus.items():
+                totals[menu] += rel["count"]
+        return [{"menu": m, "orders": n} for m, n in totals.items()]
+
+    def _order_batch(self, rows):
+        for row in rows:
+            # MERGE (u:User) 와 같음: 릴레이 전이면 user_id 만 있는 노드
+            self.users.setdefault(row["uid"], {"username": None, "age": None, "gender": None})
+            rel = self.orders[row["uid"]].setdefault(row["menu"], {"count": 0, "last_seq": -1})
+            n = sum(1 for s in row["seqs"] if s > rel["last_seq"])
+            if n:
+                rel["count"] += n
+                rel["last_seq"] = row["seq"]
+        self.version += 1
+        return []
+
+    def _user_batch(self, rows):
+        for row in rows:
+            self.users[row["uid"]] = {"username": row["uname"], "age": row["age"], "gender": row["gender"]}
+        self.version += 1
+        return []
+
+    def _similar_users(self, uid):
+        me = next((user_id for user_id, u in self.users.items() if u["username"] == uid), None)
+        if me is None:
+            return []
+        mine = set(self.orders.get(me, {}))
+        scores = defaultdict(int)
+        history = defaultdict(list)
+        for other, menus in self.orders.items():
+            if other == me:
+                continue
+            shared = mine & set(menus)
+            for rec in set(menus) - mine:
+                # (공유 메뉴 × 추천 메뉴) 경로 수 = count(*)
+                scores[rec] += len(shared)
+                history[rec] += [m for m in sorted(shared) if m not in history[rec]]
+        ranked = sorted((m for m in scores if scores[m] > 0), key=lambda m: (-scores[m], m))[:5]
+        return [{"menu": m, "score": scores[m], "history": history[m][:3]} for m in ranked]
+
+    def _graph_version(self):
+        nodes = len(self.menus) + len(self.users) + len({s for s, _, _ in self.context_edges})
+        rels = sum(len(m) for m in self.orders.values()) + len(self.context_edges) + len(self.goes_with)
+        return [{"nodes": nodes, "rels": rels, "changes": self.version}]
+
+    def _menu_node(self, name):
+        return FakeNode(f"menu:{name}", "Menu", name=name)
+
+    def _user_node(self, user_id):
+        return FakeNode(f"user:{user_id}", "User", username=self.users[user_id]["username"], user_id=user_id)
+
+    def _user_rels(self, user_id):
+        user = self._user_node(user_id)
+        for menu, rel in self.orders[user_id].items():
+            menu_node = self._menu_node(menu)
+            yield user, FakeRelationship(f"ordered:{user_id}:{menu}", "ORDERED", user, menu_node, count=rel["count"]), menu_node
+
+    def _goes_with_rels(self, only_menu=None):
+        for s, t, dimension, w in self.goes_with:
+            if only_menu is not None and only_menu not in (s, t):
+                continue
+            a, b = self._menu_node(s), self._menu_node(t)
+            yield a, FakeRelationship(f"goes:{s}:{t}:{dimension}", "GOES_WITH", a, b, weight=w), b
+
+    @staticmethod
+    def _page(triples, skip, limit):
+        rows = []
+        for i, (n, r, m) in enumerate(triples):
+            if i < skip:
+                continue
+            if len(rows) >= limit:
+                break
+            rows.append({"n": n, "r": r, "m": m})
+        return rows
+
+    def _overview(self, skip, limit):
+        def triples():
+            for user_id in list(self.orders):
+                if user_id in self.users:
+                    yield from self._user_rels(user_id)
+            yield from self._goes_with_rels()
+        return self._page(triples(), skip, limit)
+
+    def _user_ego(self, uid, skip, limit):
+        if uid not in self.users:
+            return []
+        return self._page(self._user_rels(uid), skip, limit)
+
+    def _menu_ego(self, menu_name, skip, limit):
+        def triples():
+            center = self._menu_node(menu_name)
+            for user_id, menus in self.orders.items():
+                if menu_name in menus and user_id in self.users:
+                    user = self._user_node(user_id)
+                    yield center, FakeRelationship(f"ordered:{user_id}:{menu_name}", "ORDERED", user, center), user
+            for a, r, b in self._goes_with_rels(only_menu=menu_name):
+                yield (a, r, b) if a["name"] == menu_name else (b, r, a)
+        return self._page(triples(), skip, limit)
+
+    # ==========================================
+    # 3. 세션 (드라이버 세션과 같은 사용법)
+    # ==========================================
+    def async_session(self):
+        return FakeAsyncSession(self)
+
+    def session(self):
+        return FakeSyncSession(self)
+
+
+class FakeAsyncSession:
+    """
+    LazyGraphSession 대체 (run() 은 레코드 list 반환)
+    """
+
+    def __init__(self, graph: FakeGraph):
+        self.graph = graph
+
+    async def run(self, query, **params) -> list:
+        if self.graph.latency:
+            await asyncio.sleep(self.graph.latency)
+        return self.graph.run(query, **params)
+
+    async def close(self):
+        pass
+
+
+class _FakeTx:
+    def __init__(self, graph: FakeGraph):
+        self.graph = graph
+
+    def run(self, query, **params):
+        self.graph.run(query, **params)
+        return _Summary()
+
+
+class FakeSyncSession:
+    """
+    동기 드라이버 세션 대체 (백그라운드 스레드의 with session: / execute_write / run)
+    """
+
+    def __init__(self, graph: FakeGraph):
+        self.graph = graph
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, query, **params):
+        if self.graph.latency:
+            time.sleep(self.graph.latency)
+        return self.graph.run(query, **params)
+
+    def execute_write(self, fn):
+        if self.graph.latency:
+            time.sleep(self.graph.latency)
+        return fn(_FakeTx(self.graph))
+
+    def close(self):
+        pass
@@ -0,0 +1,545 @@
+"""
+오프라인 부하 / 지연시간 벤치마크
+
+외부 서비스 없이 앱 전체를 띄워서 v1/v2 엔드포인트를 동시 요청으로 두드리고,
+엔드포인트별 처리량과 p50/p95/p99 를 JSON 으로 남긴다 (다음 실행 결과와 diff 용).
+
+- Neo4j  → benchmarks.fake_graph.FakeGraph (data/var, data/non_var CSV 로 채운 메모리 그래프)
+- MySQL  → 임시 폴더의 SQLite
+- LLM    → benchmarks.stub_llm.StubLLM (결정적 응답 + 지정한 지연)
+- 서버   → 같은 프로세스의 uvicorn (127.0.0.1 임의 포트), 클라이언트는 httpx
+
+클라이언트와 서버가 한 프로세스(GIL)를 나눠 쓰므로 절대값보다는 같은 옵션으로 돌린 이전 결과와 비교하는 용도.
+
+    # 엔드포인트별로 100건씩, 동시 16
+    python -m benchmarks.run --requests 100 --concurrency 16 --out benchmarks/results/baseline.json
+
+    # 보낸 요청을 트레이스로 저장 / 트레이스 재생 (at_ms 시각대로 보내려면 --timed)
+    python -m benchmarks.run --record benchmarks/results/trace.jsonl
+    python -m benchmarks.run --trace benchmarks/traces/sample.jsonl --timed
+
+    # 기준 결과와 비교 (회귀가 있으면 종료 코드 1)
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+PASSWORD = "bench-password"
+# 관리자 전용 API (X-Admin-Token) 용 토큰
+ADMIN_TOKEN = "bench-admin-token"
+
+# 엔드포인트 이름 : (메서드, 경로, 인증 필요, 스트리밍)
+ENDPOINTS = {
+    "v1.condition_weight": ("POST", "/api/v1/condition-weight", False, False),
+    "v1.menu_recommend": ("POST", "/api/v1/menu-recommend", False, False),
+    "v2.signup": ("POST", "/api/v2/auth/signup", False, False),
+    "v2.login": ("POST", "/api/v2/auth/login", False, False),
+    "v2.order": ("POST", "/api/v2/order", True, False),
+    "v2.recommend": ("GET", "/api/v2/recommend", True, False),
+    "v2.recommend_stream": ("GET", "/api/v2/recommend/stream", True, True),
+    "v2.rag_recommend": ("GET", "/api/v2/rag-recommend", True, False),
+    "v2.rag_weighted": ("POST", "/api/v2/rag-weighted-recommend", False, False),
+    "v2.rag_weighted_stream": ("POST", "/api/v2/rag-weighted-recommend/stream", False, True),
+    "v2.graph_view": ("GET", "/api/v2/graph-view", False, False),
+    "v2.graph_data": ("GET", "/api/v2/graph-data", False, False),
+    "v2.menu_tags": ("PUT", "/api/v2/menu-tags", False, False),
+}
+# 관리자 토큰을 붙여 보낼 엔드포인트
+ADMIN_ENDPOINTS = {"v2.menu_tags"}
+
+# 프론트엔드에서 보내는 형식의 상황 조건 (rag-weighted 용)
+RAG_WEIGHTED_CHOICES = {
+    "people": ["1", "2", "3", "4"],
+    "time": ["12", "18", "20", "22"],
+    "season": ["spring", "summer", "autumn", "winter"],
+    "rain": ["0mm", "3mm", "15mm", "30mm"],
+    "alcohol": ["soju", "beer", "sake", "no_alchol"],
+}
+
+
+# ==========================================
+# 1. 환경 준비 (app import 전에 호출)
+# ==========================================
+def prepare_env(args, workdir: str):
+    """
+    앱 설정을 임시 폴더 / 로컬 대체물로 돌린다. app 모듈은 import 시점에 환경 변수를 읽으므로 반드시 먼저 호출
+    """
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "ASYNC_DATABASE_URL": "",
+        "ORDER_LOG_PATH": os.path.join(workdir, "order_log.jsonl"),
+        "WEIGHT_ARTIFACT_PATH": os.path.join(workdir, "weights.bin"),
+        "WEIGHT_DATA_ROOT": os.path.join(args.data_root),
+        "GRAPH_VIEW_DIR": os.path.join(workdir, "graph"),
+        "LLM_CACHE_PATH": "",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "ADMIN_TOKEN": ADMIN_TOKEN,
+        "LOG_LEVEL": "INFO" if args.verbose else "WARNING",
+    })
+    if args.no_llm_cache:
+        # 저장 즉시 만료 → 매 요청이 생성 경로를 탐
+        os.environ["LLM_CACHE_TTL"] = "0.000001"
+
+
+class ServerThread:
+    """
+    uvicorn 을 별도 스레드(별도 이벤트 루프)에서 실행 → 클라이언트 부하가 서버 루프를 잡아먹지 않게
+    lifespan 은 끄고, 필요한 백그라운드 작업은 벤치마크가 직접 가짜 세션으로 시작한다
+    """
+
+    def __init__(self, app):
+        import uvicorn
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, lifespan="off", log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, name="bench-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("벤치마크 서버 시작 실패")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(10)
+
+
+# ==========================================
+# 2. 요청 생성
+# ==========================================
+class Workload:
+    """
+    엔드포인트 이름 + 순번 → 요청 명세 (같은 seed 면 항상 같은 요청 목록)
+
+    명세 형식 (트레이스 JSONL 한 줄과 같음):
+        {"endpoint", "method", "path", "params", "json", "auth": 유저 번호 또는 null, "stream", "admin": 관리자 토큰 여부 (생략 가능)}
+    """
+
+    def __init__(self, seed: int, users: list[dict], graph, artifact):
+        self.seed = seed
+        self.users = users
+        self.menus = graph.menus
+        self.tagged_menus = sorted(graph.menu_tags)
+        self.tags = sorted({t for tags in graph.menu_tags.values() for t in tags})
+        self.conditions = {dim: entry["keys"] for dim, entry in artifact.header["conditions"].items()}
+        self._rngs = {}
+
+    def _rng(self, endpoint: str) -> random.Random:
+        if endpoint not in self._rngs:
+            self._rngs[endpoint] = random.Random(f"{self.seed}:{endpoint}")
+        return self._rngs[endpoint]
+
+    def make(self, endpoint: str, i: int) -> dict:
+        method, path, auth, stream = ENDPOINTS[endpoint]
+        rng = self._rng(endpoint)
+        spec = {"endpoint": endpoint, "method": method, "path": path, "params": None, "json": None,
+                "auth": rng.randrange(len(self.users)) if auth else None, "stream": stream}
+        if endpoint in ADMIN_ENDPOINTS:
+            spec["admin"] = True
+
+        if endpoint == "v1.condition_weight":
+            dims = rng.sample(sorted(self.conditions), k=min(3, len(self.conditions)))
+            spec["json"] = {dim: rng.choice(self.conditions[dim]) for dim in dims}
+        elif endpoint == "v1.menu_recommend":
+            spec["json"] = {"menu": rng.choice(self.menus)}
+        elif endpoint == "v2.signup":
+            spec["json"] = {"username": f"bench_new_{self.seed}_{i}", "password": PASSWORD,
+                            "age": rng.randint(20, 60), "gender": rng.choice(["M", "F"])}
+        elif endpoint == "v2.login":
+            spec["json"] = {"username": rng.choice(self.users)["username"], "password": PASSWORD}
+        elif endpoint == "v2.order":
+            spec["json"] = {"menu_name": rng.choice(self.menus)}
+        elif endpoint in ("v2.rag_weighted", "v2.rag_weighted_stream"):
+            dims = rng.sample(sorted(RAG_WEIGHTED_CHOICES), k=rng.randint(2, 4))
+            spec["json"] = {dim: rng.choice(RAG_WEIGHTED_CHOICES[dim]) for dim in dims}
+        elif endpoint == "v2.graph_data":
+            kind = i % 3
+            if kind == 0:
+                # 유저 주변 그래프는 본인 토큰으로만 조회 가능
+                spec["auth"] = rng.randrange(len(self.users))
+                spec["params"] = {"user_id": self.users[spec["auth"]]["id"]}
+            elif kind == 1:
+                spec["params"] = {"menu": rng.choice(self.menus)}
+            else:
+                spec["params"] = {"skip": rng.randrange(0, 500, 100), "limit": 100}
+        elif endpoint == "v2.menu_tags":
+            spec["json"] = {"menu_name": rng.choice(self.tagged_menus),
+                            "tags": rng.sample(self.tags, k=min(2, len(self.tags)))}
+        return spec
+
+
+def load_trace(path: str) -> list[dict]:
+    """
+    트레이스 JSONL 읽기. endpoint 가 없으면 "메서드 경로" 를 이름으로 사용
+    """
+    specs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            spec = json.loads(line)
+            spec.setdefault("method", "GET")
+            spec.setdefault("endpoint", f"{spec['method']} {spec['path']}")
+            specs.append(spec)
+    return specs
+
+
+# ==========================================
+# 3. 요청 실행
+# ==========================================
+async def send(client, spec: dict, tokens: list[str]) -> dict:
+    """
+    요청 하나를 보내고 (상태 코드, 전체 지연, 스트리밍이면 첫 바이트 / 첫 토큰 시각) 을 기록
+    """
+    headers = {}
+    if spec.get("auth") is not None and tokens:
+        headers["Authorization"] = f"Bearer {tokens[int(spec['auth']) % len(tokens)]}"
+    if spec.get("admin"):
+        headers["X-Admin-Token"] = ADMIN_TOKEN
+    kwargs = {"params": spec.get("params"), "json": spec.get("json"), "headers": headers}
+
+    result = {"endpoint": spec["endpoint"], "status": 0, "ttfb": None, "ttft": None, "error": None}
+    started = time.perf_counter()
+    try:
+        if spec.get("stream"):
+            async with client.stream(spec["method"], spec["path"], **kwargs) as response:
+                async for chunk in response.aiter_text():
+                    now = time.perf_counter()
+                    if result["ttfb"] is None:
+                        result["ttfb"] = now - started
+                    if result["ttft"] is None and "event: token" in chunk:
+                        result["ttft"] = now - started
+                result["status"] = response.status_code
+        else:
+            response = await client.request(spec["method"], spec["path"], **kwargs)
+            result["status"] = response.status_code
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency"] = time.perf_counter() - started
+    return result
+
+
+async def run_closed(client, specs: list[dict], tokens: list[str], concurrency: int, sent: list) -> list[dict]:
+    """
+    동시 concurrency 개 워커가 응답을 받는 즉시 다음 요청을 보냄 (closed-loop)
+    """
+    queue = asyncio.Queue()
+    for spec in specs:
+        queue.put_nowait(spec)
+    results = []
+
+    async def worker():
+        while True:
+            try:
+                spec = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            sent.append((time.perf_counter(), spec))
+            results.append(await send(client, spec, tokens))
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return results
+
+
+async def run_timed(client, specs: list[dict], tokens: list[str], sent: list) -> list[dict]:
+    """
+    트레이스의 at_ms 시각에 맞춰 보냄 (open-loop, 앞 요청이 느려도 기다리지 않음)
+    """
+    start = time.perf_counter()
+
+    async def fire(spec):
+        delay = spec.get("at_ms", 0) / 1000.0 - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent.append((time.perf_counter(), spec))
+        return await send(client, spec, tokens)
+
+    return await asyncio.gather(*(fire(spec) for spec in specs))
+
+
+# ==========================================
+# 4. 집계
+# ==========================================
+def _ms(values, q: float = None) -> float:
+    if not values:
+        return 0.0
+    values = np.asarray(values) * 1000.0
+    return float(np.percentile(values, q)) if q is not None else float(values.mean())
+
+
+def summarize(results: list[dict], wall_seconds: float) -> dict:
+    """
+    지연시간 분위수는 성공한 요청 기준 (실패는 errors / status 로 따로 센다)
+    """
+    ok = [r for r in results if r["error"] is None and r["status"] < 400]
+    latencies = [r["latency"] for r in ok]
+    stats = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "status": dict(Counter(str(r["status"] or r["error"]) for r in results)),
+        "throughput_rps": len(results) / wall_seconds if wall_seconds > 0 else 0.0,
+        "mean_ms": _ms(latencies),
+        "p50_ms": _ms(latencies, 50),
+        "p95_ms": _ms(latencies, 95),
+        "p99_ms": _ms(latencies, 99),
+        "max_ms": _ms(latencies, 100),
+    }
+    ttfb = [r["ttfb"] for r in ok if r["ttfb"] is not None]
+    if ttfb:
+        ttft = [r["ttft"] for r in ok if r["ttft"] is not None]
+        stats.update({
+            "ttfb_p50_ms": _ms(ttfb, 50),
+            "ttfb_p95_ms": _ms(ttfb, 95),
+            "ttft_p50_ms": _ms(ttft, 50),
+            "ttft_p95_ms": _ms(ttft, 95),
+        })
+    return stats
+
+
+def print_table(report: dict):
+    print(f"\n⏱️ 벤치마크 결과 (동시 {report['meta']['concurrency']})")
+    print(f"{'endpoint':<28} {'n':>6} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for name, s in report["endpoints"].items():
+        print(
+            f"{name:<28} {s['requests']:>6} {s['errors']:>5} {s['throughput_rps']:>8.1f} "
+            f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}"
+        )
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ==========================================
+# 5. 실행 흐름
+# ==========================================
+async def setup_users(client, count: int) -> list[dict]:
+    """
+    API 로 유저를 가입/로그인시켜서 (id, username, token) 목록을 만든다
+    """
+    async def create(i):
+        username = f"bench_user_{i}"
+        r = await client.post("/api/v2/auth/signup", json={"username": username, "password": PASSWORD})
+        r.raise_for_status()
+        user = r.json()
+        r = await client.post("/api/v2/auth/login", json={"username": username, "password": PASSWORD})
+        r.raise_for_status()
+        return {"id": user["id"], "username": username, "token": r.json()["access_token"]}
+
+    return list(await asyncio.gather(*(create(i) for i in range(count))))
+
+
+async def warmup(client, workload: Workload, names: list[str], tokens: list[str], args):
+    """
+    측정 전 요청 (첫 렌더링 / 인덱스 빌드 / 스케줄러 시작 비용은 결과에서 제외)
+    """
+    specs = [workload.make(name, -1 - i) for name in names for i in range(args.warmup)]
+    await run_closed(client, specs, tokens, args.concurrency, [])
+
+
+async def benchmark(args, app_state) -> dict:
+    import httpx
+
+    fake, stub, server = app_state["graph"], app_state["llm"], app_state["server"]
+    limits = httpx.Limits(max_connections=max(args.concurrency, args.users) + 4)
+    async with httpx.AsyncClient(base_url=server.base_url, timeout=args.timeout, limits=limits) as client:
+        print(f"👥 유저 {args.users}명 준비 중...", file=sys.stderr)
+        users = await setup_users(client, args.users)
+        tokens = [u["token"] for u in users]
+        fake.seed_orders({u["id"]: u["username"] for u in users}, orders_per_user=args.orders_per_user, seed=args.seed)
+
+        workload = Workload(args.seed, users, fake, app_state["artifact"])
+        sent = []
+        endpoint_results = defaultdict(list)
+        walls = {}
+
+        if args.trace:
+            specs = load_trace(args.trace)
+            # 트레이스에 나오는 엔드포인트 중 이름을 아는 것만 생성한 요청으로 워밍업 (트레이스 요청은 상태를 바꿀 수 있으므로)
+            names = [name for name in dict.fromkeys(spec["endpoint"] for spec in specs) if name in ENDPOINTS]
+            await warmup(client, workload, names, tokens, args)
+            print(f"▶️ 트레이스 재생: {args.trace} ({len(specs)}건)", file=sys.stderr)
+            started = time.perf_counter()
+            if args.timed:
+                results = await run_timed(client, specs, tokens, sent)
+            else:
+                results = await run_closed(client, specs, tokens, args.concurrency, sent)
+            wall = time.perf_counter() - started
+            for r in results:
+                endpoint_results[r["endpoint"]].append(r)
+            walls = {name: wall for name in endpoint_results}
+        else:
+            names = args.endpoints or list(ENDPOINTS)
+            for name in names:
+                await warmup(client, workload, [name], tokens, args)
+                specs = [workload.make(name, i) for i in range(args.requests)]
+                print(f"▶️ {name} ({len(specs)}건, 동시 {args.concurrency})", file=sys.stderr)
+                started = time.perf_counter()
+                endpoint_results[name] = await run_closed(client, specs, tokens, args.concurrency, sent)
+                walls[name] = time.perf_counter() - started
+
+        if args.record:
+            origin = sent[0][0] if sent else 0.0
+            os.makedirs(os.path.dirname(os.path.abspath(args.record)), exist_ok=True)
+            with open(args.record, "w", encoding="utf-8") as f:
+                for at, spec in sent:
+                    f.write(json.dumps({**spec, "at_ms": round((at - origin) * 1000.0, 1)}, ensure_ascii=False) + "\n")
+
+    all_results = [r for results in endpoint_results.values() for r in results]
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "mode": "trace" if args.trace else "endpoints",
+            "trace": args.trace,
+            "timed": bool(args.timed),
+            "concurrency": args.concurrency,
+            "requests_per_endpoint": None if args.trace else args.requests,
+            "users": args.users,
+            "seed": args.seed,
+            "llm_batch_latency_ms": args.llm_latency_ms,
+            "llm_token_latency_ms": args.llm_token_ms,
+            "graph_latency_ms": args.graph_latency_ms,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "llm_cache": not args.no_llm_cache,
+        },
+        "endpoints": {name: summarize(results, walls[name]) for name, results in endpoint_results.items()},
+        "totals": summarize(all_results, sum(walls.values()) if not args.trace else max(walls.values(), default=0.0)),
+        "llm": stub.stats(),
+        "graph_queries": dict(fake.queries),
+    }
+
+
+def start_app(args):
+    """
+    앱을 import 하고 외부 의존성을 가짜로 바꿔 끼운 뒤 서버를 띄운다
+    """
+    from app.main import app
+    from app.database import Base, engine, SessionLocal, get_async_graph_db
+    from app.db.models.user import User  # noqa: F401  (테이블 등록)
+    from app.db.models.outbox import OutboxEvent  # noqa: F401
+    from app.services.order_log import order_log
+    from app.services.outbox_relay import outbox_relay
+    from app.services.weight_artifact import get_artifact
+    from benchmarks.fake_graph import FakeGraph
+    from benchmarks.stub_llm import StubLLM
+
+    Base.metadata.create_all(bind=engine)
+
+    fake = FakeGraph(args.data_root, latency_ms=args.graph_latency_ms)
+
+    async def fake_graph_db():
+        session = fake.async_session()
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    app.dependency_overrides[get_async_graph_db] = fake_graph_db
+    stub = StubLLM(args.llm_latency_ms, args.llm_token_ms).install()
+
+    order_log.start(fake.session)
+    outbox_relay.start(SessionLocal, fake.session)
+
+    server = ServerThread(app)
+    server.start()
+
+    def stop():
+        server.stop()
+        order_log.stop()
+        outbox_relay.stop()
+
+    return {"graph": fake, "llm": stub, "server": server, "artifact": get_artifact(), "stop": stop}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 부하/지연시간 벤치마크")
+    parser.add_argument("--endpoints", nargs="*", choices=list(ENDPOINTS), help="측정할 엔드포인트 (기본: 전부)")
+    parser.add_argument("--requests", type=int, default=50, help="엔드포인트당 측정 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--warmup", type=int, default=2, help="엔드포인트당 측정 전 워밍업 요청 수")
+    parser.add_argument("--users", type=int, default=20, help="미리 가입시킬 유저 수")
+    parser.add_argument("--orders-per-user", type=int, default=8, help="가짜 그래프에 넣을 유저당 주문 메뉴 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", help="재생할 요청 트레이스 (JSONL)")
+    parser.add_argument("--timed", action="store_true", help="트레이스의 at_ms 시각대로 보냄 (open-loop)")
+    parser.add_argument("--record", help="보낸 요청을 트레이스 JSONL 로 저장")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="가짜 LLM 의 generate 1회 고정 지연")
+    parser.add_argument("--llm-token-ms", type=float, default=5.0, help="가짜 LLM 의 토큰당 지연")
+    parser.add_argument("--no-llm-cache", action="store_true", help="LLM 설명 캐시를 끄고 매번 생성 경로를 측정")
+    parser.add_argument("--graph-latency-ms", type=float, default=0.0, help="가짜 그래프 쿼리 1회 지연")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="비밀번호 해시 cost (운영 기본값 12)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 타임아웃(초)")
+    parser.add_argument("--data-root", default=os.path.join(ROOT, "data"), help="var / non_var CSV 폴더")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: benchmarks/results/<시각>.json)")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="--compare 회귀 기준 비율")
+    parser.add_argument("--verbose", action="store_true", help="앱 로그를 INFO 레벨로 출력 (기본: WARNING 이상만)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # 앱이 static/, lib/, app/templates 를 상대 경로로 찾으므로 저장소 루트에서 실행
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    with tempfile.TemporaryDirectory(prefix="menu-bench-") as workdir:
+        prepare_env(args, workdir)
+        app_state = start_app(args)
+        try:
+            report = asyncio.run(benchmark(args, app_state))
+        finally:
+            app_state["stop"]()
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_table(report)
+    print(f"\n💾 결과 저장: {out}")
+
+    if args.compare:
+        from benchmarks.compare import compare, load, print_report
+
+        diff = compare(load(args.compare), report, args.threshold)
+        print_report(diff)
+        sys.exit(1 if diff["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+실제 모델 대신 쓰는 결정적 LLM (벤치마크 전용)
+
+hf_llm.generate_batch / generate_stream 을 바꿔 끼우고 스케줄러를 새로 만들게 해서,
+배치 스케줄러·캐시·예산·SSE 경로는 그대로 타고 생성만 지정한 지연으로 흉내 낸다.
+"""
+import hashlib
+import time
+
+from app.services import hf_llm, metrics
+
+# 프롬프트 해시로 고르는 응답 (같은 프롬프트면 항상 같은 문장)
+RESPONSES = [
+    " 오늘 같은 날엔 이 메뉴들이 잘 어울려요. 첫 번째 메뉴부터 가볍게 시작해 보세요.",
+    " 선택하신 조건에 맞춰 고른 메뉴예요. 함께 주문하시면 만족도가 더 높아요.",
+    " 비슷한 입맛의 손님들이 자주 찾는 조합이에요. 부담 없이 즐기실 수 있어요.",
+    " 지금 시간대에 인기 있는 메뉴들이에요. 술과 곁들이기에도 좋아요.",
+]
+
+
+class StubLLM:
+    """
+    - batch_latency_ms : generate 한 번(배치)의 고정 비용 (prefill 흉내)
+    - token_latency_ms : 토큰(여기서는 어절) 하나당 비용. 배치 크기와 상관없이 한 번만 듦
+    """
+
+    def __init__(self, batch_latency_ms: float = 50.0, token_latency_ms: float = 5.0):
+        self.batch_latency = batch_latency_ms / 1000.0
+        self.token_latency = token_latency_ms / 1000.0
+        self.calls = 0
+        self.prompts = 0
+
+    @staticmethod
+    def completion(prompt: str) -> str:
+        digest = hashlib.sha1(prompt.encode("utf-8")).digest()
+        return RESPONSES[digest[0] % len(RESPONSES)]
+
+    def _tokens(self, text: str, stop: tuple[int, int] = None) -> list[str]:
+        # 실제 생성처럼 종료 기준에 걸리는 토큰까지만
+        words = text.split(" ")
+        tokens, generated = [], ""
+        for i, w in enumerate(words):
+            tokens.append((" " if i else "") + w)
+            generated += tokens[-1]
+            if hf_llm.find_remark_end(generated.lstrip(), stop) is not None:
+                break
+        return tokens
+
+    def _record(self, prompts: list[str], completions: list[str], decode_seconds: float):
+        # 실제 생성과 같은 이름으로 단계/토큰 수를 남김 (Server-Timing, /metrics 확인용. 토큰 = 어절)
+        metrics.record("llm_prefill", self.batch_latency)
+        metrics.record("llm_decode", decode_seconds)
+        prompt_tokens = sum(len(p.split()) for p in prompts)
+        metrics.record_tokens(prompt_tokens, prompt_tokens, sum(len(self._tokens(c)) for c in completions), decode_seconds)
+
+    def generate_batch(self, prompts: list[str], stops: list = None) -> list[str]:
+        stops = stops or [None] * len(prompts)
+        completions = ["".join(self._tokens(self.completion(p), stop)) for p, stop in zip(prompts, stops)]
+        steps = max(len(self._tokens(c)) for c in completions)
+        time.sleep(self.batch_latency + steps * self.token_latency)
+        self._record(prompts, completions, steps * self.token_latency)
+        self.calls += 1
+        self.prompts += len(prompts)
+        # 실제 디코딩 결과처럼 프롬프트 + 생성 텍스트
+        return [p + c for p, c in zip(prompts, completions)]
+
+    def generate_stream(self, prompt: str, on_text, stop: tuple[int, int] = None) -> str:
+        completion = "".join(self._tokens(self.completion(prompt), stop))
+        time.sleep(self.batch_latency)
+        started = time.perf_counter()
+        for token in self._tokens(completion):
+            time.sleep(self.token_latency)
+            on_text(token)
+        self._record([prompt], [completion], time.perf_counter() - started)
+        self.calls += 1
+        self.prompts += 1
+        return prompt + completion
+
+    def install(self):
+        """
+        hf_llm 의 생성 함수를 교체. 이미 만들어진 스케줄러가 있으면 버리고 새로 만들게 한다
+        """
+        hf_llm.generate_batch = self.generate_batch
+        hf_llm.generate_stream = self.generate_stream
+        with hf_llm._scheduler_lock:
+            hf_llm._scheduler = None
+        return self
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "prompts": self.prompts}
@@ -0,0 +1,29 @@
+# build_weights.py
+import argparse
+
+from app.services import weight_artifact
+
+
+def build_weights(data_root: str, out_path: str):
+    print(f"가중치 CSV 컴파일 중... ({data_root} → {out_path})")
+    result = weight_artifact.compile_weights(data_root=data_root, out_path=out_path)
+    print(f"   메뉴 {result['menus']}개, 조건 {result['conditions']}개, 페어링 차원 {result['pairings']}개, "
+          f"간선 {result['edges']}개")
+    print(f"   {result['bytes']:,} bytes, {result['seconds'] * 1000:.0f}ms (version {result['data_version']})")
+
+    # 만든 파일을 바로 열어서 헤더/배열이 제대로 읽히는지 확인
+    artifact = weight_artifact.WeightArtifact(out_path)
+    for dim in artifact.conditions:
+        print(f"   [조건] {dim}: 값 {len(artifact.condition_values[dim])}개, "
+              f"간선 {len(artifact.condition(dim).indices)}개")
+    for dim in artifact.pairings:
+        print(f"   [페어링] {dim}: 간선 {len(artifact.pairing(dim).indices)}개")
+    print("가중치 파일 생성 완료! (실행 중인 서버는 파일 변경을 감지해 다시 엽니다)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="var / non_var 가중치 CSV 를 mmap 용 바이너리 파일로 컴파일")
+    parser.add_argument("--data-root", default=weight_artifact.DATA_ROOT, help="var, non_var 폴더가 있는 경로")
+    parser.add_argument("--out", default=weight_artifact.ARTIFACT_PATH, help="출력 파일 경로")
+    args = parser.parse_args()
+    build_weights(args.data_root, args.out)
@@ -1,80 +1,210 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 from neo4j import GraphDatabase
-import os
 
-# CSV 파일들이 있는 폴더 경로 (사용자 환경 기준)
-DATA_DIR = "/root/16_team/data/var"
+from app.db.queries import BUMP_GRAPH_VERSION_QUERY
+
+# CSV 파일들이 있는 폴더 경로 (사용자 환경 기준, var / non_var 하위 폴더)
+DATA_ROOT = os.getenv("IMPORT_DATA_ROOT", "/root/16_team/data")
 
 # Neo4j 접속 정보
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "password"
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-
-def import_csv_to_graph():
-    print("상황별 가중치 데이터(CSV) 로딩 시작...")
-    
-    # 파일명 : Neo4j 라벨 매핑
-    files = {
-        "alchol.csv": "Alcohol",
-        "category.csv": "Category",
-        "people.csv": "People",
-        "price.csv": "Price",
-        "rain.csv": "Rain",
-        "season.csv": "Season",
-        "time.csv": "Time"
-    }
+# 한 트랜잭션에 보낼 행 수 / 동시에 처리할 파일 수
+BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+WORKERS = int(os.getenv("IMPORT_WORKERS", "4"))
+
+# var: 메뉴 → 상황 노드 (파일명 : Neo4j 라벨)
+VAR_FILES = {
+    "alchol.csv": "Alcohol",
+    "category.csv": "Category",
+    "people.csv": "People",
+    "price.csv": "Price",
+    "rain.csv": "Rain",
+    "season.csv": "Season",
+    "time.csv": "Time",
+}
+
+# non_var: 메뉴 → 메뉴 (파일명 : 차원 이름, GOES_WITH 관계의 dimension 속성으로 저장)
+NON_VAR_FILES = {
+    "menu_alchol_edges.csv": "alchol",
+    "menu_category_edges.csv": "category",
+    "menu_comb_edges.csv": "comb",
+    "menu_people_edges.csv": "people",
+    "menu_price_edges.csv": "price",
+    "menu_rain_edges.csv": "rain",
+    "menu_season_edges.csv": "season",
+    "menu_time_edges.csv": "time",
+}
+
+# 모든 메뉴 노드를 먼저 만들어 두고, 간선 적재 때는 MATCH 로 찾기만 한다
+# (여러 파일을 병렬로 넣을 때 같은 Menu 노드를 동시에 MERGE 하며 락 경합이 생기지 않도록)
+MENU_QUERY = """
+UNWIND $rows AS name
+MERGE (:Menu {name: name})
+"""
+
+VAR_EDGE_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Menu {{name: row.source}})
+MERGE (c:{label} {{value: row.target}})
+MERGE (m)-[r:FITS_IN]->(c)
+SET r.weight = row.weight
+"""
+
+NON_VAR_EDGE_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Menu {name: row.source})
+MATCH (n:Menu {name: row.target})
+MERGE (m)-[r:GOES_WITH {dimension: $dimension}]->(n)
+SET r.weight = row.weight
+"""
+
+
+def read_edges(file_path: str) -> pd.DataFrame:
+    """
+    source, target, weight 세 컬럼만 벡터 연산으로 정리 (컬럼 순서는 파일마다 달라도 이름으로 찾음)
+    """
+    try:
+        df = pd.read_csv(file_path, encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        df = pd.read_csv(file_path, encoding="cp949")
+
+    # 컬럼 공백 제거
+    df.columns = [c.strip() for c in df.columns]
+    df = df[["source", "target", "weight"]].dropna(subset=["source", "target"])
+    df["source"] = df["source"].astype(str).str.strip()
+    df["target"] = df["target"].astype(str).str.strip()
+    df["weight"] = pd.to_numeric(df["weight"], errors="coerce").fillna(0.0).astype(float)
+    return df
+
+
+def collect_jobs(data_root: str, sets) -> list[dict]:
+    jobs = []
+    for set_name, files in (("var", VAR_FILES), ("non_var", NON_VAR_FILES)):
+        if set_name not in sets:
+            continue
+        for filename, target in files.items():
+            file_path = os.path.join(data_root, set_name, filename)
 
-    with driver.session() as session:
-        for filename, label in files.items():
-            file_path = os.path.join(DATA_DIR, filename)
-            
             # 파일 존재 여부 확인
             if not os.path.exists(file_path):
-                print(f"파일 없음: {filename} (건너뜁니다)")
+                print(f"파일 없음: {set_name}/{filename} (건너뜁니다)")
                 continue
 
-            print(f"   Processing {filename} -> Label: {label}...")
-            
-            try:
-                # CSV 읽기 (인코딩 문제 방지)
+            df = read_edges(file_path)
+            if set_name == "var":
+                query, params = VAR_EDGE_QUERY.format(label=target), {}
+                menus = df["source"]
+            else:
+                query, params = NON_VAR_EDGE_QUERY, {"dimension": target}
+                menus = pd.concat([df["source"], df["target"]])
+
+            jobs.append({
+                "name": f"{set_name}/{filename}",
+                "query": query,
+                "params": params,
+                "rows": df.to_dict("records"),
+                "menus": menus.unique().tolist(),
+            })
+    return jobs
+
+
+def _batches(rows: list, batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def _write_batches(driver, query: str, rows: list, batch_size: int, params: dict = None) -> int:
+    batches = 0
+    with driver.session() as session:
+        for batch in _batches(rows, batch_size):
+            # 배치 하나 = 명시적 트랜잭션 하나 (일시 오류는 드라이버가 재시도)
+            session.execute_write(lambda tx, b=batch: tx.run(query, rows=b, **(params or {})).consume())
+            batches += 1
+    return batches
+
+
+def load_job(driver, job: dict, batch_size: int, dry_run: bool) -> dict:
+    started = time.perf_counter()
+    if dry_run:
+        batches = len(list(_batches(job["rows"], batch_size)))
+    else:
+        batches = _write_batches(driver, job["query"], job["rows"], batch_size, job["params"])
+    elapsed = time.perf_counter() - started
+    return {"name": job["name"], "rows": len(job["rows"]), "batches": batches, "seconds": elapsed}
+
+
+def import_csv_to_graph(
+    data_root: str = DATA_ROOT,
+    sets=("var", "non_var"),
+    batch_size: int = BATCH_SIZE,
+    workers: int = WORKERS,
+    dry_run: bool = False,
+):
+    print(f"가중치 간선 데이터(CSV) 로딩 시작... ({', '.join(sets)}{', dry-run' if dry_run else ''})")
+    total_started = time.perf_counter()
+
+    jobs = collect_jobs(data_root, sets)
+    menus = sorted({name for job in jobs for name in job["menus"]})
+    print(f"   파일 {len(jobs)}개, 간선 {sum(len(job['rows']) for job in jobs)}개, 메뉴 {len(menus)}개 "
+          f"(읽기 {time.perf_counter() - total_started:.2f}s)")
+
+    driver = None if dry_run else GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        # 1. 메뉴 노드 일괄 생성
+        if not dry_run:
+            _write_batches(driver, MENU_QUERY, menus, batch_size)
+
+        # 2. 파일별 간선을 병렬로 적재
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [pool.submit(load_job, driver, job, batch_size, dry_run) for job in jobs]
+            for job, future in zip(jobs, futures):
                 try:
-                    df = pd.read_csv(file_path, encoding='utf-8')
-                except:
-                    df = pd.read_csv(file_path, encoding='cp949')
-                
-                # 컬럼 공백 제거
-                df.columns = [c.strip() for c in df.columns]
-
-                # 쿼리 실행
-                if filename == "time.csv":
-                    # Time은 target이 시간값, source가 메뉴명
-                    query = f"""
-                    MERGE (m:Menu {{name: $menu_name}})
-                    MERGE (c:{label} {{value: $context_val}})
-                    MERGE (m)-[r:FITS_IN]->(c)
-                    SET r.weight = toFloat($weight)
-                    """
-                    for _, row in df.iterrows():
-                        session.run(query, menu_name=row['source'], context_val=row['target'], weight=row['weight'])
-                
-                else:
-                    # 나머지는 source가 메뉴명, target이 조건값
-                    query = f"""
-                    MERGE (m:Menu {{name: $menu_name}})
-                    MERGE (c:{label} {{value: $context_val}})
-                    MERGE (m)-[r:FITS_IN]->(c)
-                    SET r.weight = toFloat($weight)
-                    """
-                    for _, row in df.iterrows():
-                        session.run(query, menu_name=row['source'], context_val=row['target'], weight=row['weight'])
-                        
-            except Exception as e:
-                print(f" {filename} 처리 중 에러 발생: {e}")
-
-    print("모든 데이터 그래프 적재 완료!")
-    driver.close()
+                    result = future.result()
+                except Exception as e:
+                    print(f" {job['name']} 처리 중 에러 발생: {e}")
+                    continue
+                results.append(result)
+                rate = result["rows"] / result["seconds"] if result["seconds"] > 0 else 0.0
+                print(f"   {result['name']}: {result['rows']}행, 배치 {result['batches']}개, "
+                      f"{result['seconds']:.2f}s ({rate:,.0f} rows/s)")
+
+        # 3. 가중치만 바뀌어 노드/관계 수가 그대로여도 그래프 뷰 캐시가 새로 그리도록 버전 노드를 올림
+        if not dry_run:
+            with driver.session() as session:
+                session.execute_write(lambda tx: tx.run(BUMP_GRAPH_VERSION_QUERY).consume())
+    finally:
+        if driver is not None:
+            driver.close()
+
+    elapsed = time.perf_counter() - total_started
+    total_rows = sum(r["rows"] for r in results)
+    print(f"모든 데이터 그래프 적재 완료! 총 {total_rows}행, {elapsed:.2f}s "
+          f"({total_rows / elapsed if elapsed > 0 else 0.0:,.0f} rows/s)")
+    return results
+
 
 if __name__ == "__main__":
-    import_csv_to_graph()
+    parser = argparse.ArgumentParser(description="var / non_var 가중치 CSV 를 Neo4j 에 일괄 적재")
+    parser.add_argument("--data-root", default=DATA_ROOT, help="var, non_var 폴더가 있는 경로")
+    parser.add_argument("--only", choices=["var", "non_var"], help="한쪽 간선 묶음만 적재")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="트랜잭션당 행 수")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="동시에 처리할 파일 수")
+    parser.add_argument("--dry-run", action="store_true", help="CSV 읽기/배치 분할만 하고 DB 에는 쓰지 않음")
+    args = parser.parse_args()
+
+    import_csv_to_graph(
+        data_root=args.data_root,
+        sets=(args.only,) if args.only else ("var", "non_var"),
+        batch_size=args.batch_size,
+        workers=args.workers,
+        dry_run=args.dry_run,
+    )
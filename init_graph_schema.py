@@ -0,0 +1,40 @@
+# init_graph_schema.py
+import argparse
+
+from app.database import neo4j_conn
+from app.db import graph_schema
+
+
+def init_graph_schema(verify_only: bool = False, explain: bool = False):
+    with neo4j_conn.get_session() as session:
+        if not verify_only:
+            print("Neo4j 제약조건/인덱스 생성 중...")
+            errors = graph_schema.apply_schema(session)
+            if errors:
+                print(f"생성 실패 {len(errors)}건 (기존 데이터 중복 여부를 확인하세요)")
+
+        result = graph_schema.verify_schema(session)
+        print(f"누락: {result['missing'] or '없음'}")
+        print(f"ONLINE 아님: {result['not_online'] or '없음'}")
+
+        if explain:
+            print("\n핫 쿼리 실행 계획 점검")
+            for name, item in graph_schema.explain_hot_queries(session).items():
+                if not item["scans"]:
+                    status = "OK"
+                elif item["allowed"]:
+                    status = "전체 스캔 (허용)"
+                else:
+                    status = "라벨 스캔 감지!"
+                print(f"  [{name}] {status}")
+                print(f"      {' → '.join(item['operators'])}")
+
+    neo4j_conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Neo4j 스키마(제약조건/인덱스) 적용 및 점검")
+    parser.add_argument("--verify-only", action="store_true", help="생성 없이 존재 여부만 확인")
+    parser.add_argument("--explain", action="store_true", help="핫 쿼리 EXPLAIN 결과 출력")
+    args = parser.parse_args()
+    init_graph_schema(verify_only=args.verify_only, explain=args.explain)
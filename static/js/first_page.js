@@ -59,15 +59,13 @@ document.addEventListener('DOMContentLoaded', () => {
     if (token) headers["Authorization"] = `Bearer ${token}`;
 
     try {
-      const res = await fetch(apiUrl, {
+      // 메뉴는 검색 직후 먼저 그리고, 설명은 생성되는 대로 이어서 붙인다
+      await streamResults(apiUrl + "/stream", {
         method: "POST",
         headers: headers,
         body: JSON.stringify(userInput)
       });
 
-      const json = await res.json();
-      renderResults(json); // 결과 화면 그리기 함수 호출
-
     } catch (err) {
       console.error(err);
       alert("오류가 발생했습니다.");
@@ -93,15 +91,12 @@ document.addEventListener('DOMContentLoaded', () => {
         collabBtn.disabled = true;
 
         try {
-            const res = await fetch("/api/v2/recommend", {
+            // 제목 변경 및 결과 렌더링
+            document.querySelector('.result-text').textContent = "🍽️ 회원님과 입맛이 비슷한 분들의 추천 메뉴!";
+            await streamResults("/api/v2/recommend/stream", {
                 method: "GET",
                 headers: { "Authorization": `Bearer ${token}` }
             });
-            const json = await res.json();
-            
-            // 제목 변경 및 결과 렌더링
-            document.querySelector('.result-text').textContent = "🍽️ 회원님과 입맛이 비슷한 분들의 추천 메뉴!";
-            renderResults(json);
 
         } catch (err) {
             console.error(err);
@@ -113,9 +108,75 @@ document.addEventListener('DOMContentLoaded', () => {
     });
   }
 
+  // ---------------------------------------------
+  // [공통] SSE 스트리밍 응답 처리
+  //  - event: menus → 메뉴 목록 먼저 렌더링
+  //  - event: token → 설명 문구 이어 붙이기
+  //  - event: done  → 후처리가 끝난 최종 문구로 교체
+  // ---------------------------------------------
+  async function streamResults(url, options) {
+      const res = await fetch(url, options);
+      if (!res.ok || !res.body) {
+          const json = await res.json().catch(() => ({}));
+          if (res.status === 503) {
+              alert("주문이 몰려 설명 생성이 지연되고 있어요. 잠시 후 다시 시도해 주세요.");
+              return;
+          }
+          renderResults(json);
+          return;
+      }
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let advice = '';
+
+      while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+
+          let sep;
+          while ((sep = buffer.indexOf("\n\n")) !== -1) {
+              const block = buffer.slice(0, sep);
+              buffer = buffer.slice(sep + 2);
+
+              let event = 'message';
+              let data = '';
+              block.split("\n").forEach(line => {
+                  if (line.startsWith("event:")) event = line.slice(6).trim();
+                  else if (line.startsWith("data:")) data += line.slice(5).trim();
+              });
+              if (!data) continue;
+              const payload = JSON.parse(data);
+
+              if (event === 'menus') {
+                  renderResults(payload);
+              } else if (event === 'token') {
+                  advice += payload.text;
+                  renderDescription(advice);
+              } else if (event === 'done') {
+                  renderDescription(payload.llm_advice);
+              } else if (event === 'error') {
+                  renderDescription(payload.detail);
+              }
+          }
+      }
+  }
+
   // ---------------------------------------------
   // [공통] 결과 화면 렌더링 함수
   // ---------------------------------------------
+  function renderDescription(text) {
+      if (!text) return;
+      const p = document.createElement("p");
+      p.style.lineHeight = "1.6";
+      p.style.whiteSpace = "pre-line";
+      p.textContent = text;
+      descriptionBox.innerHTML = '';
+      descriptionBox.appendChild(p);
+  }
+
   function renderResults(json) {
       selectedList.innerHTML = '';
       descriptionBox.innerHTML = '';
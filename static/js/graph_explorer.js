@@ -0,0 +1,67 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const PAGE_SIZE = 100;
+
+  const centerType  = document.getElementById('centerType');
+  const centerValue = document.getElementById('centerValue');
+  const loadBtn     = document.getElementById('loadBtn');
+  const moreBtn     = document.getElementById('moreBtn');
+  const status      = document.getElementById('status');
+
+  const nodes = new vis.DataSet();
+  const edges = new vis.DataSet();
+  const network = new vis.Network(
+    document.getElementById('graph'),
+    { nodes, edges },
+    { physics: { solver: 'barnesHut' }, edges: { arrows: 'to' }, nodes: { font: { color: 'white' } } }
+  );
+
+  let query = {};
+  let nextSkip = 0;
+
+  async function loadPage() {
+    if (nextSkip === null) return;
+    const params = new URLSearchParams({ ...query, skip: nextSkip, limit: PAGE_SIZE });
+    status.textContent = '불러오는 중...';
+    // 유저 주변 그래프는 본인만 조회 가능 → 그때만 로그인 토큰을 함께 보냄
+    const token = query.user_id ? localStorage.getItem('accessToken') : null;
+    const headers = token ? { 'Authorization': `Bearer ${token}` } : {};
+    const res = await fetch(`/api/v2/graph-data?${params}`, { headers });
+    if (!res.ok) {
+      status.textContent = res.status === 401 || res.status === 403
+        ? '유저 그래프는 로그인한 본인만 볼 수 있습니다.'
+        : `에러 (${res.status})`;
+      return;
+    }
+    const data = await res.json();
+    // 이미 있는 노드/엣지는 덮어쓰기만 하므로 페이지를 이어 붙여도 중복되지 않음
+    nodes.update(data.nodes);
+    edges.update(data.edges);
+    nextSkip = data.next_skip;
+    moreBtn.disabled = nextSkip === null;
+    status.textContent = `노드 ${nodes.length}개, 관계 ${edges.length}개`;
+  }
+
+  function reset() {
+    nodes.clear();
+    edges.clear();
+    nextSkip = 0;
+    query = {};
+    const value = centerValue.value.trim();
+    if (centerType.value && value) query[centerType.value] = value;
+  }
+
+  loadBtn.addEventListener('click', () => { reset(); loadPage(); });
+  moreBtn.addEventListener('click', loadPage);
+
+  // 메뉴 노드를 더블클릭하면 그 메뉴 주변을 이어서 불러옴
+  network.on('doubleClick', (params) => {
+    if (!params.nodes.length) return;
+    const node = nodes.get(params.nodes[0]);
+    if (node.group !== 'Menu') return;
+    query = { menu: node.label };
+    nextSkip = 0;
+    loadPage();
+  });
+
+  loadPage();
+});
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# app 모듈은 import 시점에 환경 변수를 읽으므로 먼저 로컬 대체물로 돌린다 (benchmarks.run.prepare_env 와 같은 방식)
+_workdir = tempfile.mkdtemp(prefix="menu-test-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'test.db')}")
+os.environ.setdefault("ORDER_LOG_PATH", os.path.join(_workdir, "order_log.jsonl"))
+os.environ.setdefault("LLM_CACHE_PATH", "")
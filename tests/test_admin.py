@@ -0,0 +1,50 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v2 import rag_recommend
+from app.database import get_async_graph_db
+from app.utils import security
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(security, "ADMIN_TOKEN", "secret")
+
+    async def update_menu_tags(graph_session, menu_name, tags):
+        return [menu_name]
+
+    monkeypatch.setattr(rag_recommend.tag_index, "update_menu_tags", update_menu_tags)
+    app = FastAPI()
+    app.include_router(rag_recommend.router, prefix="/api/v2")
+    app.dependency_overrides[get_async_graph_db] = lambda: None
+    return TestClient(app)
+
+
+def test_menu_tags_requires_admin_token(client):
+    body = {"menu_name": "우니한판", "tags": ["sushi"]}
+    assert client.put("/api/v2/menu-tags", json=body).status_code == 403
+    assert client.put("/api/v2/menu-tags", json=body, headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    res = client.put("/api/v2/menu-tags", json=body, headers={"X-Admin-Token": "secret"})
+    assert res.status_code == 200
+    assert res.json()["recomputed_menus"] == ["우니한판"]
+
+
+def test_empty_admin_token_disables_admin_routes(client, monkeypatch):
+    monkeypatch.setattr(security, "ADMIN_TOKEN", "")
+    res = client.put("/api/v2/menu-tags", json={"menu_name": "우니한판", "tags": []}, headers={"X-Admin-Token": ""})
+    assert res.status_code == 403
+
+
+def test_monitor_routes_require_admin_token(monkeypatch):
+    from app.api.v2 import monitor
+
+    monkeypatch.setattr(security, "ADMIN_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(monitor.router, prefix="/api/v2")
+    client = TestClient(app)
+
+    assert client.get("/api/v2/order-log").status_code == 403
+    assert client.post("/api/v2/context-graph/reload").status_code == 403
+    assert client.get("/api/v2/order-log", headers={"X-Admin-Token": "secret"}).status_code == 200
@@ -0,0 +1,35 @@
+import asyncio
+from concurrent.futures import Future
+
+from app.services import hf_llm
+
+
+class StubScheduler:
+    def __init__(self):
+        self.future = Future()
+        self.on_text = None
+
+    def submit_stream(self, prompt, on_text, stop=None):
+        self.on_text = on_text
+        return self.future
+
+
+def test_stream_ends_when_cache_fill_fails(monkeypatch):
+    scheduler = StubScheduler()
+    monkeypatch.setattr(hf_llm, "get_scheduler", lambda: scheduler)
+    monkeypatch.setattr(hf_llm.advice_cache, "get", lambda key: None)
+
+    def broken_set(key, value):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(hf_llm.advice_cache, "set", broken_set)
+
+    async def consume():
+        stream = hf_llm.AdviceStream([{"menu": "모나카"}], endpoint="recommend")
+        prompt = stream.prompt
+        scheduler.on_text("모나카를 추천합니다.")
+        scheduler.future.set_result(prompt + "모나카를 추천합니다.")
+        return [event async for event in stream]
+
+    events = asyncio.run(asyncio.wait_for(consume(), timeout=5))
+    assert events[-1][0] == "done"
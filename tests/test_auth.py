@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v2 import auth
+from app.database import Base, SessionLocal, engine
+from app.db.models.outbox import OutboxEvent
+from app.db.models.user import User
+
+
+@pytest.fixture(scope="module")
+def client():
+    # conftest 의 DATABASE_URL(SQLite) → 라우터는 get_async_db(aiosqlite) 로 같은 파일을 씀
+    Base.metadata.create_all(bind=engine)
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/v2/auth")
+    with TestClient(app) as client:
+        yield client
+
+
+def test_signup_commits_user_with_outbox_event(client):
+    res = client.post("/api/v2/auth/signup", json={"username": "alice", "password": "pw1234", "age": 27, "gender": "F"})
+    assert res.status_code == 201
+    body = res.json()
+    assert body["username"] == "alice" and body["age"] == 27
+
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.username == "alice").one()
+        assert user.password_hash != "pw1234"
+        event = db.query(OutboxEvent).filter(OutboxEvent.aggregate_id == user.id).one()
+    assert event.processed_at is None
+    assert json.loads(event.payload) == {"uid": user.id, "uname": "alice", "age": 27, "gender": "F"}
+
+
+def test_duplicate_signup_is_rejected(client):
+    payload = {"username": "bob", "password": "pw1234"}
+    assert client.post("/api/v2/auth/signup", json=payload).status_code == 201
+    res = client.post("/api/v2/auth/signup", json=payload)
+    assert res.status_code == 400
+
+    # 거절된 요청은 유저도 이벤트도 남기지 않음
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.username == "bob").one()
+        assert db.query(OutboxEvent).filter(OutboxEvent.aggregate_id == user.id).count() == 1
+
+
+def test_login(client):
+    client.post("/api/v2/auth/signup", json={"username": "carol", "password": "pw1234"})
+    res = client.post("/api/v2/auth/login", json={"username": "carol", "password": "pw1234"})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["username"] == "carol" and body["token_type"] == "bearer" and body["access_token"]
+
+
+def test_login_with_bad_password(client):
+    client.post("/api/v2/auth/signup", json={"username": "dave", "password": "pw1234"})
+    assert client.post("/api/v2/auth/login", json={"username": "dave", "password": "wrong"}).status_code == 401
+    assert client.post("/api/v2/auth/login", json={"username": "nobody", "password": "pw1234"}).status_code == 401
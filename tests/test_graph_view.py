@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v2 import visualize
+from app.database import get_async_graph_db
+from app.services import graph_view
+from app.services.order_log import ORDER_BATCH_QUERY
+from app.utils import security
+from benchmarks.fake_graph import FakeGraph
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def graph():
+    graph = FakeGraph(data_root=os.path.join(ROOT, "data"))
+    graph.seed_orders({1: "u1", 2: "u2"}, orders_per_user=2)
+    return graph
+
+
+def _version(graph) -> str:
+    graph_view.mark_changed()
+    return asyncio.run(graph_view.get_version(graph.async_session()))
+
+
+def test_order_count_change_bumps_version(graph):
+    menu = next(iter(graph.orders[1]))
+    before = _version(graph)
+    # 이미 있는 관계의 주문 수만 늘어남 → 노드/관계 수는 그대로
+    graph.run(ORDER_BATCH_QUERY, rows=[{"uid": 1, "menu": menu, "seqs": [10], "seq": 10}])
+    assert _version(graph) != before
+
+
+def test_user_graph_requires_self_or_admin(graph, monkeypatch):
+    monkeypatch.setattr(security, "ADMIN_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(visualize.router, prefix="/api/v2")
+    app.dependency_overrides[get_async_graph_db] = graph.async_session
+    client = TestClient(app)
+    token = security.create_access_token({"sub": "u1", "uid": 1})
+
+    assert client.get("/api/v2/graph-data", params={"user_id": 1}).status_code == 401
+    assert client.get("/api/v2/graph-data", params={"user_id": 2},
+                      headers={"Authorization": f"Bearer {token}"}).status_code == 403
+    assert client.get("/api/v2/graph-data", params={"user_id": 1},
+                      headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    assert client.get("/api/v2/graph-data", params={"user_id": 2},
+                      headers={"X-Admin-Token": "secret"}).status_code == 200
+    # 메뉴 / 전체 보기는 그대로 공개
+    assert client.get("/api/v2/graph-data", params={"menu": graph.menus[0]}).status_code == 200
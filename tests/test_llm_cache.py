@@ -0,0 +1,43 @@
+from app.services import hf_llm
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.llm_cache import AdviceCache, make_cache_key
+
+MENUS = [{"menu": "오늘의사시미"}, {"menu": "모나카"}]
+
+
+def test_key_separates_stop_limits():
+    assert make_cache_key(MENUS, None, (4, 300)) != make_cache_key(MENUS, None, (2, 120))
+    assert make_cache_key(MENUS, None, (4, 300)) == make_cache_key(MENUS, {}, (4, 300))
+
+
+def test_endpoints_without_conditions_do_not_share_trimmed_advice(monkeypatch):
+    # rag_recommend / condition_weight 는 둘 다 조건 없이 호출 → 예전에는 같은 키였음
+    monkeypatch.setitem(hf_llm.STOP_LIMITS, "rag_recommend", (4, 300))
+    monkeypatch.setitem(hf_llm.STOP_LIMITS, "condition_weight", (4, 400))
+    assert make_cache_key(MENUS, None, hf_llm.get_stop_limits("rag_recommend")) != \
+        make_cache_key(MENUS, None, hf_llm.get_stop_limits("condition_weight"))
+
+
+def test_save_failure_is_logged_not_raised(tmp_path):
+    # 부모 경로가 파일이라 디렉터리를 만들 수 없음 → OSError
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    cache = AdviceCache(path=str(blocker / "advice.json"), persist_every=1)
+    cache.set("k", "v")  # set 안에서 저장이 실패해도 예외가 올라오지 않음
+    assert cache.save() is False
+    assert cache.get("k") == "v"
+
+
+def test_concurrent_saves_leave_one_valid_file(tmp_path):
+    path = tmp_path / "advice.json"
+    cache = AdviceCache(path=str(path), persist_every=1000)
+    with ThreadPoolExecutor(8) as pool:
+        for i in range(200):
+            pool.submit(cache.set, f"k{i}", f"v{i}")
+            pool.submit(cache.save)
+    assert cache.save() is True
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 200
+    assert os.listdir(tmp_path) == ["advice.json"]
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from app.services.order_log import OrderLog, coalesce_orders
+from benchmarks.fake_graph import FakeGraph
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return FakeGraph(data_root=os.path.join(ROOT, "data"))
+
+
+def _write_log(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def test_coalesce_keeps_every_seq():
+    rows = coalesce_orders([
+        {"uid": 1, "menu": "A", "seq": 10},
+        {"uid": 1, "menu": "B", "seq": 11},
+        {"uid": 1, "menu": "A", "seq": 12},
+    ])
+    assert rows == [
+        {"uid": 1, "menu": "A", "seqs": [10, 12], "seq": 12},
+        {"uid": 1, "menu": "B", "seqs": [11], "seq": 11},
+    ]
+
+
+def test_replay_of_partially_applied_log_with_new_order(graph, tmp_path):
+    # seq 100, 200 은 반영된 뒤 로그를 다시 쓰기 전에 죽었고, 300 은 반영 전
+    graph.users[1] = {"username": "u1", "age": None, "gender": None}
+    graph.orders[1]["라멘"] = {"count": 2, "last_seq": 200}
+    path = tmp_path / "order_log.jsonl"
+    _write_log(path, [{"seq": seq, "uid": 1, "menu": "라멘"} for seq in (100, 200, 300)])
+
+    log = OrderLog(str(path))
+    log._session_factory = graph.session
+    assert log.replay() == 3
+    log.append(1, "라멘")  # 같은 (유저, 메뉴) 새 주문 → 복구분과 한 행으로 합쳐짐
+    assert log.flush() == 4
+    log.stop()
+
+    rel = graph.orders[1]["라멘"]
+    assert rel["count"] == 4  # 2 + 미반영 300 + 새 주문
+    assert rel["last_seq"] > 300
+
+    # 같은 로그를 한 번 더 재생해도 두 번 세지 않음
+    _write_log(path, [{"seq": seq, "uid": 1, "menu": "라멘"} for seq in (100, 200, 300)])
+    log = OrderLog(str(path))
+    log._session_factory = graph.session
+    log.replay()
+    log.flush()
+    log.stop()
+    assert graph.orders[1]["라멘"]["count"] == 4
+
+
+def test_next_seq_is_unique(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    log = OrderLog(str(tmp_path / "order_log.jsonl"))
+    with ThreadPoolExecutor(8) as pool:
+        seqs = list(pool.map(lambda _: log.next_seq(), range(2000)))
+    assert len(set(seqs)) == len(seqs)
+
+
+def test_order_before_user_relay_is_kept(graph, tmp_path):
+    # 아웃박스 릴레이가 User 노드를 만들기 전에 들어온 주문
+    from app.services.outbox_relay import USER_BATCH_QUERY
+
+    log = OrderLog(str(tmp_path / "order_log.jsonl"))
+    log._session_factory = graph.session
+    log.append(77, "라멘")
+    assert log.flush() == 1
+    log.stop()
+    assert graph.orders[77]["라멘"]["count"] == 1
+
+    # 릴레이가 뒤늦게 같은 노드에 이름/나이/성별을 채움
+    graph.run(USER_BATCH_QUERY, rows=[{"uid": 77, "uname": "late", "age": 30, "gender": "F"}])
+    assert graph.users[77] == {"username": "late", "age": 30, "gender": "F"}
+    assert graph.orders[77]["라멘"]["count"] == 1
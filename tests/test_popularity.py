@@ -0,0 +1,36 @@
+import time
+from collections import Counter
+
+from app.services import popularity as popularity_module
+from app.services.popularity import HOUR, PopularityCounter
+
+
+def test_top_filled_tops_up_from_all_time():
+    counter = PopularityCounter()
+    counter.reconcile({"A": 10, "B": 5, "C": 3})
+    counter.record("C")  # 재시작 후 첫 주문 → 7d 에는 C 하나뿐
+    assert counter.top(3, window="7d") == [("C", 1)]
+    assert [menu for menu, _ in counter.top_filled(3, windows=("7d", "all"))] == ["C", "A", "B"]
+
+
+def test_hour_rollover_drops_cached_ranking(monkeypatch):
+    counter = PopularityCounter()
+    now = 1000 * HOUR + 10
+    monkeypatch.setattr(time, "time", lambda: now)
+    counter.record("A", now=now)
+    assert counter.top(1, window="1h") == [("A", 1)]
+
+    now += HOUR  # 다음 시간으로 넘어감, 새 주문 없음
+    assert counter.top(1, window="1h") == []
+
+
+def test_reconcile_keeps_unflushed_orders(monkeypatch):
+    class Session:
+        def run(self, query):
+            return [{"menu": "A", "orders": 4}]
+
+    monkeypatch.setattr(popularity_module.order_log, "pending_counts", lambda: Counter({"A": 2, "B": 1}))
+    fresh = PopularityCounter()
+    monkeypatch.setattr(popularity_module, "popularity", fresh)
+    popularity_module.reconcile_from_graph(Session())
+    assert fresh.top(2, window="all") == [("A", 6), ("B", 1)]
@@ -0,0 +1,21 @@
+import asyncio
+
+from app.services import readiness
+
+
+def test_async_driver_counts_toward_readiness(monkeypatch):
+    calls = []
+
+    async def verify_connectivity():
+        calls.append(1)
+        if len(calls) < 2:
+            raise ConnectionError("not yet")
+
+    monkeypatch.setattr(readiness.async_neo4j_conn.driver, "verify_connectivity", verify_connectivity)
+    monkeypatch.setattr(readiness, "NEO4J_RETRY_INTERVAL", 0.01)
+    monkeypatch.setattr(readiness, "_state", dict(readiness._state, neo4j=True, model=True, neo4j_async=False))
+
+    assert readiness.readiness()["ready"] is False
+    asyncio.run(readiness._warm_async_neo4j())
+    assert len(calls) == 2
+    assert readiness.readiness()["ready"] is True